@@ -1,58 +1,261 @@
-# import json
-# import hashlib
-# from functools import wraps
-# from inspect import signature
-# from typing import Callable, Any
-# from configs import get_redis
-#
-#
-# def redis_cache(prefix: str, ttl: int = 60):
-#     """
-#     Асинхронный декоратор кеша для методов классов.
-#     Игнорирует self и стабильно сериализует только параметры функции.
-#     """
-#
-#     def decorator(func: Callable):
-#         @wraps(func)
-#         async def wrapper(*args, **kwargs) -> Any:
-#             redis = get_redis()
-#
-#             # Извлекаем имена аргументов функции
-#             sig = signature(func)
-#             bound = sig.bind_partial(*args, **kwargs)
-#             bound.apply_defaults()
-#
-#             # Убираем self (чтобы не ломал сериализацию)
-#             params = {k: v for k, v in bound.arguments.items() if k != "self"}
-#
-#             # Стабильная сериализация аргументов
-#             def default_serializer(obj):
-#                 if hasattr(obj, "value"):  # Enum
-#                     return obj.value
-#                 if hasattr(obj, "isoformat"):  # datetime
-#                     return obj.isoformat()
-#                 if isinstance(obj, (list, tuple, set)):
-#                     return [default_serializer(i) for i in obj]
-#                 return str(obj)
-#
-#             key_json = json.dumps(params, sort_keys=True, default=default_serializer)
-#             cache_key = f"{prefix}:{hashlib.md5(key_json.encode()).hexdigest()}"
-#             print(cache_key)
-#             # Проверяем кеш
-#             cached_value = await redis.get(cache_key)
-#             if cached_value:
-#                 return json.loads(cached_value)
-#
-#             # Выполняем и сохраняем
-#             result = await func(*args, **kwargs)
-#
-#             # Преобразуем Pydantic модель в dict
-#             if hasattr(result, "model_dump"):
-#                 result = result.model_dump()
-#
-#             await redis.set(cache_key, json.dumps(result, default=str), ex=ttl)
-#             return result
-#
-#         return wrapper
-#
-#     return decorator
+import asyncio
+import json
+import hashlib
+import time
+
+from collections import OrderedDict
+from functools import wraps, lru_cache
+from inspect import signature
+from typing import Callable, Any, Iterable
+
+from configs import CACHE_BACKEND, CACHE_MAX_ENTRIES, get_redis
+from serializers import to_jsonable
+
+
+class CacheBackend:
+    """
+    Интерфейс кеша. Записи помечаются тегами (leads, contacts, target:{id}),
+    invalidate(tag) удаляет все записи с этим тегом и поднимает версию тега.
+    """
+
+    async def get(self, key: str):
+        raise NotImplementedError()
+
+    async def set(self, key: str, value, ttl: int, tags: Iterable[str] = ()):
+        raise NotImplementedError()
+
+    async def invalidate(self, *tags: str):
+        raise NotImplementedError()
+
+    async def versions(self, tags: Iterable[str]) -> list[int]:
+        raise NotImplementedError()
+
+    async def clear(self):
+        raise NotImplementedError()
+
+
+class NullBackend(CacheBackend):
+    async def get(self, key: str):
+        return None
+
+    async def set(self, key: str, value, ttl: int, tags: Iterable[str] = ()):
+        pass
+
+    async def invalidate(self, *tags: str):
+        pass
+
+    async def versions(self, tags: Iterable[str]) -> list[int]:
+        return [0 for _ in tags]
+
+    async def clear(self):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """
+    LRU + TTL кеш в памяти процесса.
+    Инвалидация действует только внутри воркера, остальные воркеры догонят по TTL.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[float, Any, tuple[str, ...]]] = OrderedDict()
+        self.tags: dict[str, set[str]] = {}
+        self.tag_versions: dict[str, int] = {}
+
+    def __discard(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self.tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[tag]
+
+    async def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self.__discard(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value, ttl: int, tags: Iterable[str] = ()):
+        tags = tuple(tags)
+        self.__discard(key)
+        self.entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self.tags.setdefault(tag, set()).add(key)
+
+        while len(self.entries) > self.max_entries:
+            oldest = next(iter(self.entries))
+            self.__discard(oldest)
+
+    async def invalidate(self, *tags: str):
+        for tag in tags:
+            self.tag_versions[tag] = self.tag_versions.get(tag, 0) + 1
+            for key in list(self.tags.get(tag, ())):
+                self.__discard(key)
+
+    async def versions(self, tags: Iterable[str]) -> list[int]:
+        return [self.tag_versions.get(tag, 0) for tag in tags]
+
+    async def clear(self):
+        self.entries.clear()
+        self.tags.clear()
+
+
+class RedisBackend(CacheBackend):
+    """Кеш в Redis. Клиент передаётся снаружи, в тестах его можно заменить фейком."""
+
+    def __init__(self, client, prefix: str = "cache"):
+        self.client = client
+        self.prefix = prefix
+
+    def __tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def __version_key(self, tag: str) -> str:
+        return f"{self.prefix}:version:{tag}"
+
+    async def get(self, key: str):
+        raw = await self.client.get(key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def set(self, key: str, value, ttl: int, tags: Iterable[str] = ()):
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(key, json.dumps(value, default=str), ex=ttl)
+            for tag in tags:
+                pipe.sadd(self.__tag_key(tag), key)
+                pipe.expire(self.__tag_key(tag), ttl, gt=True)
+                pipe.expire(self.__tag_key(tag), ttl, nx=True)
+            await pipe.execute()
+
+    async def invalidate(self, *tags: str):
+        for tag in tags:
+            keys = await self.client.smembers(self.__tag_key(tag))
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.incr(self.__version_key(tag))
+                pipe.delete(self.__tag_key(tag), *keys)
+                await pipe.execute()
+
+    async def versions(self, tags: Iterable[str]) -> list[int]:
+        tags = list(tags)
+        if not tags:
+            return []
+        values = await self.client.mget([self.__version_key(tag) for tag in tags])
+        return [int(value or 0) for value in values]
+
+    async def clear(self):
+        async for key in self.client.scan_iter(f"{self.prefix}:*"):
+            await self.client.delete(key)
+
+
+@lru_cache
+def get_cache() -> CacheBackend:
+    if CACHE_BACKEND == "redis":
+        return RedisBackend(get_redis())
+    if CACHE_BACKEND == "memory":
+        return MemoryBackend(CACHE_MAX_ENTRIES)
+    return NullBackend()
+
+
+async def invalidate(*tags: str):
+    if tags:
+        await get_cache().invalidate(*tags)
+
+
+def _default_serializer(obj):
+    if hasattr(obj, "value"):  # Enum
+        return obj.value
+    if hasattr(obj, "isoformat"):  # datetime
+        return obj.isoformat()
+    if isinstance(obj, (list, tuple, set)):
+        return [_default_serializer(i) for i in obj]
+    return str(obj)
+
+
+# Запросы, которые уже выполняются по ключу кеша (single-flight)
+_inflight: dict[str, asyncio.Future] = {}
+
+
+class _LeaderCancelled(Exception):
+    """Ведущий запрос отменён — ожидающие вызывают функцию сами."""
+
+
+def cached(prefix: str, ttl: int = 60, tags: Iterable[str] = (), model=None):
+    """
+    Асинхронный декоратор кеша для методов менеджеров.
+    Игнорирует self, ключ строится по остальным параметрам.
+    tags — шаблоны тегов, подставляются параметры функции: "target:{target_id}".
+    model — Pydantic модель, в которую восстанавливается значение из кеша;
+    без неё значение хранится и возвращается в JSON-виде (словари, списки, строки).
+    """
+    tags = tuple(tags)
+
+    def decorator(func: Callable):
+        sig = signature(func)
+
+        def restore(value):
+            return model.model_validate(value) if model else value
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            cache = get_cache()
+
+            bound = sig.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            params = {k: v for k, v in bound.arguments.items() if k != "self"}
+
+            key_json = json.dumps(params, sort_keys=True, default=_default_serializer)
+            cache_key = f"{prefix}:{hashlib.md5(key_json.encode()).hexdigest()}"
+            entry_tags = [tag.format(**params) for tag in tags]
+
+            cached_value = await cache.get(cache_key)
+            if cached_value is not None:
+                return restore(cached_value)
+
+            inflight = _inflight.get(cache_key)
+            if inflight is not None:
+                try:
+                    return restore(await asyncio.shield(inflight))
+                except _LeaderCancelled:
+                    return await func(*args, **kwargs)
+
+            future = asyncio.get_running_loop().create_future()
+            _inflight[cache_key] = future
+            try:
+                versions = await cache.versions(entry_tags)
+                result = await func(*args, **kwargs)
+
+                value = result.model_dump(mode="json") if hasattr(result, "model_dump") else to_jsonable(result)
+                # Если за время запроса теги сбросили, результат мог устареть — не сохраняем
+                if await cache.versions(entry_tags) == versions:
+                    await cache.set(cache_key, value, ttl, entry_tags)
+                future.set_result(value)
+                return result
+            except asyncio.CancelledError:
+                # Отменяем только себя: общий future не трогаем, иначе отменятся все ожидающие
+                _inflight.pop(cache_key, None)
+                future.set_exception(_LeaderCancelled())
+                future.exception()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Ожидающих может не быть — помечаем исключение как полученное
+                future.exception()
+                raise
+            finally:
+                if _inflight.get(cache_key) is future:
+                    del _inflight[cache_key]
+
+        return wrapper
+
+    return decorator
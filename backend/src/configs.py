@@ -1,13 +1,18 @@
 import os
 
+from datetime import timedelta
+
 import pytz
 
 from dotenv import load_dotenv
 
-# import redis.asyncio as aioredis
-
 from functools import lru_cache
 
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
 load_dotenv()
 
 TIMEZONE = pytz.timezone('Asia/Tashkent')
@@ -18,21 +23,105 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_USER = os.getenv("DB_USER")
 
-# REDIS_HOST = os.getenv("REDIS_HOST")
-# REDIS_PORT = int(os.getenv("REDIS_PORT"))
+# Пул соединений. DB_POOL_SIZE=0 — без пула (NullPool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Кеш prepared statements asyncpg на соединение
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+# PgBouncer в режиме transaction: prepared statements отключаются
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+# Запросы дольше SLOW_QUERY_MS пишутся в лог (0 — выключено)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+# Подсчёт SQL на HTTP запрос: заголовок Server-Timing, строка лога, гистограммы по маршрутам
+QUERY_STATS = os.getenv("QUERY_STATS", "true").lower() == "true"
+# Метрики Prometheus на /metrics; если задан METRICS_TOKEN, нужен заголовок Authorization: Bearer <token>
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+
+# memory | redis | none
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
 
 SECRET_KEY = os.getenv("SECRET_KEY")
-ACCESS_TIME = os.getenv("ACCESS_TIME")
-REFRESH_TIME = os.getenv("REFRESH_TIME")
+# Время жизни токенов (часы), разбирается один раз при импорте
+ACCESS_TIME = int(os.getenv("ACCESS_TIME", 2))
+REFRESH_TIME = int(os.getenv("REFRESH_TIME", 72))
+ACCESS_TTL = timedelta(hours=ACCESS_TIME)
+REFRESH_TTL = timedelta(hours=REFRESH_TIME)
+# Реализация JWT: jose | pyjwt (PyJWT ставится отдельно)
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose")
+# Проверенные токены в памяти воркера до их exp, чтобы не проверять подпись повторно
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10_000))
+# Как часто воркер подтягивает из БД отозванные другими воркерами сессии (сек)
+REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", 5.0))
+
+# Кеш пользователей по токену: максимум записей и время жизни записи (сек)
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10_000))
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+
+# Argon2: потоки для хэширования, предел запросов в работе и очереди (сверх — 429), параметры стоимости
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 65536))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 4))
 
 
 BOT_SECRET = os.getenv("BOT_SECRET")
-#
-# @lru_cache
-# def get_redis() -> aioredis.Redis:
-#     return aioredis.Redis(
-#         host=REDIS_HOST,
-#         port=REDIS_PORT,
-#         db=0,
-#         decode_responses=True,
-#     )
+
+# Буферизация кликов: размер пачки, интервал сброса (сек), ёмкость очереди
+CLICK_BATCH_SIZE = int(os.getenv("CLICK_BATCH_SIZE", 500))
+CLICK_FLUSH_INTERVAL = float(os.getenv("CLICK_FLUSH_INTERVAL", 1.0))
+CLICK_QUEUE_SIZE = int(os.getenv("CLICK_QUEUE_SIZE", 100_000))
+# Повторы записи пачки при ошибке БД: число попыток и начальная задержка (сек, удваивается)
+CLICK_FLUSH_ATTEMPTS = int(os.getenv("CLICK_FLUSH_ATTEMPTS", 3))
+CLICK_RETRY_DELAY = float(os.getenv("CLICK_RETRY_DELAY", 0.5))
+ACTIVE_TARGETS_TTL = int(os.getenv("ACTIVE_TARGETS_TTL", 60))
+
+# Сворачивание сырых кликов в click_rollups: интервал (сек), размер пачки, срок хранения сырых строк (дни, 0 — не удалять)
+CLICK_COMPACT_INTERVAL = int(os.getenv("CLICK_COMPACT_INTERVAL", 300))
+CLICK_COMPACT_BATCH = int(os.getenv("CLICK_COMPACT_BATCH", 10_000))
+CLICK_RETENTION_DAYS = int(os.getenv("CLICK_RETENTION_DAYS", 0))
+
+# Отложенная запись last_interaction Telegram: интервал сброса (сек), порог досрочного сброса, строк в одном UPDATE
+TELEGRAM_INTERACTION_FLUSH_INTERVAL = float(os.getenv("TELEGRAM_INTERACTION_FLUSH_INTERVAL", 5.0))
+TELEGRAM_INTERACTION_MAX_PENDING = int(os.getenv("TELEGRAM_INTERACTION_MAX_PENDING", 10_000))
+TELEGRAM_INTERACTION_BATCH = int(os.getenv("TELEGRAM_INTERACTION_BATCH", 1000))
+# Максимум пользователей в одном запросе пакетной регистрации
+TELEGRAM_SYNC_MAX = int(os.getenv("TELEGRAM_SYNC_MAX", 1000))
+
+# Мягкое удаление: через сколько дней удалённые строки стираются физически (0 — никогда),
+# интервал очистки (сек) и размер пачки
+SOFT_DELETE_RETENTION_DAYS = int(os.getenv("SOFT_DELETE_RETENTION_DAYS", 30))
+PURGE_INTERVAL = int(os.getenv("PURGE_INTERVAL", 3600))
+PURGE_BATCH = int(os.getenv("PURGE_BATCH", 1000))
+
+# Глобальный поиск: результатов на источник и таймаут одного источника (сек)
+SEARCH_LIMIT = int(os.getenv("SEARCH_LIMIT", 5))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", 0.5))
+
+# Массовая загрузка лидов: строк в одной транзакции и максимум ошибок в ответе
+LEAD_IMPORT_CHUNK = int(os.getenv("LEAD_IMPORT_CHUNK", 1000))
+LEAD_IMPORT_MAX_ERRORS = int(os.getenv("LEAD_IMPORT_MAX_ERRORS", 1000))
+
+# Выгрузка: строк за одну выборку из серверного курсора
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+
+@lru_cache
+def get_redis() -> "aioredis.Redis":
+    if aioredis is None:
+        raise RuntimeError("redis package is not installed")
+    return aioredis.Redis(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        db=0,
+        decode_responses=True,
+    )
+
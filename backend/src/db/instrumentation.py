@@ -0,0 +1,130 @@
+import logging
+import time
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограмм: число запросов к БД и время в БД (мс) на HTTP запрос
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+@dataclass
+class QueryStats:
+    """Статистика SQL в рамках одного запроса (или блока query_budget)"""
+    queries: int = 0
+    total: float = 0.0
+    slowest: float = 0.0
+    slowest_statement: str | None = None
+    parent: "QueryStats | None" = None
+
+    def add(self, statement: str, elapsed: float):
+        stats = self
+        while stats is not None:
+            stats.queries += 1
+            stats.total += elapsed
+            if elapsed > stats.slowest:
+                stats.slowest = elapsed
+                stats.slowest_statement = statement
+            stats = stats.parent
+
+    @property
+    def total_ms(self) -> float:
+        return round(self.total * 1000, 3)
+
+    @property
+    def slowest_ms(self) -> float:
+        return round(self.slowest * 1000, 3)
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+@contextmanager
+def track_queries():
+    """Новый счётчик SQL для текущего контекста; внешний счётчик тоже получает все запросы"""
+    stats = QueryStats(parent=current_query_stats.get())
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """
+    Проверка бюджета запросов в тестах:
+        with query_budget(3):
+            await client.get("/target/")
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.queries > max_queries:
+        raise AssertionError(
+            f"Query budget exceeded: {stats.queries} > {max_queries} "
+            f"(slowest {stats.slowest_ms} ms: {stats.slowest_statement})"
+        )
+
+
+def _histogram(buckets: tuple) -> list[int]:
+    # Последняя корзина — всё, что больше верхней границы
+    return [0] * (len(buckets) + 1)
+
+
+@dataclass
+class RouteStats:
+    requests: int = 0
+    queries: int = 0
+    db_time: float = 0.0
+    max_queries: int = 0
+    query_histogram: list[int] = field(default_factory=lambda: _histogram(QUERY_BUCKETS))
+    db_time_histogram: list[int] = field(default_factory=lambda: _histogram(DB_TIME_BUCKETS))
+
+    def observe(self, stats: QueryStats):
+        self.requests += 1
+        self.queries += stats.queries
+        self.db_time += stats.total
+        self.max_queries = max(self.max_queries, stats.queries)
+        self.query_histogram[bisect_left(QUERY_BUCKETS, stats.queries)] += 1
+        self.db_time_histogram[bisect_left(DB_TIME_BUCKETS, stats.total * 1000)] += 1
+
+
+# Гистограммы по шаблону маршрута ("GET /leads/{lead_id}"), в памяти процесса
+route_stats: dict[str, RouteStats] = {}
+
+
+def observe_route(route: str, stats: QueryStats):
+    route_stats.setdefault(route, RouteStats()).observe(stats)
+
+
+def instrument(engine: Engine, slow_query_ms: float = 0):
+    """Вешает на engine подсчёт SQL в current_query_stats и лог медленных запросов"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.add(statement, elapsed)
+        if slow_query_ms and elapsed * 1000 >= slow_query_ms:
+            logger.warning("Slow query %.1f ms: %s", elapsed * 1000, " ".join(statement.split())[:1000])
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # Упавший запрос не доходит до after_cursor_execute
+        if context.connection is not None:
+            starts = context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
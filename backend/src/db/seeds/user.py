@@ -11,7 +11,7 @@ async def create_user():
                 await repo.create(
                     full_name="Admin",
                     username="admin",
-                    password=PasswordService().hash_password("1234"),
+                    password=await PasswordService().hash_password("1234"),
                     is_superuser=True
                 )
                 print("Пользователь создан")
@@ -1,11 +1,108 @@
+import time
+import uuid
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-from configs import DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME
+from configs import (
+    DB_USER,
+    DB_PASSWORD,
+    DB_HOST,
+    DB_PORT,
+    DB_NAME,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_PGBOUNCER,
+    SLOW_QUERY_MS,
+)
+from db.instrumentation import instrument
 
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который считает ожидание свободного соединения.
+    Время checkout включает открытие нового соединения, если пул его создаёт (overflow);
+    timeouts — только исчерпание pool_timeout, ошибки подключения сюда не попадают.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_total += elapsed
+            self.wait_max = max(self.wait_max, elapsed)
+
+
+def _engine_options() -> dict:
+    if DB_PGBOUNCER:
+        # PgBouncer в режиме transaction не сохраняет prepared statements между транзакциями
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    else:
+        connect_args = {"statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+
+    options = {
+        "echo": False,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+    if DB_POOL_SIZE <= 0:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+
+_url = DATABASE_URL + ("?prepared_statement_cache_size=0" if DB_PGBOUNCER else "")
+
+engine = create_async_engine(_url, **_engine_options())
+instrument(engine.sync_engine, SLOW_QUERY_MS)
 
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    if not isinstance(pool, TimedQueuePool):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "wait_count": pool.wait_count,
+        "wait_total_ms": round(pool.wait_total * 1000, 3),
+        "wait_max_ms": round(pool.wait_max * 1000, 3),
+        "timeouts": pool.timeouts,
+    }
@@ -2,12 +2,15 @@ from fastapi import Depends, Header
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from configs import BOT_SECRET
+from configs import BOT_SECRET, METRICS_TOKEN
 from db.session import async_session
-from exceptions import Forbidden
+from exceptions import Forbidden, UnAuthorized
+from models import User
 from services.auth_manager import AuthManager
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
+# Для маршрутов, доступных и боту, и пользователю: без заголовка Authorization не падаем
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token", auto_error=False)
 
 
 async def get_db():
@@ -27,10 +30,8 @@ async def get_current_user(
 
 
 async def get_superuser(
-        token: str = Depends(oauth2_scheme),
-        db: AsyncSession = Depends(get_db),
+        user: User = Depends(get_current_user),
 ):
-    user = await get_current_user(token, db)
     if not user.is_superuser:
         raise Forbidden("Forbidden")
     return user
@@ -43,16 +44,23 @@ async def verify_bot(
         raise Forbidden("Forbidden")
 
 
+async def verify_metrics(
+        authorization: str = Header(None)
+):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise Forbidden("Forbidden")
+
+
 async def get_actor(
-        token: str = Depends(oauth2_scheme),
+        token: str | None = Depends(optional_oauth2_scheme),
         db: AsyncSession = Depends(get_db),
         x_bot_token: str = Header(None),
 ):
-    if x_bot_token:
-        await verify_bot(x_bot_token)
+    # Сначала токен бота, затем bearer пользователя
+    if x_bot_token and x_bot_token == BOT_SECRET:
         return None
 
     if token:
         actor = await get_current_user(token, db)
         return actor
-    raise Forbidden("Forbidden")
+    raise UnAuthorized("Not authenticated")
@@ -34,3 +34,8 @@ class MethodNotAllowed(HTTPException):
 class Conflict(HTTPException):
     def __init__(self, detail: str):
         super().__init__(409, detail)
+
+
+class TooManyRequests(HTTPException):
+    def __init__(self, detail: str, retry_after: int = 1):
+        super().__init__(429, detail, headers={"Retry-After": str(retry_after)})
@@ -13,11 +13,16 @@ class ContactFilter:
             created_from: datetime = None,
             created_to: datetime = None,
     ):
+        self.search = SearchFilter([Contact.full_name], query, [Contact.phone_digits])
         self.filters = [
-            SearchFilter([Contact.full_name, Contact.phone], query),
+            self.search,
             RangeFilter(Contact.created_at, created_from, created_to)
         ]
 
+    @property
+    def rank(self):
+        return self.search.rank()
+
     def apply(self, stmt: Select):
         for f in self.filters:
             stmt = f.apply(stmt)
@@ -2,8 +2,10 @@ from datetime import datetime
 
 from sqlalchemy import Select
 
-from filters.operators import InFilter, RangeFilter, EqualFilter
+from filters.lead_filter import lead_search
+from filters.operators import InFilter, RangeFilter, EqualFilter, RelatedFilter
 from models.deal import DealStatusEnum, Deal
+from models.lead import Lead
 
 
 class DealFilter:
@@ -13,8 +15,11 @@ class DealFilter:
             status: list[DealStatusEnum] = None,
             created_from: datetime = None,
             created_to: datetime = None,
+            query: str = None,
     ):
         self.filters = [
+            # Сделки ищутся по имени, компании и телефону лида
+            RelatedFilter(Deal.lead_id, Lead.id, lead_search(query)),
             EqualFilter(Deal.id, deal_id),
             InFilter(Deal.status, status),
             RangeFilter(Deal.created_at, created_from, created_to),
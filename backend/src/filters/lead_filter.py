@@ -1,9 +1,13 @@
 from sqlalchemy import select, Select
 
-from filters.operators import InFilter, EqualFilter, RangeFilter
+from filters.operators import InFilter, EqualFilter, RangeFilter, SearchFilter
 from models.lead import Lead
 
 
+def lead_search(query: str = None) -> SearchFilter:
+    return SearchFilter([Lead.full_name, Lead.company_name], query, [Lead.phone_digits])
+
+
 class LeadFilter:
     def __init__(
             self,
@@ -11,13 +15,20 @@ class LeadFilter:
             target_id=None,
             created_from=None,
             created_to=None,
+            query: str = None,
     ):
+        self.search = lead_search(query)
         self.filters = [
+            self.search,
             InFilter(Lead.status, status),
             EqualFilter(Lead.target_id, target_id),
             RangeFilter(Lead.created_at, created_from, created_to),
         ]
 
+    @property
+    def rank(self):
+        return self.search.rank()
+
     def apply(self, stmt: Select):
         for f in self.filters:
             stmt = f.apply(stmt)
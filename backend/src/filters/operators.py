@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Select, or_
+import re
+
+from sqlalchemy import Column, Select, Float, or_, func, literal, select
 
 from exceptions import BadRequest
 from filters.base import BaseFilter
@@ -13,18 +15,61 @@ class LikeFilter(BaseFilter):
         if self.value:
             return stmt.where(self.column.ilike(f"%{self.value}%"))
         return stmt
-class SearchFilter:
-    """Фильтр для поиска по нескольким колонкам через OR"""
-    def __init__(self, columns: list, value: str | None):
+
+
+class SearchFilter(BaseFilter):
+    """
+    Поиск по нескольким колонкам через OR с ранжированием по похожести (pg_trgm).
+    Подстрока и нечёткое совпадение слов используют GIN trigram индексы колонок.
+    digit_columns — нормализованные колонки из одних цифр (телефон): в них ищутся
+    только цифры запроса, поэтому "+998 90 123" находит "998901234567".
+    """
+
+    def __init__(self, columns: list, value: str | None, digit_columns: list = None):
         self.columns = columns
-        self.value = value
+        self.digit_columns = digit_columns or []
+        self.value = value.strip() if value else None
+        self.digits = re.sub(r"\D", "", self.value) if self.value else ""
 
-    def apply(self, stmt):
+    def __conditions(self) -> list:
+        conditions = []
+        for col in self.columns:
+            conditions.append(col.icontains(self.value, autoescape=True))
+            conditions.append(literal(self.value).op("<%")(col))
+        if self.digits:
+            for col in self.digit_columns:
+                conditions.append(col.contains(self.digits, autoescape=True))
+        return conditions
+
+    def rank(self):
+        """Выражение релевантности для сортировки, None — если нет запроса"""
+        if not self.value:
+            return None
+        scores = [func.word_similarity(self.value, col) for col in self.columns]
+        if self.digits:
+            scores += [func.similarity(col, self.digits) for col in self.digit_columns]
+        return func.greatest(*scores, type_=Float).label("relevance")
+
+    def apply(self, stmt: Select):
         if not self.value:
             return stmt
-        pattern = f"%{self.value}%"
-        stmt = stmt.where(or_(*(col.ilike(pattern) for col in self.columns)))
-        return stmt
+        return stmt.where(or_(*self.__conditions()))
+
+
+class RelatedFilter(BaseFilter):
+    """Фильтр по связанной таблице: column IN (SELECT key ... WHERE <filter>)"""
+
+    def __init__(self, column: Column, key: Column, related_filter):
+        self.column = column
+        self.key = key
+        self.related_filter = related_filter
+
+    def apply(self, stmt: Select):
+        subquery = self.related_filter.apply(select(self.key))
+        if subquery.whereclause is None:
+            return stmt
+        return stmt.where(self.column.in_(subquery))
+
 
 class EqualFilter(BaseFilter):
     def __init__(self, column: Column, value=None):
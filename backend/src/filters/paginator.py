@@ -1,26 +1,45 @@
+import base64
+import binascii
+import enum
+import json
+import uuid
+
+from datetime import date, datetime
+from decimal import Decimal
 from math import ceil
 
-from sqlalchemy import Select
+from sqlalchemy import Select, Column, and_, or_, tuple_, asc, desc, literal
 
+from exceptions import BadRequest
 from filters.base import BaseFilter
+from filters.sorter import Sorter
 
 
 class Paginator(BaseFilter):
+    counts_total = True
+
     def __init__(
             self,
             page: int = 1,
             size: int = 50,
+            estimate_total: bool = False,
     ):
         self.page = page
         self.size = size
+        self.estimate_total = estimate_total
         self.total = 0
+        self.total_estimated = False
 
     def apply(self, stmt: Select):
         offset = (self.page - 1) * self.size
         return stmt.offset(offset).limit(self.size)
 
-    def set_total(self, total: int):
+    def collect(self, rows: list) -> list:
+        return rows
+
+    def set_total(self, total: int, estimated: bool = False):
         self.total = total
+        self.total_estimated = estimated
 
     @property
     def total_pages(self):
@@ -43,7 +62,200 @@ class Paginator(BaseFilter):
             "page": self.page,
             "size": self.size,
             "total": self.total,
+            "total_estimated": self.total_estimated,
             "total_pages": self.total_pages,
             "has_next": self.has_next,
             "has_prev": self.has_prev,
-        }
\ No newline at end of file
+            "next_cursor": None,
+            "prev_cursor": None,
+        }
+
+
+class LimitPaginator(Paginator):
+    """Первые size строк без подсчёта общего количества (top-N)"""
+    counts_total = False
+
+    def __init__(self, size: int = 10):
+        super().__init__(page=1, size=size)
+        self.total = None
+
+
+class CursorPaginator(BaseFilter):
+    """
+    Keyset-пагинация: курсор хранит значения колонок сортировки и первичного ключа
+    последней (или первой) строки страницы. Колонки сортировки не должны быть NULL.
+    """
+    counts_total = False
+
+    def __init__(
+            self,
+            sorter: Sorter = None,
+            key: Column = None,
+            cursor: str = None,
+            size: int = 50,
+    ):
+        sorts = list(sorter.sorts) if sorter else []
+        if key is not None and all(col is not key for col, _ in sorts):
+            # Тай-брейкер по первичному ключу, чтобы порядок был однозначным
+            sorts.append((key, sorts[-1][1] if sorts else "asc"))
+
+        self.sorts = sorts
+        self.size = size
+        self.cursor = cursor
+        self.values = None
+        self.backwards = False
+        self.has_next = False
+        self.has_prev = False
+        self.next_cursor = None
+        self.prev_cursor = None
+
+        if cursor:
+            self.values, self.backwards = self.__decode(cursor)
+
+    @property
+    def __keys(self):
+        return [col.key for col, _ in self.sorts]
+
+    @staticmethod
+    def __dump_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, enum.Enum):
+            return value.value
+        if isinstance(value, (uuid.UUID, Decimal)):
+            return str(value)
+        return value
+
+    @staticmethod
+    def __load_value(column: Column, value):
+        if not isinstance(value, str):
+            return value
+        python_type = column.type.python_type
+        if python_type is str:
+            return value
+        if issubclass(python_type, (datetime, date)):
+            return python_type.fromisoformat(value)
+        return python_type(value)
+
+    def __encode(self, values: list, backwards: bool) -> str:
+        payload = {
+            "k": self.__keys,
+            "v": [self.__dump_value(value) for value in values],
+            "b": backwards,
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def __decode(self, cursor: str) -> tuple[list, bool]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            if payload["k"] != self.__keys or len(payload["v"]) != len(self.sorts):
+                raise ValueError("Cursor does not match sorting")
+            values = [
+                self.__load_value(col, value)
+                for (col, _), value in zip(self.sorts, payload["v"])
+            ]
+            return values, bool(payload.get("b"))
+        except (ValueError, KeyError, TypeError, binascii.Error):
+            raise BadRequest("Invalid cursor")
+
+    def __is_ascending(self, direction: str) -> bool:
+        ascending = direction != "desc"
+        return not ascending if self.backwards else ascending
+
+    def __seek(self):
+        directions = [self.__is_ascending(direction) for _, direction in self.sorts]
+        columns = [col for col, _ in self.sorts]
+
+        if all(directions) or not any(directions):
+            row = tuple_(*columns)
+            values = tuple_(*(literal(value, col.type) for col, value in zip(columns, self.values)))
+            return row > values if directions[0] else row < values
+
+        conditions = []
+        for i, (col, ascending) in enumerate(zip(columns, directions)):
+            equals = [columns[j] == self.values[j] for j in range(i)]
+            compare = col > self.values[i] if ascending else col < self.values[i]
+            conditions.append(and_(*equals, compare))
+        return or_(*conditions)
+
+    def apply(self, stmt: Select):
+        if self.values is not None:
+            stmt = stmt.where(self.__seek())
+
+        order_clauses = [
+            asc(col) if self.__is_ascending(direction) else desc(col)
+            for col, direction in self.sorts
+        ]
+        cursor_columns = [
+            col.label(f"_cursor_{i}")
+            for i, (col, _) in enumerate(self.sorts)
+        ]
+        return (
+            stmt.order_by(None)
+            .order_by(*order_clauses)
+            .add_columns(*cursor_columns)
+            .limit(self.size + 1)
+        )
+
+    def __row_values(self, row) -> list:
+        return [row._mapping[f"_cursor_{i}"] for i in range(len(self.sorts))]
+
+    def collect(self, rows: list) -> list:
+        has_more = len(rows) > self.size
+        rows = list(rows[:self.size])
+
+        if self.backwards:
+            rows.reverse()
+            self.has_prev = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_prev = self.values is not None
+
+        if rows:
+            if self.has_next:
+                self.next_cursor = self.__encode(self.__row_values(rows[-1]), False)
+            if self.has_prev:
+                self.prev_cursor = self.__encode(self.__row_values(rows[0]), True)
+        return rows
+
+    def set_total(self, total: int, estimated: bool = False):
+        pass
+
+    def to_dict(self):
+        return {
+            "page": None,
+            "size": self.size,
+            "total": None,
+            "total_estimated": False,
+            "total_pages": None,
+            "has_next": self.has_next,
+            "has_prev": self.has_prev,
+            "next_cursor": self.next_cursor,
+            "prev_cursor": self.prev_cursor,
+        }
+
+
+def make_paginator(
+        sorter: Sorter,
+        key: Column,
+        page: int = 1,
+        size: int = 50,
+        cursor: str = None,
+        mode: str = "page",
+        estimate_total: bool = False,
+):
+    if cursor or mode == "cursor":
+        return CursorPaginator(
+            sorter=sorter,
+            key=key,
+            cursor=cursor,
+            size=size,
+        )
+    return Paginator(
+        page=page,
+        size=size,
+        estimate_total=estimate_total,
+    )
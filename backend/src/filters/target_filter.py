@@ -2,7 +2,7 @@ from datetime import datetime
 
 from sqlalchemy import Select
 
-from filters.operators import LikeFilter, EqualFilter, RangeFilter
+from filters.operators import SearchFilter, EqualFilter, RangeFilter
 from models import TargetCompany
 
 
@@ -14,12 +14,17 @@ class TargetFilter:
             created_from: datetime = None,
             created_to: datetime = None,
     ):
+        self.search = SearchFilter([TargetCompany.name], name)
         self.filters = [
-            LikeFilter(TargetCompany.name, name),
+            self.search,
             EqualFilter(TargetCompany.is_active, is_active),
             RangeFilter(TargetCompany.created_at, created_from, created_to),
         ]
 
+    @property
+    def rank(self):
+        return self.search.rank()
+
     def apply(self, stmt: Select):
         for f in self.filters:
             stmt = f.apply(stmt)
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import Select
+
+from filters.operators import InFilter, RangeFilter, EqualFilter
+from models.telegram import TelegramUser
+
+
+class TelegramFilter:
+    def __init__(
+            self,
+            lang: list[str] = None,
+            company_id: int = None,
+            interacted_from: datetime = None,
+            interacted_to: datetime = None,
+    ):
+        self.filters = [
+            InFilter(TelegramUser.lang, lang),
+            EqualFilter(TelegramUser.company_id, company_id),
+            RangeFilter(TelegramUser.last_interaction, interacted_from, interacted_to),
+        ]
+
+    def apply(self, stmt: Select):
+        for f in self.filters:
+            stmt = f.apply(stmt)
+        return stmt
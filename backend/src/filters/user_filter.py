@@ -1,6 +1,6 @@
 from sqlalchemy import Select
 
-from filters.operators import EqualFilter, LikeFilter
+from filters.operators import EqualFilter, SearchFilter
 from models.user import User
 
 
@@ -10,11 +10,16 @@ class UserFilter:
             is_superuser: bool = None,
             full_name: str = None,
     ):
+        self.search = SearchFilter([User.full_name], full_name)
         self.filters = [
             EqualFilter(User.is_superuser, is_superuser),
-            LikeFilter(User.full_name, full_name),
+            self.search,
         ]
 
+    @property
+    def rank(self):
+        return self.search.rank()
+
     def apply(self, stmt: Select):
         for f in self.filters:
             stmt = f.apply(stmt)
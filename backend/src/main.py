@@ -7,22 +7,44 @@ from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
+from configs import QUERY_STATS, METRICS_ENABLED
 from db.seeds.user import create_user
+from middlewares.metrics import MetricsMiddleware
+from middlewares.query_stats import QueryStatsMiddleware
 from routers.auth import router as auth_router
 from routers.click import router as click_router
 from routers.contact import router as contact_router
 from routers.deal import router as deal_router
 from routers.lead import router as lead_router
+from routers.metrics import router as metrics_router
+from routers.search import router as search_router
+from routers.system import router as system_router
 from routers.target import router as target_router
 from routers.telegram import router as telegram_router
 from routers.user import router as user_router
+from services.click_manager import click_pipeline, click_compactor
+from services.password_service import hash_pool
+from services.revocation import revocation_sync
+from services.telegram_manager import interaction_buffer
+from services.tombstone_purger import tombstone_purger
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await create_user()
+    await click_pipeline.start()
+    await click_compactor.start()
+    await tombstone_purger.start()
+    await interaction_buffer.start()
+    await revocation_sync.start()
     print("Сервер Запущен")
     yield
+    await revocation_sync.stop()
+    await interaction_buffer.stop()
+    await tombstone_purger.stop()
+    await click_compactor.stop()
+    await click_pipeline.stop()
+    hash_pool.shutdown()
     print("Работа Завершилась")
 
 
@@ -40,11 +62,21 @@ app.add_middleware(
 
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
+if QUERY_STATS:
+    app.add_middleware(QueryStatsMiddleware)
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(contact_router)
 app.include_router(click_router)
 app.include_router(deal_router)
 app.include_router(lead_router)
+if METRICS_ENABLED:
+    app.include_router(metrics_router)
+app.include_router(search_router)
+app.include_router(system_router)
 app.include_router(target_router)
 app.include_router(telegram_router)
 app.include_router(user_router)
@@ -0,0 +1,40 @@
+import time
+
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+
+from metrics import http_requests, http_request_duration, http_in_progress
+
+
+class MetricsMiddleware:
+    """
+    Счётчик запросов, гистограмма задержек по шаблону маршрута и число запросов в работе.
+    Чистый ASGI: на запрос — два perf_counter и несколько операций со словарями.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_progress.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc((method, path, status_code))
+            http_request_duration.observe(time.perf_counter() - start, (method, path))
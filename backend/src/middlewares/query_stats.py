@@ -0,0 +1,60 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+
+from db.instrumentation import track_queries, observe_route
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """
+    Считает SQL каждого HTTP запроса: отдаёт их в заголовке Server-Timing,
+    пишет строку лога и копит гистограммы по шаблону маршрута.
+    Чистый ASGI, чтобы не буферизовать StreamingResponse.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        with track_queries() as stats:
+            async def send_with_timing(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    app_ms = (time.perf_counter() - start) * 1000
+                    timing = (
+                        f'db;dur={stats.total_ms};desc="{stats.queries} queries", '
+                        f'db-slowest;dur={stats.slowest_ms}, '
+                        f'app;dur={app_ms:.3f}'
+                    )
+                    # Заголовки отправляются до тела: запросы потоковой выгрузки в них не попадут
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = scope.get("route")
+                # Шаблон пути, чтобы /leads/1 и /leads/2 попали в одну гистограмму
+                path = getattr(route, "path", None) or "unmatched"
+                observe_route(f"{scope['method']} {path}", stats)
+                logger.info(
+                    "request method=%s route=%s status=%s duration_ms=%.1f queries=%s db_ms=%.1f slowest_ms=%.1f",
+                    scope["method"],
+                    path,
+                    status_code,
+                    (time.perf_counter() - start) * 1000,
+                    stats.queries,
+                    stats.total_ms,
+                    stats.slowest_ms,
+                )
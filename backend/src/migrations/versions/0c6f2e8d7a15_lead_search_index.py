@@ -0,0 +1,42 @@
+"""Lead Search Index
+
+Revision ID: 0c6f2e8d7a15
+Revises: 5e0b7a4c93d1
+Create Date: 2026-10-18 13:48:12.094517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c6f2e8d7a15'
+down_revision: Union[str, Sequence[str], None] = '5e0b7a4c93d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'leads',
+        sa.Column(
+            'phone_digits',
+            sa.String(),
+            sa.Computed("regexp_replace(phone, '[^0-9]', '', 'g')", persisted=True),
+            nullable=True,
+        )
+    )
+    op.create_index('ix_leads_full_name_trgm', 'leads', ['full_name'], unique=False, postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'})
+    op.create_index('ix_leads_company_name_trgm', 'leads', ['company_name'], unique=False, postgresql_using='gin', postgresql_ops={'company_name': 'gin_trgm_ops'})
+    op.create_index('ix_leads_phone_digits_trgm', 'leads', ['phone_digits'], unique=False, postgresql_using='gin', postgresql_ops={'phone_digits': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leads_phone_digits_trgm', table_name='leads', postgresql_using='gin')
+    op.drop_index('ix_leads_company_name_trgm', table_name='leads', postgresql_using='gin')
+    op.drop_index('ix_leads_full_name_trgm', table_name='leads', postgresql_using='gin')
+    op.drop_column('leads', 'phone_digits')
@@ -0,0 +1,32 @@
+"""Telegram Segment Indexes
+
+Revision ID: 2b8f4d6a9c31
+Revises: 7e15c0b8d2a4
+Create Date: 2026-10-18 17:38:21.906412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b8f4d6a9c31'
+down_revision: Union[str, Sequence[str], None] = '7e15c0b8d2a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_telegram_users_lang_user', 'telegram_users', ['lang', 'user_id'], unique=False)
+    op.create_index('ix_telegram_users_company_user', 'telegram_users', ['company_id', 'user_id'], unique=False)
+    op.create_index('ix_telegram_users_last_interaction', 'telegram_users', ['last_interaction'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_telegram_users_last_interaction', table_name='telegram_users')
+    op.drop_index('ix_telegram_users_company_user', table_name='telegram_users')
+    op.drop_index('ix_telegram_users_lang_user', table_name='telegram_users')
@@ -0,0 +1,28 @@
+"""Click Target Index
+
+Revision ID: 3f9a1c7e2b44
+Revises: d38c6dc0be1d
+Create Date: 2026-10-18 10:12:41.503126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7e2b44'
+down_revision: Union[str, Sequence[str], None] = 'd38c6dc0be1d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_clicks_target_id'), 'clicks', ['target_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_clicks_target_id'), table_name='clicks')
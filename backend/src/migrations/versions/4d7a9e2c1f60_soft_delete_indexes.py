@@ -0,0 +1,49 @@
+"""Soft Delete Indexes
+
+Revision ID: 4d7a9e2c1f60
+Revises: 9b3e41f7c2d8
+Create Date: 2026-10-18 16:11:48.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d7a9e2c1f60'
+down_revision: Union[str, Sequence[str], None] = '9b3e41f7c2d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_TABLES = ['leads', 'contacts', 'deals', 'target_companies']
+SOFT_DELETE_TABLES = LIVE_TABLES + ['lead_comments', 'deal_comments']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in LIVE_TABLES:
+        op.create_index(
+            f'ix_{table}_live_created',
+            table,
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+        )
+    for table in SOFT_DELETE_TABLES:
+        op.create_index(
+            f'ix_{table}_deleted_at',
+            table,
+            ['deleted_at'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NOT NULL'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(SOFT_DELETE_TABLES):
+        op.drop_index(f'ix_{table}_deleted_at', table_name=table)
+    for table in reversed(LIVE_TABLES):
+        op.drop_index(f'ix_{table}_live_created', table_name=table)
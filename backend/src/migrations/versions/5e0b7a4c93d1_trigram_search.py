@@ -0,0 +1,45 @@
+"""Trigram Search
+
+Revision ID: 5e0b7a4c93d1
+Revises: a51e7d30c6b2
+Create Date: 2026-10-18 13:05:41.672310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7a4c93d1'
+down_revision: Union[str, Sequence[str], None] = 'a51e7d30c6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        'contacts',
+        sa.Column(
+            'phone_digits',
+            sa.String(),
+            sa.Computed("regexp_replace(phone, '[^0-9]', '', 'g')", persisted=True),
+            nullable=True,
+        )
+    )
+    op.create_index('ix_contacts_full_name_trgm', 'contacts', ['full_name'], unique=False, postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'})
+    op.create_index('ix_contacts_phone_digits_trgm', 'contacts', ['phone_digits'], unique=False, postgresql_using='gin', postgresql_ops={'phone_digits': 'gin_trgm_ops'})
+    op.create_index('ix_target_companies_name_trgm', 'target_companies', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_users_full_name_trgm', 'users', ['full_name'], unique=False, postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_full_name_trgm', table_name='users', postgresql_using='gin')
+    op.drop_index('ix_target_companies_name_trgm', table_name='target_companies', postgresql_using='gin')
+    op.drop_index('ix_contacts_phone_digits_trgm', table_name='contacts', postgresql_using='gin')
+    op.drop_index('ix_contacts_full_name_trgm', table_name='contacts', postgresql_using='gin')
+    op.drop_column('contacts', 'phone_digits')
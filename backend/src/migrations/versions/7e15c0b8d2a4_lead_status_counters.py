@@ -0,0 +1,67 @@
+"""Lead Status Counters
+
+Revision ID: 7e15c0b8d2a4
+Revises: 4d7a9e2c1f60
+Create Date: 2026-10-18 16:54:03.719250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e15c0b8d2a4'
+down_revision: Union[str, Sequence[str], None] = '4d7a9e2c1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+status_enum = postgresql.ENUM('NEW', 'PROCESSING', 'CANCELLED', 'DEAL', name='statusenum', create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('leads', sa.Column('status_changed_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE leads SET status_changed_at = coalesce(updated_at, created_at)")
+
+    op.create_table('lead_status_transitions',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('lead_id', sa.Integer(), nullable=False),
+    sa.Column('from_status', status_enum, nullable=True),
+    sa.Column('to_status', status_enum, nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.Column('seconds', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_lead_status_transitions_lead_changed', 'lead_status_transitions', ['lead_id', 'changed_at'], unique=False)
+
+    op.create_table('lead_status_counters',
+    sa.Column('target_key', sa.UUID(), nullable=False),
+    sa.Column('status', status_enum, nullable=False),
+    sa.Column('leads', sa.BigInteger(), nullable=False),
+    sa.Column('entered', sa.BigInteger(), nullable=False),
+    sa.Column('exited', sa.BigInteger(), nullable=False),
+    sa.Column('seconds', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('target_key', 'status')
+    )
+    # Стартовые значения счётчиков по текущим лидам
+    op.execute(
+        """
+        INSERT INTO lead_status_counters (target_key, status, leads, entered, exited, seconds)
+        SELECT coalesce(target_id, '00000000-0000-0000-0000-000000000000'::uuid), status, count(*), count(*), 0, 0
+        FROM leads
+        WHERE status IS NOT NULL AND deleted_at IS NULL
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('lead_status_counters')
+    op.drop_index('ix_lead_status_transitions_lead_changed', table_name='lead_status_transitions')
+    op.drop_table('lead_status_transitions')
+    op.drop_column('leads', 'status_changed_at')
@@ -0,0 +1,39 @@
+"""Click Rollups
+
+Revision ID: 8c2d5e91a0f3
+Revises: 3f9a1c7e2b44
+Create Date: 2026-10-18 11:04:19.772310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2d5e91a0f3'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c7e2b44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('click_rollups',
+    sa.Column('target_id', sa.UUID(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('clicks', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['target_id'], ['target_companies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('target_id', 'hour')
+    )
+    # Существующие клики остаются со значением false и будут свёрнуты компактором
+    op.add_column('clicks', sa.Column('rolled_up', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_index('ix_clicks_not_rolled_up', 'clicks', ['id'], unique=False, postgresql_where=sa.text('rolled_up = false'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_clicks_not_rolled_up', table_name='clicks', postgresql_where=sa.text('rolled_up = false'))
+    op.drop_column('clicks', 'rolled_up')
+    op.drop_table('click_rollups')
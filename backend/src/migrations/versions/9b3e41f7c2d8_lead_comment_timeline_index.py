@@ -0,0 +1,28 @@
+"""Lead Comment Timeline Index
+
+Revision ID: 9b3e41f7c2d8
+Revises: 0c6f2e8d7a15
+Create Date: 2026-10-18 15:02:27.530146
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e41f7c2d8'
+down_revision: Union[str, Sequence[str], None] = '0c6f2e8d7a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_lead_comments_lead_created', 'lead_comments', ['lead_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lead_comments_lead_created', table_name='lead_comments')
@@ -0,0 +1,28 @@
+"""Deal Lead Index
+
+Revision ID: a51e7d30c6b2
+Revises: 8c2d5e91a0f3
+Create Date: 2026-10-18 11:47:03.218554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a51e7d30c6b2'
+down_revision: Union[str, Sequence[str], None] = '8c2d5e91a0f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_deals_lead_id'), 'deals', ['lead_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_deals_lead_id'), table_name='deals')
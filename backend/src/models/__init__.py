@@ -1,9 +1,11 @@
 from models.base import Base
 from models.contact import Contact
 from models.company import Company
-from models.click import Click
+from models.click import Click, ClickRollup
 from models.deal import Deal, DealComment
 from models.lead import Lead, LeadComment
+from models.lead_status import LeadStatusTransition, LeadStatusCounter
+from models.refresh_token import RefreshToken
 from models.target import TargetCompany
 from models.tasks import Task
 from models.telegram import TelegramUser
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, UUID
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, UUID, Boolean, DateTime, Index, false
 
 
 from models.base import Base
@@ -8,4 +8,21 @@ from models.mixins import TimeStampMixin
 class Click(Base, TimeStampMixin):
     __tablename__ = "clicks"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    target_id = Column(UUID, ForeignKey("target_companies.id", ondelete="CASCADE"))
+    target_id = Column(UUID, ForeignKey("target_companies.id", ondelete="CASCADE"), index=True)
+    # Клик уже учтён в click_rollups
+    rolled_up = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    __table_args__ = (
+        Index(
+            'ix_clicks_not_rolled_up',
+            'id',
+            postgresql_where=(rolled_up == false())
+        ),
+    )
+
+
+class ClickRollup(Base):
+    __tablename__ = "click_rollups"
+    target_id = Column(UUID, ForeignKey("target_companies.id", ondelete="CASCADE"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    clicks = Column(BigInteger, nullable=False, default=0)
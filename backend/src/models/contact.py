@@ -1,13 +1,43 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Computed, Index, text
 
 from models.base import Base
-from models.mixins import TimeStampMixin
+from models.mixins import SoftDeleteMixin
 
 
-class Contact(Base, TimeStampMixin):
+class Contact(Base, SoftDeleteMixin):
     __tablename__ = "contacts"
     id = Column(Integer, primary_key=True, autoincrement=True)
     full_name = Column(String(512), nullable=False)
     email = Column(String, nullable=False)
     phone = Column(String, nullable=False)
+    # Только цифры телефона для поиска независимо от формата ввода
+    phone_digits = Column(String, Computed("regexp_replace(phone, '[^0-9]', '', 'g')", persisted=True))
     lead_id = Column(Integer, ForeignKey("leads.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        Index(
+            'ix_contacts_full_name_trgm',
+            'full_name',
+            postgresql_using='gin',
+            postgresql_ops={'full_name': 'gin_trgm_ops'},
+        ),
+        Index(
+            'ix_contacts_phone_digits_trgm',
+            'phone_digits',
+            postgresql_using='gin',
+            postgresql_ops={'phone_digits': 'gin_trgm_ops'},
+        ),
+        # Горячие выборки идут только по живым строкам
+        Index(
+            'ix_contacts_live_created',
+            'created_at',
+            'id',
+            postgresql_where=text('deleted_at IS NULL'),
+        ),
+        # Очистка старых удалённых строк
+        Index(
+            'ix_contacts_deleted_at',
+            'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+        ),
+    )
@@ -1,10 +1,10 @@
 import enum
 
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, Enum, Text
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, Enum, Text, Index, text
 from sqlalchemy.orm import relationship
 
 from models.base import Base
-from models.mixins import TimeStampMixin
+from models.mixins import SoftDeleteMixin
 
 
 class DealStatusEnum(str, enum.Enum):
@@ -13,17 +13,41 @@ class DealStatusEnum(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
-class Deal(Base, TimeStampMixin):
+class Deal(Base, SoftDeleteMixin):
     __tablename__ = "deals"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="SET NULL"), nullable=True)
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="SET NULL"), nullable=True, index=True)
     deal_sum = Column(Numeric(16, 2))
     status = Column(Enum(DealStatusEnum), default=DealStatusEnum.PROCESSING)
     # lead = relationship("Lead", back_populates="deals")
 
-
-class DealComment(Base, TimeStampMixin):
+    __table_args__ = (
+        # Горячие выборки идут только по живым строкам
+        Index(
+            'ix_deals_live_created',
+            'created_at',
+            'id',
+            postgresql_where=text('deleted_at IS NULL'),
+        ),
+        # Очистка старых удалённых строк
+        Index(
+            'ix_deals_deleted_at',
+            'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+        ),
+    )
+
+
+class DealComment(Base, SoftDeleteMixin):
     __tablename__ = "deal_comments"
     id = Column(Integer, primary_key=True, autoincrement=True)
     deal_id = Column(Integer, ForeignKey("deals.id", ondelete="CASCADE"))
     comment = Column(Text)
+
+    __table_args__ = (
+        Index(
+            'ix_deal_comments_deleted_at',
+            'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+        ),
+    )
@@ -1,9 +1,11 @@
 import enum
 
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, UUID, Index
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, UUID, Index, Computed, DateTime, text
 
 from models.base import Base
-from models.mixins import TimeStampMixin
+from models.mixins import SoftDeleteMixin
 
 
 class StatusEnum(str, enum.Enum):
@@ -13,16 +15,18 @@ class StatusEnum(str, enum.Enum):
     DEAL = "deal"
 
 
-class Lead(Base, TimeStampMixin):
+class Lead(Base, SoftDeleteMixin):
     __tablename__ = 'leads'
     id = Column(Integer, primary_key=True, autoincrement=True)
     full_name = Column(String(512), nullable=False)
     email = Column(String, nullable=False)
     phone = Column(String, nullable=False)
+    phone_digits = Column(String, Computed("regexp_replace(phone, '[^0-9]', '', 'g')", persisted=True))
     status = Column(Enum(StatusEnum), default=StatusEnum.NEW, index=True)
     company_name = Column(String(512), nullable=False)
     company_info = Column(String(2048), nullable=False)
     target_id = Column(UUID, ForeignKey("target_companies.id", ondelete="SET NULL"), nullable=True, index=True)
+    status_changed_at = Column(DateTime, default=datetime.now)
 
     __table_args__ = (
         Index(
@@ -35,13 +39,53 @@ class Lead(Base, TimeStampMixin):
             'status',
             postgresql_where=(status == StatusEnum.PROCESSING)
         ),
-
+        Index(
+            'ix_leads_full_name_trgm',
+            'full_name',
+            postgresql_using='gin',
+            postgresql_ops={'full_name': 'gin_trgm_ops'},
+        ),
+        Index(
+            'ix_leads_company_name_trgm',
+            'company_name',
+            postgresql_using='gin',
+            postgresql_ops={'company_name': 'gin_trgm_ops'},
+        ),
+        Index(
+            'ix_leads_phone_digits_trgm',
+            'phone_digits',
+            postgresql_using='gin',
+            postgresql_ops={'phone_digits': 'gin_trgm_ops'},
+        ),
+        # Горячие выборки идут только по живым строкам
+        Index(
+            'ix_leads_live_created',
+            'created_at',
+            'id',
+            postgresql_where=text('deleted_at IS NULL'),
+        ),
+        # Очистка старых удалённых строк
+        Index(
+            'ix_leads_deleted_at',
+            'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+        ),
     )
 
 
-class LeadComment(Base, TimeStampMixin):
+class LeadComment(Base, SoftDeleteMixin):
     __tablename__ = 'lead_comments'
     id = Column(Integer, primary_key=True, autoincrement=True)
     lead_id = Column(Integer, ForeignKey('leads.id', ondelete='CASCADE'))
     user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
     comment = Column(String(2048), nullable=False)
+
+    __table_args__ = (
+        # Лента комментариев лида: keyset по (created_at, id) внутри lead_id
+        Index('ix_lead_comments_lead_created', 'lead_id', 'created_at', 'id'),
+        Index(
+            'ix_lead_comments_deleted_at',
+            'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+        ),
+    )
@@ -0,0 +1,42 @@
+import uuid
+
+from datetime import datetime
+
+from sqlalchemy import Column, BigInteger, Integer, ForeignKey, UUID, Enum, DateTime, Index
+
+from models.base import Base
+from models.lead import StatusEnum
+
+# Ключ счётчиков для лидов без таргета (в первичном ключе не может быть NULL)
+NO_TARGET = uuid.UUID(int=0)
+
+
+class LeadStatusTransition(Base):
+    """Журнал смен статуса лида, только добавление. from_status = NULL — создание лида"""
+    __tablename__ = "lead_status_transitions"
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), nullable=False)
+    from_status = Column(Enum(StatusEnum), nullable=True)
+    to_status = Column(Enum(StatusEnum), nullable=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.now)
+    # Сколько секунд лид провёл в from_status
+    seconds = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_lead_status_transitions_lead_changed', 'lead_id', 'changed_at'),
+    )
+
+
+class LeadStatusCounter(Base):
+    """
+    Счётчики по (таргет, статус), обновляются инкрементально в транзакции смены статуса:
+    leads — лидов сейчас в статусе, entered/exited — входов/выходов,
+    seconds — суммарное время в статусе у вышедших лидов
+    """
+    __tablename__ = "lead_status_counters"
+    target_key = Column(UUID, primary_key=True)
+    status = Column(Enum(StatusEnum), primary_key=True)
+    leads = Column(BigInteger, nullable=False, default=0)
+    entered = Column(BigInteger, nullable=False, default=0)
+    exited = Column(BigInteger, nullable=False, default=0)
+    seconds = Column(BigInteger, nullable=False, default=0)
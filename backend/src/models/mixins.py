@@ -1,9 +1,35 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, event
+from sqlalchemy.orm import Session, ORMExecuteState, with_loader_criteria
 
 
 class TimeStampMixin:
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     deleted_at = Column(DateTime, nullable=True)
+
+
+class SoftDeleteMixin(TimeStampMixin):
+    """
+    Мягкое удаление по deleted_at: репозиторий проставляет deleted_at,
+    а ORM SELECT-ы (включая подзапросы и JOIN) сами отбрасывают удалённые строки.
+    execution_options(include_deleted=True) отключает фильтр для запроса.
+    """
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _skip_soft_deleted(state: ORMExecuteState):
+    if (
+            state.is_select
+            and not state.is_column_load
+            and not state.is_relationship_load
+            and not state.execution_options.get("include_deleted", False)
+    ):
+        state.statement = state.statement.options(
+            with_loader_criteria(
+                SoftDeleteMixin,
+                lambda cls: cls.deleted_at.is_(None),
+                include_aliases=True,
+            )
+        )
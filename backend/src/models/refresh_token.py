@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import Column, String, BigInteger, ForeignKey, DateTime, Index, text
+
+from models.base import Base
+
+
+class RefreshToken(Base):
+    """
+    Выданные refresh токены. family — цепочка ротаций одного входа:
+    повторное использование уже обменянного токена отзывает всю цепочку.
+    """
+    __tablename__ = "refresh_tokens"
+    jti = Column(String(32), primary_key=True)
+    family = Column(String(32), nullable=False, index=True)
+    user_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False)
+    # Токен обменян на новую пару
+    used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Синхронизация отозванных цепочек между воркерами
+        Index(
+            'ix_refresh_tokens_revoked_at',
+            'revoked_at',
+            postgresql_where=text('revoked_at IS NOT NULL'),
+        ),
+        Index('ix_refresh_tokens_expires_at', 'expires_at'),
+    )
@@ -1,13 +1,34 @@
 import uuid
 
-from sqlalchemy import Column, String, UUID, Boolean
+from sqlalchemy import Column, String, UUID, Boolean, Index, text
 
 from models.base import Base
-from models.mixins import TimeStampMixin
+from models.mixins import SoftDeleteMixin
 
 
-class TargetCompany(Base, TimeStampMixin):
+class TargetCompany(Base, SoftDeleteMixin):
     __tablename__ = 'target_companies'
     id = Column(UUID, primary_key=True, default=uuid.uuid4)
     name = Column(String(512), nullable=False)
-    is_active = Column(Boolean, default=True)
\ No newline at end of file
+    is_active = Column(Boolean, default=True)
+    __table_args__ = (
+        Index(
+            'ix_target_companies_name_trgm',
+            'name',
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+        ),
+        # Горячие выборки идут только по живым строкам
+        Index(
+            'ix_target_companies_live_created',
+            'created_at',
+            'id',
+            postgresql_where=text('deleted_at IS NULL'),
+        ),
+        # Очистка старых удалённых строк
+        Index(
+            'ix_target_companies_deleted_at',
+            'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+        ),
+    )
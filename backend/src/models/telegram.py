@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 
 from models.base import Base
 from models.mixins import TimeStampMixin
@@ -11,4 +11,11 @@ class TelegramUser(Base, TimeStampMixin):
     user_id = Column(Integer, primary_key=True)
     last_interaction = Column(DateTime, default=datetime.now)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=True, default=None)
-    lang = Column(String(2), nullable=False, default="ru")
\ No newline at end of file
+    lang = Column(String(2), nullable=False, default="ru")
+
+    __table_args__ = (
+        # Сегменты рассылок: keyset по user_id внутри языка или компании
+        Index('ix_telegram_users_lang_user', 'lang', 'user_id'),
+        Index('ix_telegram_users_company_user', 'company_id', 'user_id'),
+        Index('ix_telegram_users_last_interaction', 'last_interaction'),
+    )
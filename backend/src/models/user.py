@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, BigInteger, Boolean
+from sqlalchemy import Column, String, BigInteger, Boolean, Index
 
 from models.base import Base
 from models.mixins import TimeStampMixin
@@ -11,3 +11,12 @@ class User(Base, TimeStampMixin):
     username = Column(String(320), unique=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_superuser = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        Index(
+            'ix_users_full_name_trgm',
+            'full_name',
+            postgresql_using='gin',
+            postgresql_ops={'full_name': 'gin_trgm_ops'},
+        ),
+    )
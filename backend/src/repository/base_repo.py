@@ -1,6 +1,58 @@
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import Select, select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from cache import invalidate
+from models.mixins import SoftDeleteMixin
+
 
 class BaseRepository:
+    # Теги кеша, которые сбрасываются при любом изменении сущности
+    cache_tags: tuple[str, ...] = ()
+
     def __init__(self, db: AsyncSession):
         self.db = db
+
+    def mark_stale(self, *tags: str):
+        """Запоминает теги кеша в сессии, они сбросятся после ближайшего коммита"""
+        self.db.info.setdefault("cache_tags", set()).update(self.cache_tags, tags)
+
+    async def commit(self, *tags: str):
+        self.mark_stale(*tags)
+        await self.db.commit()
+        await invalidate(*self.db.info.pop("cache_tags", ()))
+
+    async def soft_delete(self, obj: SoftDeleteMixin, *tags: str):
+        """Помечает строку удалённой: она пропадает из выборок, физически удалит purge"""
+        obj.deleted_at = datetime.now()
+        self.db.add(obj)
+        await self.commit(*tags)
+
+    async def purge(
+            self,
+            model: type[SoftDeleteMixin],
+            before: datetime,
+            batch_size: int = 1000
+    ) -> int:
+        """Физически удаляет пачку строк, помеченных удалёнными раньше before"""
+        batch = (
+            select(model.id)
+            .where(model.deleted_at < before)
+            .order_by(model.id)
+            .limit(batch_size)
+        )
+        result = await self.db.execute(
+            delete(model)
+            .where(model.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def stream(self, stmt: Select, batch_size: int = 1000) -> AsyncIterator[list]:
+        """Пачки строк из серверного курсора: в памяти не больше batch_size строк"""
+        result = await self.db.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
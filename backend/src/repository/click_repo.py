@@ -1,26 +1,146 @@
 import uuid
 
-from sqlalchemy import select
+from collections import Counter
+from datetime import datetime
 
-from models import Click
+from sqlalchemy import insert, select, func, text, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from models import Click, ClickRollup
 from repository.base_repo import BaseRepository
 
+BUCKETS = ("hour", "day", "week", "month")
+
 
 class ClickRepository(BaseRepository):
     async def create(
             self,
             target_id: uuid.UUID
     ):
-        print(
-            "Repo"
-        )
         click = Click(target_id=target_id)
         self.db.add(click)
-        await self.db.commit()
+        await self.commit()
         await self.db.refresh(click)
         return click
-    async def get_clicks(self, target_id: uuid.UUID):
+
+    async def create_many(
+            self,
+            clicks: list[tuple[uuid.UUID, datetime]]
+    ):
+        """
+        Многострочный INSERT пачки кликов (target_id, created_at)
+        и инкремент почасовых счётчиков в той же транзакции
+        """
+        await self.db.execute(
+            insert(Click),
+            [
+                {
+                    "target_id": target_id,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "rolled_up": True,
+                }
+                for target_id, created_at in clicks
+            ]
+        )
+
+        buckets = Counter(
+            (target_id, created_at.replace(minute=0, second=0, microsecond=0))
+            for target_id, created_at in clicks
+        )
+        # Сортировка задаёт одинаковый порядок блокировок строк у всех воркеров
+        rows = [
+            {"target_id": target_id, "hour": hour, "clicks": count}
+            for (target_id, hour), count in sorted(buckets.items())
+        ]
+        stmt = pg_insert(ClickRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ClickRollup.target_id, ClickRollup.hour],
+            set_={"clicks": ClickRollup.clicks + stmt.excluded.clicks},
+        )
+        await self.db.execute(stmt)
+        await self.commit()
+
+    async def compact(
+            self,
+            batch_size: int = 10_000
+    ) -> int:
+        """Сворачивает пачку ещё не учтённых сырых кликов в click_rollups"""
+        result = await self.db.execute(
+            text(
+                """
+                WITH batch AS (
+                    SELECT id FROM clicks
+                    WHERE NOT rolled_up
+                    ORDER BY id
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                ), marked AS (
+                    UPDATE clicks SET rolled_up = true
+                    FROM batch
+                    WHERE clicks.id = batch.id
+                    RETURNING clicks.target_id, clicks.created_at
+                ), folded AS (
+                    INSERT INTO click_rollups (target_id, hour, clicks)
+                    SELECT target_id, date_trunc('hour', created_at), count(*)
+                    FROM marked
+                    WHERE target_id IS NOT NULL AND created_at IS NOT NULL
+                    GROUP BY 1, 2
+                    ON CONFLICT (target_id, hour)
+                    DO UPDATE SET clicks = click_rollups.clicks + excluded.clicks
+                )
+                SELECT count(*) FROM marked
+                """
+            ),
+            {"limit": batch_size},
+        )
+        folded = result.scalar_one()
+        await self.commit()
+        return folded
+
+    async def prune(
+            self,
+            before: datetime,
+            batch_size: int = 10_000
+    ) -> int:
+        """Удаляет пачку уже свёрнутых сырых кликов старше before"""
         result = await self.db.execute(
-            select(Click).where(Click.target_id == target_id)
+            text(
+                """
+                DELETE FROM clicks
+                WHERE id IN (
+                    SELECT id FROM clicks
+                    WHERE rolled_up AND created_at < :before
+                    ORDER BY id
+                    LIMIT :limit
+                )
+                """
+            ),
+            {"before": before, "limit": batch_size},
         )
-        return result.scalars().all()
\ No newline at end of file
+        await self.commit()
+        return result.rowcount
+
+    async def series(
+            self,
+            target_id: uuid.UUID,
+            bucket: str = "day",
+            date_from: datetime = None,
+            date_to: datetime = None,
+    ):
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket {bucket}")
+        period = func.date_trunc(literal_column(f"'{bucket}'"), ClickRollup.hour).label("bucket")
+        stmt = (
+            select(period, func.sum(ClickRollup.clicks).label("clicks"))
+            .where(ClickRollup.target_id == target_id)
+            .group_by(period)
+            .order_by(period)
+        )
+        if date_from:
+            stmt = stmt.where(ClickRollup.hour >= date_from)
+        if date_to:
+            stmt = stmt.where(ClickRollup.hour <= date_to)
+
+        result = await self.db.execute(stmt)
+        return result.all()
@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert
 
 from models.contact import Contact
 from repository.base_repo import BaseRepository
@@ -6,6 +6,24 @@ from repository.query_builder import QueryBuilder
 
 
 class ContactRepository(BaseRepository):
+    cache_tags = ("contacts",)
+    # Колонки ответа списка (ContactResponse)
+    list_columns = (
+        Contact.id,
+        Contact.full_name,
+        Contact.email,
+        Contact.phone,
+        Contact.lead_id,
+    )
+    export_columns = (
+        Contact.id,
+        Contact.full_name,
+        Contact.email,
+        Contact.phone,
+        Contact.lead_id,
+        Contact.created_at,
+    )
+
     async def create(
             self,
             full_name,
@@ -15,23 +33,30 @@ class ContactRepository(BaseRepository):
     ):
         contact = Contact(full_name=full_name, email=email, phone=phone, lead_id=lead_id)
         self.db.add(contact)
-        await self.db.commit()
+        await self.commit()
         await self.db.refresh(contact)
         return contact
 
+    async def create_many(
+            self,
+            rows: list[dict]
+    ):
+        """Многострочный INSERT без коммита, коммитит вызывающий"""
+        await self.db.execute(insert(Contact), rows)
+        self.mark_stale()
+
     async def update(
             self,
             contact: Contact
     ):
         self.db.add(contact)
-        await self.db.commit()
+        await self.commit()
 
     async def delete(
             self,
             contact: Contact
     ):
-        await self.db.delete(contact)
-        await self.db.commit()
+        await self.soft_delete(contact)
 
     async def get_by_id(
             self,
@@ -42,6 +67,17 @@ class ContactRepository(BaseRepository):
         )
         return result.scalar_one_or_none()
 
+    def export(
+            self,
+            filters=None,
+            batch_size: int = 1000,
+    ):
+        """Колонки export_columns всех подходящих строк по id, пачками из серверного курсора"""
+        stmt = select(*self.export_columns)
+        if filters:
+            stmt = filters.apply(stmt)
+        return self.stream(stmt.order_by(Contact.id), batch_size)
+
     async def list(
             self,
             filters=None,
@@ -57,9 +93,28 @@ class ContactRepository(BaseRepository):
             sorter=sorter,
             paginator=paginator,
         )
-        stmt = await builder.build()
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
+        items = await builder.fetch()
+
+        return {
+            "contacts": items,
+            "pagination": paginator.to_dict()
+        }
+
+    async def list_rows(
+            self,
+            filters=None,
+            sorter=None,
+            paginator=None,
+    ):
+        """Как list, но только колонки list_columns в виде словарей, без ORM объектов"""
+        builder = QueryBuilder(
+            stmt=select(*self.list_columns),
+            db=self.db,
+            filters=filters,
+            sorter=sorter,
+            paginator=paginator,
+        )
+        items = await builder.fetch_dicts()
 
         return {
             "contacts": items,
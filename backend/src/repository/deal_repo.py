@@ -6,6 +6,22 @@ from repository.query_builder import QueryBuilder
 
 
 class DealRepository(BaseRepository):
+    cache_tags = ("deals",)
+    # Колонки ответа списка (DealResponse)
+    list_columns = (
+        Deal.id,
+        Deal.lead_id,
+        Deal.deal_sum,
+        Deal.status,
+    )
+    export_columns = (
+        Deal.id,
+        Deal.lead_id,
+        Deal.deal_sum,
+        Deal.status,
+        Deal.created_at,
+    )
+
     async def create(
             self,
             lead_id: int,
@@ -14,7 +30,7 @@ class DealRepository(BaseRepository):
     ):
         deal = Deal(lead_id=lead_id, deal_sum=deal_sum, status=status)
         self.db.add(deal)
-        await self.db.commit()
+        await self.commit()
         await self.db.refresh(deal)
         return deal
 
@@ -30,14 +46,24 @@ class DealRepository(BaseRepository):
             deal: Deal
     ):
         self.db.add(deal)
-        await self.db.commit()
+        await self.commit()
 
     async def delete(
             self,
             deal: Deal
     ):
-        await self.db.delete(deal)
-        await self.db.commit()
+        await self.soft_delete(deal)
+
+    def export(
+            self,
+            filters=None,
+            batch_size: int = 1000,
+    ):
+        """Колонки export_columns всех подходящих строк по id, пачками из серверного курсора"""
+        stmt = select(*self.export_columns)
+        if filters:
+            stmt = filters.apply(stmt)
+        return self.stream(stmt.order_by(Deal.id), batch_size)
 
     async def list(
             self,
@@ -54,11 +80,30 @@ class DealRepository(BaseRepository):
             sorter=sorter,
             paginator=paginator,
         )
-        stmt = await builder.build()
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
+        items = await builder.fetch()
+
+        return {
+            "deals": items,
+            "pagination": paginator.to_dict()
+        }
+
+    async def list_rows(
+            self,
+            filters=None,
+            sorter=None,
+            paginator=None,
+    ):
+        """Как list, но только колонки list_columns в виде словарей, без ORM объектов"""
+        builder = QueryBuilder(
+            stmt=select(*self.list_columns),
+            db=self.db,
+            filters=filters,
+            sorter=sorter,
+            paginator=paginator,
+        )
+        items = await builder.fetch_dicts()
 
         return {
             "deals": items,
             "pagination": paginator.to_dict()
-        }
\ No newline at end of file
+        }
@@ -1,6 +1,9 @@
 import uuid
 
-from sqlalchemy import select, asc, desc, func
+from datetime import datetime
+
+from sqlalchemy import select, insert, desc, func, true, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from filters.lead_filter import LeadFilter
 from filters.paginator import Paginator
@@ -8,10 +11,43 @@ from filters.sorter import Sorter
 from models import Lead, LeadComment
 from models.lead import StatusEnum
 from repository.base_repo import BaseRepository
+from repository.lead_status_repo import LeadStatusRepository, StatusDeltas
 from repository.query_builder import QueryBuilder
 
 
 class LeadRepository(BaseRepository):
+    cache_tags = ("leads",)
+    # Колонки ответа списка (LeadResponse)
+    list_columns = (
+        Lead.id,
+        Lead.full_name,
+        Lead.email,
+        Lead.phone,
+        Lead.company_name,
+        Lead.company_info,
+        Lead.status,
+        Lead.target_id,
+    )
+    export_columns = (
+        Lead.id,
+        Lead.full_name,
+        Lead.email,
+        Lead.phone,
+        Lead.company_name,
+        Lead.company_info,
+        Lead.status,
+        Lead.target_id,
+        Lead.created_at,
+    )
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        self.status_repo = LeadStatusRepository(db)
+
+    @staticmethod
+    def target_tags(lead: Lead) -> tuple[str, ...]:
+        return (f"target:{lead.target_id}",) if lead.target_id else ()
+
     async def create(
             self,
             full_name: str,
@@ -34,8 +70,38 @@ class LeadRepository(BaseRepository):
         self.db.add(lead)
         await self.db.flush()
         await self.db.refresh(lead)
+        await self.status_repo.created([(lead.id, lead.status, lead.target_id)])
+        self.mark_stale(*self.target_tags(lead))
         return lead
 
+    async def create_many(
+            self,
+            rows: list[dict]
+    ) -> list[int]:
+        """Многострочный INSERT ... RETURNING id, id возвращаются в порядке rows"""
+        result = await self.db.execute(
+            insert(Lead).returning(Lead.id, sort_by_parameter_order=True),
+            rows,
+        )
+        lead_ids = list(result.scalars().all())
+        await self.status_repo.created([
+            (lead_id, StatusEnum(row.get("status") or StatusEnum.NEW), row.get("target_id"))
+            for lead_id, row in zip(lead_ids, rows)
+        ])
+        self.mark_stale(*{f"target:{row['target_id']}" for row in rows if row.get("target_id")})
+        return lead_ids
+
+    def export(
+            self,
+            filters=None,
+            batch_size: int = 1000,
+    ):
+        """Колонки export_columns всех подходящих строк по id, пачками из серверного курсора"""
+        stmt = select(*self.export_columns)
+        if filters:
+            stmt = filters.apply(stmt)
+        return self.stream(stmt.order_by(Lead.id), batch_size)
+
     async def list(
             self,
             filters: LeadFilter = None,
@@ -52,9 +118,28 @@ class LeadRepository(BaseRepository):
             sorter=sorter,
             paginator=paginator,
         )
-        stmt = await builder.build()
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
+        items = await builder.fetch()
+
+        return {
+            "leads": items,
+            "pagination": paginator.to_dict()
+        }
+
+    async def list_rows(
+            self,
+            filters=None,
+            sorter=None,
+            paginator=None,
+    ):
+        """Как list, но только колонки list_columns в виде словарей, без ORM объектов"""
+        builder = QueryBuilder(
+            stmt=select(*self.list_columns),
+            db=self.db,
+            filters=filters,
+            sorter=sorter,
+            paginator=paginator,
+        )
+        items = await builder.fetch_dicts()
 
         return {
             "leads": items,
@@ -70,35 +155,79 @@ class LeadRepository(BaseRepository):
         )
         return result.scalar_one_or_none()
 
+    async def track_changes(
+            self,
+            lead: Lead
+    ) -> tuple[str, ...]:
+        """
+        Смена статуса или таргета ещё не сохранённого лида: запись в журнал переходов
+        и перенос счётчиков. Коммитится вместе с самим лидом.
+        Возвращает теги кеша старого и нового таргета.
+        """
+        state = inspect(lead).attrs
+        status, target = state.status.history, state.target_id.history
+        old_status = status.deleted[0] if status.deleted else lead.status
+        old_target = target.deleted[0] if target.deleted else lead.target_id
+        tags = tuple(dict.fromkeys(
+            f"target:{target_id}" for target_id in (old_target, lead.target_id) if target_id
+        ))
+        status_changed = old_status != lead.status
+        if not status_changed and old_target == lead.target_id:
+            return tags
+
+        deltas = StatusDeltas()
+        if status_changed:
+            now = datetime.now()
+            since = lead.status_changed_at or lead.created_at or now
+            seconds = max(int((now - since).total_seconds()), 0)
+            await self.status_repo.record([{
+                "lead_id": lead.id,
+                "from_status": old_status,
+                "to_status": lead.status,
+                "changed_at": now,
+                "seconds": seconds,
+            }])
+            lead.status_changed_at = now
+            deltas.add(old_target, old_status, leads=-1, exited=1, seconds=seconds)
+            deltas.add(lead.target_id, lead.status, leads=1, entered=1)
+        else:
+            deltas.add(old_target, old_status, leads=-1)
+            deltas.add(lead.target_id, lead.status, leads=1)
+        await self.status_repo.bump(deltas)
+        return tags
+
     async def delete(
             self,
             lead: Lead
     ):
-        await self.db.delete(lead)
-        await self.db.commit()
+        deltas = StatusDeltas()
+        deltas.add(lead.target_id, lead.status, leads=-1)
+        await self.status_repo.bump(deltas)
+        await self.soft_delete(lead, *self.target_tags(lead))
 
     async def update(
             self,
             lead: Lead
     ):
+        tags = await self.track_changes(lead)
         self.db.add(lead)
-        await self.db.commit()
+        await self.commit(*tags)
 
 
 class LeadCommentRepository(BaseRepository):
     async def create(
             self,
             comment: str,
-            lead: Lead,
+            lead_id: int,
             user_id: int
     ):
         comment = LeadComment(
             comment=comment,
-            lead_id=lead.id,
+            lead_id=lead_id,
             user_id=user_id
         )
         self.db.add(comment)
-        await self.db.commit()
+        await self.commit()
         await self.db.refresh(comment)
         return comment
 
@@ -107,32 +236,72 @@ class LeadCommentRepository(BaseRepository):
             comment: LeadComment
     ):
         self.db.add(comment)
-        await self.db.commit()
+        await self.commit()
         await self.db.refresh(comment)
 
     async def delete(
             self,
             comment: LeadComment
     ):
-        await self.db.delete(comment)
-        await self.db.commit()
+        await self.soft_delete(comment)
 
     async def get_by_id(
             self,
             lead_comment_id: int
     ):
         result = await self.db.execute(
-            select(LeadComment).where(LeadComment.comment_id == lead_comment_id)
+            select(LeadComment).where(LeadComment.id == lead_comment_id)
         )
         return result.scalar_one_or_none()
 
+    async def latest(
+            self,
+            lead_ids: list[int],
+            size: int = 1
+    ) -> list[dict]:
+        """
+        Последние size комментариев каждого лида одним запросом:
+        LATERAL подзапрос на лид идёт по индексу (lead_id, created_at, id)
+        """
+        if not lead_ids:
+            return []
+        leads = select(Lead.id).where(Lead.id.in_(lead_ids)).subquery()
+        comments = (
+            select(
+                LeadComment.id,
+                LeadComment.lead_id,
+                LeadComment.user_id,
+                LeadComment.comment,
+                LeadComment.created_at,
+            )
+            .where(LeadComment.lead_id == leads.c.id)
+            .order_by(desc(LeadComment.created_at), desc(LeadComment.id))
+            .limit(size)
+            .lateral()
+        )
+        result = await self.db.execute(
+            select(comments).select_from(leads).join(comments, true())
+        )
+        return [dict(row) for row in result.mappings()]
+
     async def list(
             self,
             lead_id: int,
-            sort_order: str = "desc"
+            sorter=None,
+            paginator=None,
     ):
-        stmt = select(LeadComment).where(LeadComment.lead_id == lead_id).order_by(
-            asc(Lead.created_at) if sort_order == "asc" else desc(Lead.created_at)
+        stmt = select(LeadComment).where(LeadComment.lead_id == lead_id)
+
+        builder = QueryBuilder(
+            stmt=stmt,
+            db=self.db,
+            filters=None,
+            sorter=sorter,
+            paginator=paginator,
         )
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
+        items = await builder.fetch()
+
+        return {
+            "comments": items,
+            "pagination": paginator.to_dict()
+        }
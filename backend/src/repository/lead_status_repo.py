@@ -0,0 +1,127 @@
+import uuid
+
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import select, insert, update, func, text, cast, BigInteger
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from models import Lead, LeadStatusTransition, LeadStatusCounter
+from models.lead import StatusEnum
+from models.lead_status import NO_TARGET
+from repository.base_repo import BaseRepository
+
+COUNTER_FIELDS = ("leads", "entered", "exited", "seconds")
+
+
+class StatusDeltas(dict):
+    """Приращения счётчиков: (target_key, status) -> Counter полей COUNTER_FIELDS"""
+
+    def add(self, target_id: uuid.UUID | None, status: StatusEnum | None, **fields: int):
+        if status is None:
+            return
+        self.setdefault((target_id or NO_TARGET, status), Counter()).update(fields)
+
+
+class LeadStatusRepository(BaseRepository):
+    async def record(
+            self,
+            transitions: list[dict]
+    ):
+        """Добавляет переходы (lead_id, from_status, to_status, changed_at, seconds) в журнал"""
+        if transitions:
+            await self.db.execute(insert(LeadStatusTransition), transitions)
+
+    async def bump(
+            self,
+            deltas: StatusDeltas
+    ):
+        """Инкремент счётчиков одним UPSERT в текущей транзакции"""
+        # Сортировка задаёт одинаковый порядок блокировок строк у всех воркеров
+        rows = [
+            {
+                "target_key": target_key,
+                "status": status,
+                **{field: counter[field] for field in COUNTER_FIELDS},
+            }
+            for (target_key, status), counter in sorted(
+                deltas.items(), key=lambda item: (str(item[0][0]), item[0][1].value)
+            )
+            if any(counter.values())
+        ]
+        if not rows:
+            return
+        stmt = pg_insert(LeadStatusCounter).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LeadStatusCounter.target_key, LeadStatusCounter.status],
+            set_={
+                field: getattr(LeadStatusCounter, field) + getattr(stmt.excluded, field)
+                for field in COUNTER_FIELDS
+            },
+        )
+        await self.db.execute(stmt)
+
+    async def created(
+            self,
+            leads: list[tuple[int, StatusEnum, uuid.UUID | None]]
+    ):
+        """Учитывает новые лиды (id, status, target_id): переход из NULL и +1 к счётчику"""
+        now = datetime.now()
+        deltas = StatusDeltas()
+        for _, status, target_id in leads:
+            deltas.add(target_id, status, leads=1, entered=1)
+        await self.record([
+            {"lead_id": lead_id, "from_status": None, "to_status": status, "changed_at": now, "seconds": 0}
+            for lead_id, status, _ in leads
+        ])
+        await self.bump(deltas)
+
+    async def history(
+            self,
+            lead_id: int
+    ):
+        result = await self.db.execute(
+            select(LeadStatusTransition)
+            .where(LeadStatusTransition.lead_id == lead_id)
+            .order_by(LeadStatusTransition.changed_at, LeadStatusTransition.id)
+        )
+        return result.scalars().all()
+
+    async def totals(
+            self,
+            target_id: uuid.UUID = None
+    ):
+        """Счётчики по статусам: строка на статус таргета или сумма по всем таргетам"""
+        stmt = select(
+            LeadStatusCounter.status,
+            # sum(bigint) в Postgres — numeric: без cast счётчики пришли бы Decimal
+            *[cast(func.sum(getattr(LeadStatusCounter, field)), BigInteger).label(field) for field in COUNTER_FIELDS],
+        ).group_by(LeadStatusCounter.status)
+        if target_id:
+            stmt = stmt.where(LeadStatusCounter.target_key == target_id)
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    async def rebuild(self):
+        """
+        Пересчитывает текущее число лидов (leads) по таблице leads.
+        Нужен после purge таргетов: ON DELETE SET NULL переносит их лидов к NO_TARGET в обход счётчиков.
+        """
+        # Пишущие транзакции ждут пересчёта и применяют свои приращения поверх него
+        await self.db.execute(text("LOCK TABLE lead_status_counters IN EXCLUSIVE MODE"))
+        await self.db.execute(update(LeadStatusCounter).values(leads=0))
+
+        target_key = func.coalesce(Lead.target_id, NO_TARGET)
+        actual = (
+            select(target_key, Lead.status, func.count(Lead.id))
+            # INSERT ... SELECT не проходит через фильтр мягкого удаления
+            .where(Lead.status.isnot(None), Lead.deleted_at.is_(None))
+            .group_by(Lead.target_id, Lead.status)
+        )
+        stmt = pg_insert(LeadStatusCounter).from_select(["target_key", "status", "leads"], actual)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LeadStatusCounter.target_key, LeadStatusCounter.status],
+            set_={"leads": stmt.excluded.leads},
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
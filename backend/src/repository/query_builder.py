@@ -1,10 +1,42 @@
-from sqlalchemy import Select, select, func
+from sqlalchemy import Select, select, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from filters.paginator import Paginator
 from filters.sorter import Sorter
 
 
+class ExactCounter:
+    """Точный COUNT(*) по подзапросу отфильтрованного запроса без ORDER BY"""
+
+    async def count(self, db: AsyncSession, stmt: Select) -> tuple[int, bool]:
+        subquery = stmt.order_by(None).limit(None).offset(None).subquery()
+        result = await db.execute(select(func.count()).select_from(subquery))
+        return result.scalar_one(), False
+
+
+class EstimatedCounter(ExactCounter):
+    """
+    Оценка количества строк по статистике планировщика (pg_class.reltuples).
+    Работает только для запросов без WHERE по одной таблице,
+    иначе откатывается к точному подсчёту.
+    """
+
+    async def count(self, db: AsyncSession, stmt: Select) -> tuple[int, bool]:
+        froms = stmt.get_final_froms()
+        if stmt.whereclause is not None or len(froms) != 1 or not hasattr(froms[0], "fullname"):
+            return await super().count(db, stmt)
+
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": froms[0].fullname},
+        )
+        estimate = result.scalar_one_or_none()
+        # reltuples = -1, если таблицу ещё ни разу не анализировали
+        if estimate is None or estimate < 0:
+            return await super().count(db, stmt)
+        return estimate, True
+
+
 class QueryBuilder:
     def __init__(
             self,
@@ -12,19 +44,37 @@ class QueryBuilder:
             db: AsyncSession,
             filters,
             sorter: Sorter,
-            paginator: Paginator
+            paginator: Paginator,
+            counter: ExactCounter = None,
+            columns: list = None,
     ):
         self.stmt = stmt
         self.db = db
         self.filters = filters
         self.sorter = sorter
         self.paginator = paginator
+        self.counter = counter
+        # Колонки, которые добавляются уже после подсчёта total (агрегаты и т.п.)
+        self.columns = columns or []
+
+    def _get_counter(self) -> ExactCounter:
+        if self.counter:
+            return self.counter
+        if self.paginator and self.paginator.estimate_total:
+            return EstimatedCounter()
+        return ExactCounter()
 
     async def build(self):
-        stmt = self.filters.apply(self.stmt)
+        stmt = self.stmt
+        if self.filters:
+            stmt = self.filters.apply(stmt)
 
-        result = await self.db.execute(stmt)
-        self.paginator.set_total(len(result.scalars().all()))
+        if self.paginator and self.paginator.counts_total:
+            total, estimated = await self._get_counter().count(self.db, stmt)
+            self.paginator.set_total(total, estimated)
+
+        if self.columns:
+            stmt = stmt.add_columns(*self.columns)
 
         if self.sorter:
             stmt = self.sorter.apply(stmt)
@@ -33,3 +83,24 @@ class QueryBuilder:
             stmt = self.paginator.apply(stmt)
 
         return stmt
+
+    async def fetch(self, scalars: bool = True) -> list:
+        stmt = await self.build()
+        result = await self.db.execute(stmt)
+        rows = result.all()
+
+        if self.paginator:
+            rows = self.paginator.collect(rows)
+
+        if not scalars:
+            return rows
+        return [row[0] for row in rows]
+
+    async def fetch_dicts(self) -> list[dict]:
+        """
+        Строки как словари выбранных колонок, без ORM объектов.
+        Служебные колонки пагинации (_cursor_*) идут в конце и отбрасываются.
+        """
+        keys = [col.key for col in self.stmt.selected_columns] + [col.key for col in self.columns]
+        rows = await self.fetch(scalars=False)
+        return [dict(zip(keys, row)) for row in rows]
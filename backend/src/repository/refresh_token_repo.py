@@ -0,0 +1,113 @@
+from datetime import datetime
+
+from sqlalchemy import select, update, delete, func
+
+from models.refresh_token import RefreshToken
+from repository.base_repo import BaseRepository
+
+
+class RefreshTokenRepository(BaseRepository):
+    async def create(
+            self,
+            jti: str,
+            family: str,
+            user_id: int,
+            expires_at: datetime,
+    ):
+        self.db.add(RefreshToken(
+            jti=jti,
+            family=family,
+            user_id=user_id,
+            expires_at=expires_at,
+        ))
+        await self.db.flush()
+
+    async def get(
+            self,
+            jti: str
+    ):
+        result = await self.db.execute(
+            select(RefreshToken).where(RefreshToken.jti == jti)
+        )
+        return result.scalar_one_or_none()
+
+    async def use(
+            self,
+            jti: str
+    ):
+        """
+        Отмечает токен обменянным, только если он ещё не использован и не отозван.
+        Условный UPDATE: из двух одновременных обменов одного токена пройдёт один.
+        """
+        now = datetime.now()
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti == jti,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(used_at=now)
+            .returning(RefreshToken.family, RefreshToken.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.one_or_none()
+
+    async def __revoke(self, *criteria) -> list[tuple[str, datetime]]:
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(*criteria, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now())
+            .returning(RefreshToken.family, RefreshToken.expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        await self.db.commit()
+        return rows
+
+    async def revoke_family(
+            self,
+            family: str
+    ) -> list[tuple[str, datetime]]:
+        return await self.__revoke(RefreshToken.family == family)
+
+    async def revoke_user(
+            self,
+            user_id: int
+    ) -> list[tuple[str, datetime]]:
+        return await self.__revoke(RefreshToken.user_id == user_id)
+
+    async def revoked_since(
+            self,
+            since: datetime = None
+    ) -> list[tuple[str, datetime]]:
+        """Отозванные и ещё не истёкшие цепочки: (family, самый поздний expires_at)"""
+        stmt = (
+            select(RefreshToken.family, func.max(RefreshToken.expires_at))
+            .where(RefreshToken.revoked_at.isnot(None), RefreshToken.expires_at > datetime.now())
+            .group_by(RefreshToken.family)
+        )
+        if since:
+            stmt = stmt.where(RefreshToken.revoked_at >= since)
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    async def prune(
+            self,
+            before: datetime,
+            batch_size: int = 1000
+    ) -> int:
+        """Удаляет пачку истёкших токенов"""
+        batch = (
+            select(RefreshToken.jti)
+            .where(RefreshToken.expires_at < before)
+            .limit(batch_size)
+        )
+        result = await self.db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.jti.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
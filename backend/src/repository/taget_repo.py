@@ -1,20 +1,28 @@
 import uuid
 
-from sqlalchemy import select
+from datetime import datetime
 
+from sqlalchemy import select, func, literal, literal_column, cast, null, union_all, String, BigInteger, Numeric
+
+from models.click import ClickRollup
+from models.deal import Deal
+from models.lead import Lead
+from models.lead_status import LeadStatusCounter
 from models.target import TargetCompany
 from repository.base_repo import BaseRepository
 from repository.query_builder import QueryBuilder
 
 
 class TargetCompanyRepository(BaseRepository):
+    cache_tags = ("targets",)
+
     async def create(
             self,
             name: str
     ):
         target = TargetCompany(name=name)
         self.db.add(target)
-        await self.db.commit()
+        await self.commit()
         await self.db.refresh(target)
         return target
 
@@ -29,6 +37,131 @@ class TargetCompanyRepository(BaseRepository):
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    def stats_columns() -> list:
+        """
+        Количество кликов (из почасовых click_rollups) и лидов таргета (из lead_status_counters)
+        коррелированными подзапросами: считаются только для строк текущей страницы
+        """
+        # sum(bigint) в Postgres — numeric (Decimal), без cast в JSON уйдёт 5.0 вместо 5
+        clicks = (
+            select(cast(func.coalesce(func.sum(ClickRollup.clicks), 0), BigInteger))
+            .where(ClickRollup.target_id == TargetCompany.id)
+            .correlate(TargetCompany)
+            .scalar_subquery()
+        )
+        leads = (
+            select(cast(func.coalesce(func.sum(LeadStatusCounter.leads), 0), BigInteger))
+            .where(LeadStatusCounter.target_key == TargetCompany.id)
+            .correlate(TargetCompany)
+            .scalar_subquery()
+        )
+        return [clicks.label("clicks"), leads.label("leads")]
+
+    async def get_with_stats(
+            self,
+            target_company_id: uuid.UUID
+    ):
+        result = await self.db.execute(
+            select(TargetCompany, *self.stats_columns()).where(
+                TargetCompany.id == target_company_id
+            )
+        )
+        return result.one_or_none()
+
+    async def list_with_stats(
+            self,
+            filters=None,
+            sorter=None,
+            paginator=None,
+    ):
+        stmt = select(TargetCompany.id, TargetCompany.name, TargetCompany.is_active)
+
+        builder = QueryBuilder(
+            stmt=stmt,
+            db=self.db,
+            filters=filters,
+            sorter=sorter,
+            paginator=paginator,
+            columns=self.stats_columns(),
+        )
+        rows = await builder.fetch_dicts()
+
+        return {
+            "target_companies": rows,
+            "pagination": paginator.to_dict()
+        }
+
+    async def funnel(
+            self,
+            target_ids: list[uuid.UUID] = None,
+            bucket: str = "day",
+            date_from: datetime = None,
+            date_to: datetime = None,
+    ):
+        """
+        Воронка клики → лиды → сделки одним запросом (UNION ALL трёх агрегатов).
+        Строки: target_id, bucket, kind (click/lead/deal), status, total, amount.
+        """
+        if bucket not in ("day", "week"):
+            raise ValueError(f"Unknown bucket {bucket}")
+
+        def period(column):
+            return func.date_trunc(literal_column(f"'{bucket}'"), column)
+
+        def scoped(stmt, target_column, time_column):
+            if target_ids:
+                stmt = stmt.where(target_column.in_(target_ids))
+            else:
+                stmt = stmt.where(target_column.isnot(None))
+            if date_from:
+                stmt = stmt.where(time_column >= date_from)
+            if date_to:
+                stmt = stmt.where(time_column <= date_to)
+            return stmt
+
+        clicks = scoped(
+            select(
+                ClickRollup.target_id.label("target_id"),
+                period(ClickRollup.hour).label("bucket"),
+                literal_column("'click'", String).label("kind"),
+                cast(null(), String).label("status"),
+                cast(func.sum(ClickRollup.clicks), BigInteger).label("total"),
+                cast(literal(0), Numeric(16, 2)).label("amount"),
+            ).group_by(ClickRollup.target_id, period(ClickRollup.hour)),
+            ClickRollup.target_id,
+            ClickRollup.hour,
+        )
+        leads = scoped(
+            select(
+                Lead.target_id,
+                period(Lead.created_at),
+                literal_column("'lead'", String),
+                cast(Lead.status, String),
+                cast(func.count(Lead.id), BigInteger),
+                cast(literal(0), Numeric(16, 2)),
+            ).group_by(Lead.target_id, period(Lead.created_at), Lead.status),
+            Lead.target_id,
+            Lead.created_at,
+        )
+        deals = scoped(
+            select(
+                Lead.target_id,
+                period(Deal.created_at),
+                literal_column("'deal'", String),
+                cast(Deal.status, String),
+                cast(func.count(Deal.id), BigInteger),
+                func.coalesce(func.sum(Deal.deal_sum), 0),
+            )
+            .join(Lead, Lead.id == Deal.lead_id)
+            .group_by(Lead.target_id, period(Deal.created_at), Deal.status),
+            Lead.target_id,
+            Deal.created_at,
+        )
+
+        result = await self.db.execute(union_all(clicks, leads, deals))
+        return result.all()
+
     async def list(
             self,
             filters=None,
@@ -44,9 +177,7 @@ class TargetCompanyRepository(BaseRepository):
             sorter=sorter,
             paginator=paginator,
         )
-        stmt = await builder.build()
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
+        items = await builder.fetch()
 
         return {
             "target_companies": items,
@@ -58,11 +189,11 @@ class TargetCompanyRepository(BaseRepository):
             target_company: TargetCompany
     ):
         self.db.add(target_company)
-        await self.db.commit()
+        await self.commit(f"target:{target_company.id}")
 
     async def delete(
             self,
             target_company: TargetCompany
     ):
-        await self.db.delete(target_company)
-        await self.db.commit()
+        # target_id у лидов обнулится через ON DELETE SET NULL только при purge
+        await self.soft_delete(target_company, f"target:{target_company.id}", "leads")
@@ -1,37 +1,92 @@
-from sqlalchemy import select
+from datetime import datetime
 
+from sqlalchemy import select, update, values, column, func, Integer, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from filters.paginator import CursorPaginator
+from filters.sorter import Sorter
+from filters.telegram_filter import TelegramFilter
 from models.telegram import TelegramUser
 from repository.base_repo import BaseRepository
 from repository.query_builder import QueryBuilder
 
 
 class TelegramRepository(BaseRepository):
-    async def create(
+    cache_tags = ("telegram",)
+    # Колонки ответа списка и выгрузки (TelegramUserResponse)
+    list_columns = (
+        TelegramUser.user_id,
+        TelegramUser.lang,
+        TelegramUser.company_id,
+        TelegramUser.last_interaction,
+    )
+
+    async def upsert_many(
+            self,
+            users: list[dict]
+    ) -> list[TelegramUser]:
+        """
+        Регистрация пользователей или обновление lang у существующих
+        одним INSERT ... ON CONFLICT (user_id) DO UPDATE ... RETURNING
+        """
+        # Одна строка не может попасть в ON CONFLICT дважды — оставляем последнюю по user_id
+        rows = {user["user_id"]: user for user in users}
+        if not rows:
+            return []
+        stmt = pg_insert(TelegramUser).values([rows[user_id] for user_id in sorted(rows)])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TelegramUser.user_id],
+            set_={
+                "lang": stmt.excluded.lang,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(TelegramUser)
+        result = await self.db.execute(stmt, execution_options={"populate_existing": True})
+        saved = list(result.scalars().all())
+        await self.commit()
+        return saved
+
+    async def upsert(
             self,
             user_id,
             lang,
     ):
-        user = TelegramUser(
-            user_id=user_id,
-            lang=lang,
-        )
-        self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
-        return user
+        users = await self.upsert_many([{"user_id": user_id, "lang": lang}])
+        return users[0]
 
     async def update(
             self,
             telegram_user: TelegramUser
     ):
         self.db.add(telegram_user)
-        await self.db.commit()
+        await self.commit()
 
     async def delete(
             self,
             telegram_user: TelegramUser
     ):
         await self.db.delete(telegram_user)
+        await self.commit()
+
+    async def touch_many(
+            self,
+            interactions: list[tuple[int, datetime]]
+    ):
+        """
+        last_interaction пачки пользователей одним UPDATE ... FROM (VALUES ...).
+        Время не откатывается назад, если другой воркер уже записал более позднее.
+        """
+        batch = values(
+            column("user_id", Integer),
+            column("last_interaction", DateTime),
+            name="batch",
+        ).data(interactions)
+        await self.db.execute(
+            update(TelegramUser)
+            .where(TelegramUser.user_id == batch.c.user_id)
+            .values(last_interaction=func.greatest(TelegramUser.last_interaction, batch.c.last_interaction))
+            .execution_options(synchronize_session=False)
+        )
         await self.db.commit()
 
     async def get(
@@ -43,5 +98,33 @@ class TelegramRepository(BaseRepository):
         )
         return result.scalar_one_or_none()
 
-    async def list(self):
-        pass
+    def iter_batches(
+            self,
+            filters: TelegramFilter = None,
+            batch_size: int = 1000,
+    ):
+        """Колонки list_columns всех подходящих пользователей по user_id, пачками из серверного курсора"""
+        stmt = select(*self.list_columns)
+        if filters:
+            stmt = filters.apply(stmt)
+        return self.stream(stmt.order_by(TelegramUser.user_id), batch_size)
+
+    async def list(
+            self,
+            filters: TelegramFilter = None,
+            sorter: Sorter = None,
+            paginator: CursorPaginator = None,
+    ):
+        builder = QueryBuilder(
+            stmt=select(*self.list_columns),
+            db=self.db,
+            filters=filters,
+            sorter=sorter,
+            paginator=paginator,
+        )
+        items = await builder.fetch_dicts()
+
+        return {
+            "users": items,
+            "pagination": paginator.to_dict()
+        }
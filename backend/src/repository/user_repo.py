@@ -6,6 +6,8 @@ from repository.query_builder import QueryBuilder
 
 
 class UserRepository(BaseRepository):
+    cache_tags = ("users",)
+
     async def create(
             self,
             full_name: str,
@@ -20,7 +22,7 @@ class UserRepository(BaseRepository):
             is_superuser=is_superuser
         )
         self.db.add(user)
-        await self.db.commit()
+        await self.commit()
         await self.db.refresh(user)
         return user
 
@@ -29,7 +31,7 @@ class UserRepository(BaseRepository):
             user: User
     ) -> None:
         self.db.add(user)
-        await self.db.commit()
+        await self.commit(f"user:{user.id}")
         return user
 
     async def delete(
@@ -37,7 +39,7 @@ class UserRepository(BaseRepository):
             user: User
     ) -> None:
         await self.db.delete(user)
-        await self.db.commit()
+        await self.commit(f"user:{user.id}")
 
     async def get_by_id(
             self,
@@ -72,9 +74,7 @@ class UserRepository(BaseRepository):
             sorter=sorter,
             paginator=paginator,
         )
-        stmt = await builder.build()
-        result = await self.db.execute(stmt)
-        items = result.scalars().all()
+        items = await builder.fetch()
 
         return {
             "users": items,
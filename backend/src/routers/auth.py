@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from starlette import status
 
-from dependencies import get_db, get_current_user
+from dependencies import get_db, get_current_user, oauth2_scheme
 from models.user import User
 
 from schemas.auth import TokenResponse, TokenRequest, ChangePasswordRequest
@@ -57,6 +57,41 @@ async def refresh(
     return token
 
 
+@router.post(
+    "/logout",
+    summary="Выход из Текущей Сессии",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        status.HTTP_204_NO_CONTENT: {"description": "Logged Out"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Invalid Token", "model": ExceptionResponse},
+    }
+)
+async def logout(
+        token: str = Depends(oauth2_scheme),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = AuthManager(db)
+    await manager.logout(token)
+
+
+@router.post(
+    "/logout-all",
+    summary="Выход из Всех Сессий",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        status.HTTP_204_NO_CONTENT: {"description": "Logged Out"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Invalid Token", "model": ExceptionResponse},
+    }
+)
+async def logout_all(
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = AuthManager(db)
+    await manager.logout_all(user)
+
+
 @router.get(
     "/me",
     summary="Получение Текущей Информации Пользователя",
@@ -1,10 +1,8 @@
 import uuid
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter
 from starlette.responses import RedirectResponse
 
-from dependencies import get_db
 from services.click_manager import ClickManager
 
 router = APIRouter(
@@ -18,11 +16,9 @@ router = APIRouter(
 )
 async def click_target(
         target_id: uuid.UUID,
-        db: AsyncSession = Depends(get_db)
 ):
-    manager = ClickManager(db)
+    manager = ClickManager()
 
     await manager.create(target_id)
 
     return RedirectResponse(url=f"localhost:3000/leads/?target_id={target_id}")
-
@@ -1,11 +1,16 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_current_user, get_db
 from models.user import User
-from schemas.base import Sort
-from schemas.contact import ContactRequest
+from schemas.base import SearchSort, PaginationMode, ExportFormat
+from schemas.contact import ContactRequest, ContactListResponse
+from serializers import FastJSONResponse
 from services.contact_manager import ContactManager
+from services.export import MEDIA_TYPES
 
 router = APIRouter(
     tags=["contact"],
@@ -24,12 +29,15 @@ async def create_contact(
     return contact
 
 
-@router.get("/")
+@router.get("/", response_model=ContactListResponse)
 async def get_contacts(
         query: str = Query(None, alias="q"),
-        sort_by: list[Sort] = Query(default=Sort.desc, description="Сортировка"),
+        sort_by: list[SearchSort] = Query(default=SearchSort.desc, description="Сортировка"),
         page: int = Query(default=1, ge=1, description="Страница"),
         size: int = Query(default=1, ge=1, description="Размер Страницы"),
+        estimate_total: bool = Query(default=False, description="Приблизительный Подсчёт Общего Количества"),
+        pagination: PaginationMode = Query(default=PaginationMode.page, description="Режим Пагинации"),
+        cursor: str = Query(default=None, description="Курсор Страницы"),
         user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
 ):
@@ -39,9 +47,35 @@ async def get_contacts(
         query=query,
         page=page,
         size=size,
+        estimate_total=estimate_total,
+        pagination=pagination,
+        cursor=cursor,
         sorts=sort_by
     )
-    return contacts
+    return FastJSONResponse(contacts)
+
+
+@router.get("/export")
+async def export_contacts(
+        query: str = Query(None, alias="q"),
+        created_from: datetime = Query(default=None, description="Фильтр по Мин Созданной"),
+        created_to: datetime = Query(default=None, description="Фильтр по Мак Созданной"),
+        export_format: ExportFormat = Query(default=ExportFormat.csv, alias="format", description="Формат"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = ContactManager(db)
+    body = manager.export(
+        query=query,
+        created_from=created_from,
+        created_to=created_to,
+        export_format=export_format,
+    )
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{export_format.value}"'},
+    )
 
 
 @router.get("/{contact_id}")
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from fastapi import APIRouter, Query, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_current_user, get_db
@@ -8,10 +9,12 @@ from dependencies import get_current_user, get_db
 from models.deal import DealStatusEnum
 from models.user import User
 
-from schemas.base import Sort
-from schemas.deal import DealRequest
+from schemas.base import Sort, PaginationMode, ExportFormat
+from schemas.deal import DealRequest, ListDealResponse
+from serializers import FastJSONResponse
 
 from services.deal_manager import DealManager
+from services.export import MEDIA_TYPES
 
 router = APIRouter(
     tags=["deal"],
@@ -20,7 +23,8 @@ router = APIRouter(
 
 
 @router.get(
-    "/"
+    "/",
+    response_model=ListDealResponse,
 )
 async def get_deals(
         deal_id: int = Query(None, alias="q"),
@@ -30,6 +34,9 @@ async def get_deals(
         sort_by: list[Sort] = Query(default=Sort.desc, description="Сортировка"),
         page: int = Query(default=1, ge=1, description="Страница"),
         size: int = Query(default=1, ge=1, description="Размер Страницы"),
+        estimate_total: bool = Query(default=False, description="Приблизительный Подсчёт Общего Количества"),
+        pagination: PaginationMode = Query(default=PaginationMode.page, description="Режим Пагинации"),
+        cursor: str = Query(default=None, description="Курсор Страницы"),
         user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
 ):
@@ -42,8 +49,40 @@ async def get_deals(
         sorts=sort_by,
         page=page,
         size=size,
+        estimate_total=estimate_total,
+        pagination=pagination,
+        cursor=cursor,
+    )
+    return FastJSONResponse(response)
+
+
+@router.get(
+    "/export"
+)
+async def export_deals(
+        deal_id: int = Query(None, alias="q"),
+        status: list[DealStatusEnum] = Query(default=None, description="Фильтр по Статусу"),
+        created_from: datetime = Query(default=None, description="Фильтр по Мин Созданной"),
+        created_to: datetime = Query(default=None, description="Фильтр по Мак Созданной"),
+        lead_query: str = Query(default=None, alias="lead_q", description="Поиск по Лиду"),
+        export_format: ExportFormat = Query(default=ExportFormat.csv, alias="format", description="Формат"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = DealManager(db)
+    body = manager.export_deals(
+        deal_id=deal_id,
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+        lead_query=lead_query,
+        export_format=export_format,
+    )
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="deals.{export_format.value}"'},
     )
-    return response
 
 
 @router.get(
@@ -1,7 +1,8 @@
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, Query, Path, Body
+from fastapi import APIRouter, Depends, Query, Path, Body, Request
+from fastapi.responses import StreamingResponse
 
 from starlette import status as status_codes
 
@@ -12,9 +13,14 @@ from dependencies import get_db, get_current_user
 from models.lead import StatusEnum
 from models.user import User
 
-from schemas.base import Sort
+from schemas.base import Sort, PaginationMode, ExportFormat
 from schemas.lead import LeadRequest, ChangeStatusRequest, LeadCommentRequest, LeadResponse, ListLeadResponse, \
-    ListLeadCommentResponse, LeadCommentResponse
+    ListLeadCommentResponse, LeadCommentResponse, LeadImportFormat, LeadImportResponse, LeadStatusHistoryResponse, \
+    LeadStatusCountsResponse, LeadTimeInStatusListResponse
+
+from serializers import FastJSONResponse
+from services.export import MEDIA_TYPES
+from services.lead_import import iter_records
 
 from services.lead_manager import LeadManager
 
@@ -43,6 +49,31 @@ async def create_lead(
     return response
 
 
+@router.post(
+    "/bulk",
+    summary="Массовая Загрузка Лидов",
+    status_code=status_codes.HTTP_200_OK,
+    response_model=LeadImportResponse,
+)
+async def import_leads(
+        request: Request,
+        import_format: LeadImportFormat = Query(default=None, alias="format", description="ndjson или csv, по умолчанию по Content-Type"),
+        target_id: uuid.UUID = Query(default=None, description="Таргет для строк без target_id"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    if import_format is None:
+        content_type = request.headers.get("content-type", "")
+        import_format = LeadImportFormat.csv if "csv" in content_type else LeadImportFormat.ndjson
+
+    manager = LeadManager(db)
+    response = await manager.import_leads(
+        iter_records(request.stream(), import_format),
+        target_id=target_id,
+    )
+    return response
+
+
 @router.get(
     "/",
     summary="Получение Лидов",
@@ -59,6 +90,10 @@ async def list_leads(
         sort_by: list[Sort] = Query(default=Sort.desc, description="Сортировка"),
         page: int = Query(default=1, ge=1, description="Страница"),
         size: int = Query(default=1, ge=1, description="Размер Страницы"),
+        estimate_total: bool = Query(default=False, description="Приблизительный Подсчёт Общего Количества"),
+        pagination: PaginationMode = Query(default=PaginationMode.page, description="Режим Пагинации"),
+        cursor: str = Query(default=None, description="Курсор Страницы"),
+        comments: int = Query(default=0, ge=0, le=10, description="Последних Комментариев у Каждого Лида"),
         user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
 ):
@@ -70,7 +105,76 @@ async def list_leads(
         target_id=target_id,
         sorts=sort_by,
         page=page,
-        size=size    )
+        size=size,
+        estimate_total=estimate_total,
+        pagination=pagination,
+        cursor=cursor,
+    )
+    if comments:
+        response = await manager.add_comment_previews(response, comments)
+    return FastJSONResponse(response)
+
+
+@router.get(
+    "/export",
+    summary="Выгрузка Лидов",
+    status_code=status_codes.HTTP_200_OK,
+)
+async def export_leads(
+        status: list[StatusEnum] = Query(default=None, description="Фильтр по Статусу"),
+        created_from: datetime = Query(default=None, description="Фильтр по Мин Созданной"),
+        created_to: datetime = Query(default=None, description="Фильтр по Мак Созданной"),
+        target_id: uuid.UUID = Query(default=None, description="Фильтр по Таргету"),
+        query: str = Query(default=None, alias="q", description="Поиск"),
+        export_format: ExportFormat = Query(default=ExportFormat.csv, alias="format", description="Формат"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = LeadManager(db)
+    body = manager.export_leads(
+        status=status,
+        target_id=target_id,
+        created_from=created_from,
+        created_to=created_to,
+        query=query,
+        export_format=export_format,
+    )
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="leads.{export_format.value}"'},
+    )
+
+
+@router.get(
+    "/stats/status",
+    summary="Количество Лидов по Статусам",
+    status_code=status_codes.HTTP_200_OK,
+    response_model=LeadStatusCountsResponse,
+)
+async def get_lead_status_counts(
+        target_id: uuid.UUID = Query(default=None, description="Фильтр по Таргету"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = LeadManager(db)
+    response = await manager.get_status_counts(target_id)
+    return response
+
+
+@router.get(
+    "/stats/time-in-status",
+    summary="Среднее Время Лидов в Статусе",
+    status_code=status_codes.HTTP_200_OK,
+    response_model=LeadTimeInStatusListResponse,
+)
+async def get_lead_time_in_status(
+        target_id: uuid.UUID = Query(default=None, description="Фильтр по Таргету"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = LeadManager(db)
+    response = await manager.get_time_in_status(target_id)
     return response
 
 
@@ -134,6 +238,22 @@ async def delete_lead(
     await manager.delete_lead(lead_id)
 
 
+@router.get(
+    "/{lead_id}/status-history",
+    summary="История Статусов Лида",
+    status_code=status_codes.HTTP_200_OK,
+    response_model=LeadStatusHistoryResponse,
+)
+async def get_lead_status_history(
+        lead_id: int = Path(description="ИД Лида"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = LeadManager(db)
+    response = await manager.get_status_history(lead_id)
+    return response
+
+
 @router.get(
     "/{lead_id}/comments/",
     summary="Получение Комментов Лида",
@@ -143,11 +263,13 @@ async def delete_lead(
 async def get_lead_comments(
         lead_id: int = Path(description="ИД Лида"),
         sort_by: Sort = Query(default=Sort.desc, description="Сортировка"),
+        size: int = Query(default=50, ge=1, le=200, description="Размер Страницы"),
+        cursor: str = Query(default=None, description="Курсор Страницы"),
         user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
 ):
     manager = LeadManager(db)
-    response = await manager.get_comments(lead_id, sort_by)
+    response = await manager.get_comments(lead_id, sort_by, size, cursor)
     return response
 
 
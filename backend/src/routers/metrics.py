@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from db.instrumentation import route_stats
+from db.session import pool_stats
+from dependencies import verify_metrics
+from metrics import Gauge, Counter, render, http_requests, http_request_duration, http_in_progress, clicks_dropped
+from services.click_manager import click_pipeline
+from services.password_service import hash_pool
+from services.telegram_manager import interaction_buffer
+
+router = APIRouter(
+    tags=["system"],
+)
+
+# Текстовый формат экспозиции Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+POOL_GAUGES = (
+    ("size", "db_pool_size", "Configured pool size"),
+    ("checked_out", "db_pool_checked_out", "Connections currently checked out"),
+    ("idle", "db_pool_idle", "Idle connections in the pool"),
+    ("overflow", "db_pool_overflow", "Overflow connections currently open"),
+    ("max_overflow", "db_pool_max_overflow", "Configured max overflow"),
+)
+POOL_COUNTERS = (
+    ("wait_count", "db_pool_checkouts_total", "Connection checkouts"),
+    ("timeouts", "db_pool_timeouts_total", "Checkouts that timed out waiting for a connection"),
+)
+
+
+def collect() -> list:
+    """Метрики, которые снимаются в момент запроса: пул БД, очереди фоновых воркеров, SQL по маршрутам"""
+    metrics = []
+
+    stats = pool_stats()
+    for key, name, help_text in POOL_GAUGES:
+        if stats.get(key) is not None:
+            gauge = Gauge(name, help_text)
+            gauge.set(stats[key])
+            metrics.append(gauge)
+    for key, name, help_text in POOL_COUNTERS:
+        if stats.get(key) is not None:
+            counter = Counter(name, help_text)
+            counter.inc(amount=stats[key])
+            metrics.append(counter)
+    if stats.get("wait_total_ms") is not None:
+        wait = Counter("db_pool_wait_seconds_total", "Total time spent in pool checkout, including opening new connections")
+        wait.inc(amount=stats["wait_total_ms"] / 1000)
+        metrics.append(wait)
+
+    depth = Gauge("background_queue_depth", "Items waiting in background worker queues", ("queue",))
+    depth.set(click_pipeline.depth, ("clicks",))
+    depth.set(hash_pool.pending, ("password_hash",))
+    depth.set(interaction_buffer.depth, ("telegram_interactions",))
+    capacity = Gauge("background_queue_capacity", "Background queue capacity", ("queue",))
+    capacity.set(click_pipeline.queue.maxsize, ("clicks",))
+    capacity.set(hash_pool.max_pending, ("password_hash",))
+    capacity.set(interaction_buffer.max_pending, ("telegram_interactions",))
+    metrics += [depth, capacity]
+
+    queries = Counter("db_queries_total", "SQL statements issued by route", ("route",))
+    db_time = Counter("db_query_seconds_total", "Time spent in SQL by route", ("route",))
+    for route, route_stat in route_stats.items():
+        queries.inc((route,), route_stat.queries)
+        db_time.inc((route,), route_stat.db_time)
+    metrics += [queries, db_time]
+    return metrics
+
+
+@router.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[Depends(verify_metrics)],
+)
+async def get_metrics():
+    body = render([http_requests, http_request_duration, http_in_progress, clicks_dropped, *collect()])
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
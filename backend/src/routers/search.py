@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+
+from configs import SEARCH_LIMIT
+from dependencies import get_current_user
+from models import User
+from services.search_manager import SearchManager
+
+router = APIRouter(
+    tags=["search"],
+    prefix="/search",
+)
+
+
+@router.get(
+    "/"
+)
+async def search(
+        query: str = Query(min_length=2, max_length=100, alias="q"),
+        limit: int = Query(default=SEARCH_LIMIT, ge=1, le=50, description="Результатов на источник"),
+        user: User = Depends(get_current_user),
+):
+    manager = SearchManager(limit=limit)
+    response = await manager.search(query)
+    return response
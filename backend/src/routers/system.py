@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends
+
+from db.instrumentation import route_stats, QUERY_BUCKETS, DB_TIME_BUCKETS
+from db.session import pool_stats
+from dependencies import get_superuser
+from models import User
+from schemas.system import PoolStatsResponse, QueryStatsResponse, RouteQueryStatsResponse, HistogramBucketResponse
+
+router = APIRouter(
+    tags=["system"],
+    prefix="/system",
+)
+
+
+@router.get(
+    "/pool"
+)
+async def get_pool_stats(
+        user: User = Depends(get_superuser),
+):
+    return PoolStatsResponse(**pool_stats())
+
+
+def _buckets(bounds: tuple, counts: list[int]) -> list[HistogramBucketResponse]:
+    return [
+        HistogramBucketResponse(le=le, count=count)
+        for le, count in zip((*bounds, None), counts)
+    ]
+
+
+@router.get(
+    "/queries"
+)
+async def get_query_stats(
+        user: User = Depends(get_superuser),
+):
+    """SQL на HTTP запрос по маршрутам этого воркера, с начала его работы"""
+    routes = [
+        RouteQueryStatsResponse(
+            route=route,
+            requests=stats.requests,
+            queries=stats.queries,
+            avg_queries=round(stats.queries / stats.requests, 2) if stats.requests else 0,
+            max_queries=stats.max_queries,
+            db_time_ms=round(stats.db_time * 1000, 3),
+            queries_histogram=_buckets(QUERY_BUCKETS, stats.query_histogram),
+            db_time_histogram=_buckets(DB_TIME_BUCKETS, stats.db_time_histogram),
+        )
+        for route, stats in sorted(route_stats.items())
+    ]
+    return QueryStatsResponse(routes=routes)
@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,9 +7,11 @@ from starlette import status
 
 from dependencies import get_current_user, get_db
 from models import User
-from schemas.base import Sort
+from schemas.base import SearchSort, PaginationMode
 from schemas.exceptions import ExceptionResponse
-from schemas.target import TargetCompanyRequest, TargetCompanyResponse, TargetCompanyListResponse
+from schemas.target import TargetCompanyRequest, TargetCompanyResponse, TargetCompanyListResponse, ClickBucket, \
+    ClickSeriesResponse, FunnelBucket, TargetFunnelResponse, TargetFunnelListResponse
+from serializers import FastJSONResponse
 from services.target_company import TargetCompanyManager
 
 router = APIRouter(
@@ -73,9 +76,12 @@ async def create_target(
 async def get_targets(
         name: str = Query(None, alias="q"),
         is_active: bool = Query(None),
-        sort_by: list[Sort] = Query(default=Sort.desc, description="Сортировка"),
+        sort_by: list[SearchSort] = Query(default=SearchSort.desc, description="Сортировка"),
         page: int = Query(default=1, ge=1, description="Страница"),
         size: int = Query(default=1, ge=1, description="Размер Страницы"),
+        estimate_total: bool = Query(default=False, description="Приблизительный Подсчёт Общего Количества"),
+        pagination: PaginationMode = Query(default=PaginationMode.page, description="Режим Пагинации"),
+        cursor: str = Query(default=None, description="Курсор Страницы"),
         user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
 ):
@@ -86,8 +92,38 @@ async def get_targets(
         sorts=sort_by,
         page=page,
         size=size,
+        estimate_total=estimate_total,
+        pagination=pagination,
+        cursor=cursor,
     )
-    return targets
+    return FastJSONResponse(targets)
+
+
+@router.get(
+    "/funnel",
+    summary="Воронка Таргет Компаний",
+    response_model=TargetFunnelListResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {"model": TargetFunnelListResponse},
+        status.HTTP_403_FORBIDDEN: {"model": ExceptionResponse}
+    }
+)
+async def get_targets_funnel(
+        target_id: list[uuid.UUID] = Query(default=None, description="Фильтр по Таргетам"),
+        bucket: FunnelBucket = Query(default=FunnelBucket.day, description="Период Группировки"),
+        date_from: datetime = Query(default=None, description="Начало Периода"),
+        date_to: datetime = Query(default=None, description="Конец Периода"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Клики → лиды (по статусам) → сделки (по статусам и сумме) по дням или неделям.
+    Без target_id возвращаются все таргеты с активностью за период.
+    """
+    manager = TargetCompanyManager(db)
+    funnels = await manager.get_funnels(target_id, bucket, date_from, date_to)
+    return funnels
 
 
 @router.get(
@@ -110,6 +146,52 @@ async def get_target(
     return target
 
 
+@router.get(
+    "/{target_id}/funnel",
+    summary="Воронка Таргет Компании",
+    response_model=TargetFunnelResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {"model": TargetFunnelResponse},
+        status.HTTP_403_FORBIDDEN: {"model": ExceptionResponse}
+    }
+)
+async def get_target_funnel(
+        target_id: uuid.UUID,
+        bucket: FunnelBucket = Query(default=FunnelBucket.day, description="Период Группировки"),
+        date_from: datetime = Query(default=None, description="Начало Периода"),
+        date_to: datetime = Query(default=None, description="Конец Периода"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = TargetCompanyManager(db)
+    funnel = await manager.get_funnel(target_id, bucket, date_from, date_to)
+    return funnel
+
+
+@router.get(
+    "/{target_id}/clicks",
+    summary="Клики Таргет Компании по Периодам",
+    response_model=ClickSeriesResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {"model": ClickSeriesResponse},
+        status.HTTP_403_FORBIDDEN: {"model": ExceptionResponse}
+    }
+)
+async def get_target_clicks(
+        target_id: uuid.UUID,
+        bucket: ClickBucket = Query(default=ClickBucket.day, description="Период Группировки"),
+        date_from: datetime = Query(default=None, description="Начало Периода"),
+        date_to: datetime = Query(default=None, description="Конец Периода"),
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = TargetCompanyManager(db)
+    series = await manager.get_click_series(target_id, bucket, date_from, date_to)
+    return series
+
+
 @router.put(
     "/{target_id}",
     summary="Обновление Таргет Компании по ИД",
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import verify_bot, get_db, get_current_user, get_actor
 from models import User
-from schemas.telegram import TelegramUserCreateRequest, AssignCompanyRequest, TelegramUserUpdateRequest
-from services.telegram_manager import TelegramUserManager
+from schemas.base import ExportFormat
+from schemas.telegram import TelegramUserCreateRequest, AssignCompanyRequest, TelegramUserUpdateRequest, \
+    ListTelegramUserResponse, TelegramUserBatchRequest, TelegramUserBatchResponse
+from serializers import FastJSONResponse
+from services.export import MEDIA_TYPES
+from services.telegram_manager import TelegramUserManager, interaction_buffer
 
 router = APIRouter(
     prefix="/telegram",
@@ -12,6 +19,30 @@ router = APIRouter(
 )
 
 
+@router.get("/stream")
+async def stream_users(
+        lang: list[str] = Query(default=None, description="Фильтр по Языку"),
+        company_id: int = Query(default=None, description="Фильтр по Компании"),
+        interacted_from: datetime = Query(default=None, description="Фильтр по Мин Последней Активности"),
+        interacted_to: datetime = Query(default=None, description="Фильтр по Мак Последней Активности"),
+        export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias="format", description="Формат"),
+        user: User | None = Depends(get_actor),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = TelegramUserManager(db)
+    body = manager.export_users(
+        lang=lang,
+        company_id=company_id,
+        interacted_from=interacted_from,
+        interacted_to=interacted_to,
+        export_format=export_format,
+    )
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+    )
+
+
 @router.get("/{user_id}")
 async def get_user(
         user_id: int,
@@ -23,12 +54,27 @@ async def get_user(
     return response
 
 
-@router.get("/")
+@router.get("/", response_model=ListTelegramUserResponse)
 async def get_users(
-        user: User = Depends(get_current_user),
+        lang: list[str] = Query(default=None, description="Фильтр по Языку"),
+        company_id: int = Query(default=None, description="Фильтр по Компании"),
+        interacted_from: datetime = Query(default=None, description="Фильтр по Мин Последней Активности"),
+        interacted_to: datetime = Query(default=None, description="Фильтр по Мак Последней Активности"),
+        size: int = Query(default=100, ge=1, le=1000, description="Размер Страницы"),
+        cursor: str = Query(default=None, description="Курсор Страницы"),
+        user: User | None = Depends(get_actor),
         db: AsyncSession = Depends(get_db)
 ):
-    pass
+    manager = TelegramUserManager(db)
+    users = await manager.list_user(
+        lang=lang,
+        company_id=company_id,
+        interacted_from=interacted_from,
+        interacted_to=interacted_to,
+        size=size,
+        cursor=cursor,
+    )
+    return FastJSONResponse(users)
 
 
 @router.post(
@@ -45,6 +91,21 @@ async def create_user(
     return response
 
 
+@router.post(
+    "/batch",
+    status_code=200,
+    response_model=TelegramUserBatchResponse,
+)
+async def sync_users(
+        request: TelegramUserBatchRequest,
+        bot=Depends(verify_bot),
+        db: AsyncSession = Depends(get_db)
+):
+    manager = TelegramUserManager(db)
+    response = await manager.sync_users(request)
+    return response
+
+
 @router.post(
     "/{user_id}/assign-company",
     status_code=201
@@ -66,10 +127,9 @@ async def assign_company(
 async def update_interaction(
         user_id: int,
         bot=Depends(verify_bot),
-        db: AsyncSession = Depends(get_db)
 ):
-    manager = TelegramUserManager(db)
-    await manager.update_interaction(user_id)
+    # Сессия БД не нужна: время попадёт в telegram_users при сбросе буфера
+    await interaction_buffer.touch(user_id)
 
 
 @router.put(
@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies import get_superuser, get_db, get_current_user
 from models import User
-from schemas.base import Sort
+from schemas.base import SearchSort, PaginationMode
 from schemas.user import UserListResponse, UserResponse, UserCreateRequest, UserRequest
 from services.user_manager import UserManager
 
@@ -20,9 +20,12 @@ async def get_users(
         is_superuser: bool = Query(default=None, ),
         fullname: str = Query(None, alias="q"),
         phone: str = Query(None, alias="q"),
-        sort_by: list[Sort] = Query(default=Sort.desc, description="Сортировка"),
+        sort_by: list[SearchSort] = Query(default=SearchSort.desc, description="Сортировка"),
         page: int = Query(default=1, ge=1, description="Страница"),
         size: int = Query(default=1, ge=1, description="Размер Страницы"),
+        estimate_total: bool = Query(default=False, description="Приблизительный Подсчёт Общего Количества"),
+        pagination: PaginationMode = Query(default=PaginationMode.page, description="Режим Пагинации"),
+        cursor: str = Query(default=None, description="Курсор Страницы"),
         user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
 ):
@@ -33,6 +36,9 @@ async def get_users(
         sorts=sort_by,
         page=page,
         size=size,
+        estimate_total=estimate_total,
+        pagination=pagination,
+        cursor=cursor,
     )
     return response
 
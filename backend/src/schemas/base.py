@@ -7,10 +7,31 @@ class Sort(str, Enum):
     asc = "created_at:asc"
     desc = "created_at:desc"
 
+
+class SearchSort(str, Enum):
+    """Сортировка списков с поиском: relevance работает, только если задан запрос"""
+    asc = "created_at:asc"
+    desc = "created_at:desc"
+    relevance = "relevance:desc"
+
+
+class PaginationMode(str, Enum):
+    page = "page"
+    cursor = "cursor"
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
 class PaginationResponse(BaseModel):
-    page: int
+    page: int | None = None
     size: int
-    total: int
-    total_pages: int
+    total: int | None = None
+    total_estimated: bool = False
+    total_pages: int | None = None
     has_next: bool
-    has_prev: bool
\ No newline at end of file
+    has_prev: bool
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
\ No newline at end of file
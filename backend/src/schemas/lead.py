@@ -1,4 +1,7 @@
 import uuid
+
+from datetime import datetime
+from enum import Enum
 from typing import List
 
 from pydantic import BaseModel, Field, EmailStr
@@ -40,8 +43,9 @@ class LeadCommentRequest(BaseModel):
 class LeadCommentResponse(BaseModel):
     id: int
     lead_id: int
-    user_id: int
+    user_id: int | None = None
     comment: str
+    created_at: datetime | None = None
 
     model_config = {
         "from_attributes": True
@@ -52,8 +56,13 @@ class ChangeStatusRequest(BaseModel):
     status: StatusEnum
 
 
+class LeadListItemResponse(LeadResponse):
+    # Последние комментарии, если список запрошен с comments > 0
+    last_comments: List[LeadCommentResponse] | None = None
+
+
 class ListLeadResponse(BaseModel):
-    leads: List[LeadResponse]
+    leads: List[LeadListItemResponse]
     pagination: PaginationResponse
 
     model_config = {
@@ -63,7 +72,63 @@ class ListLeadResponse(BaseModel):
 
 class ListLeadCommentResponse(BaseModel):
     comments: List[LeadCommentResponse]
+    pagination: PaginationResponse | None = None
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class LeadImportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class LeadImportError(BaseModel):
+    row: int
+    detail: str
+
+
+class LeadImportResponse(BaseModel):
+    created: int = 0
+    failed: int = 0
+    errors: List[LeadImportError] = []
+
+
+class LeadStatusTransitionResponse(BaseModel):
+    from_status: StatusEnum | None = None
+    to_status: StatusEnum
+    changed_at: datetime
+    seconds: int
 
     model_config = {
         "from_attributes": True
     }
+
+
+class LeadStatusHistoryResponse(BaseModel):
+    lead_id: int
+    transitions: List[LeadStatusTransitionResponse]
+
+
+class LeadStatusCountResponse(BaseModel):
+    status: StatusEnum
+    leads: int = 0
+
+
+class LeadStatusCountsResponse(BaseModel):
+    target_id: uuid.UUID | None = None
+    total: int = 0
+    statuses: List[LeadStatusCountResponse]
+
+
+class LeadTimeInStatusResponse(BaseModel):
+    status: StatusEnum
+    # Учитываются только лиды, уже вышедшие из статуса
+    exited: int = 0
+    avg_seconds: float | None = None
+
+
+class LeadTimeInStatusListResponse(BaseModel):
+    target_id: uuid.UUID | None = None
+    statuses: List[LeadTimeInStatusResponse]
@@ -0,0 +1,25 @@
+import uuid
+
+from typing import List
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    id: int | uuid.UUID
+    title: str
+    subtitle: str | None = None
+
+
+class SearchSourceResponse(BaseModel):
+    items: List[SearchHit] = []
+    timed_out: bool = False
+    failed: bool = False
+
+
+class SearchResponse(BaseModel):
+    query: str
+    leads: SearchSourceResponse
+    contacts: SearchSourceResponse
+    deals: SearchSourceResponse
+    targets: SearchSourceResponse
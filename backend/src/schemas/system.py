@@ -0,0 +1,37 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class PoolStatsResponse(BaseModel):
+    pool: str
+    size: int | None = None
+    max_overflow: int | None = None
+    checked_out: int | None = None
+    idle: int | None = None
+    overflow: int | None = None
+    wait_count: int | None = None
+    wait_total_ms: float | None = None
+    wait_max_ms: float | None = None
+    timeouts: int | None = None
+
+
+class HistogramBucketResponse(BaseModel):
+    # None — корзина "больше последней границы"
+    le: float | None = None
+    count: int
+
+
+class RouteQueryStatsResponse(BaseModel):
+    route: str
+    requests: int
+    queries: int
+    avg_queries: float
+    max_queries: int
+    db_time_ms: float
+    queries_histogram: List[HistogramBucketResponse]
+    db_time_histogram: List[HistogramBucketResponse]
+
+
+class QueryStatsResponse(BaseModel):
+    routes: List[RouteQueryStatsResponse]
@@ -1,8 +1,12 @@
 import uuid
+from datetime import datetime
+from enum import Enum
 from typing import List
 
 from pydantic import BaseModel, Field
 
+from models.deal import DealStatusEnum
+from models.lead import StatusEnum
 from schemas.base import PaginationResponse
 
 
@@ -30,3 +34,51 @@ class TargetCompanyListResponse(BaseModel):
     model_config = {
         "from_attributes": True
     }
+
+
+class ClickBucket(str, Enum):
+    hour = "hour"
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class ClickPointResponse(BaseModel):
+    bucket: datetime
+    clicks: int
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class ClickSeriesResponse(BaseModel):
+    target_id: uuid.UUID
+    bucket: ClickBucket
+    points: List[ClickPointResponse]
+
+
+class FunnelBucket(str, Enum):
+    day = "day"
+    week = "week"
+
+
+class FunnelPointResponse(BaseModel):
+    bucket: datetime | None = None
+    clicks: int = 0
+    leads: int = 0
+    leads_by_status: dict[StatusEnum, int] = {}
+    deals: int = 0
+    deals_by_status: dict[DealStatusEnum, int] = {}
+    deal_sum: float = 0
+
+
+class TargetFunnelResponse(BaseModel):
+    target_id: uuid.UUID
+    bucket: FunnelBucket
+    totals: FunnelPointResponse
+    points: List[FunnelPointResponse]
+
+
+class TargetFunnelListResponse(BaseModel):
+    targets: List[TargetFunnelResponse]
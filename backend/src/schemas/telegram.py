@@ -1,11 +1,21 @@
+from datetime import datetime
+from typing import List
+
 from pydantic import BaseModel, Field
 
+from configs import TELEGRAM_SYNC_MAX
+from schemas.base import PaginationResponse
+
 
 class TelegramUserCreateRequest(BaseModel):
     user_id: int
     lang: str = Field(max_length=2)
 
 
+class TelegramUserBatchRequest(BaseModel):
+    users: List[TelegramUserCreateRequest] = Field(min_length=1, max_length=TELEGRAM_SYNC_MAX)
+
+
 class TelegramUserUpdateRequest(BaseModel):
     lang: str = Field(default=None, max_length=2)
 
@@ -17,7 +27,18 @@ class AssignCompanyRequest(BaseModel):
 class TelegramUserResponse(BaseModel):
     user_id: int
     lang: str
+    company_id: int | None = None
+    last_interaction: datetime | None = None
 
     model_config = {
         "from_attributes": True
     }
+
+
+class ListTelegramUserResponse(BaseModel):
+    users: List[TelegramUserResponse]
+    pagination: PaginationResponse
+
+
+class TelegramUserBatchResponse(BaseModel):
+    users: List[TelegramUserResponse]
@@ -0,0 +1,51 @@
+import json
+import uuid
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """JSON в байты: orjson, если установлен, иначе стандартный json"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def to_jsonable(obj):
+    """Приводит значения (datetime, Enum, UUID, Decimal) к JSON-типам, как при выдаче клиенту"""
+    return loads(dumps(obj))
+
+
+class FastJSONResponse(Response):
+    """JSON ответ, сериализуемый один раз через dumps, без jsonable_encoder и response_model"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,17 +1,26 @@
+import uuid
+
+from datetime import datetime
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from configs import REFRESH_TTL
 from exceptions import UnAuthorized, InvalidToken
 from models import User
 
+from repository.refresh_token_repo import RefreshTokenRepository
 from repository.user_repo import UserRepository
 
 from services.password_service import PasswordService
+from services.principal_cache import principal_cache
+from services.revocation import revoked_families
 from services.token_service import TokenService
 
 
 class AuthManager:
     def __init__(self, db: AsyncSession):
         self.repo = UserRepository(db)
+        self.refresh_repo = RefreshTokenRepository(db)
         self.token_service = TokenService()
         self.password_service = PasswordService()
 
@@ -23,31 +32,96 @@ class AuthManager:
         user = await self.repo.get_by_username(username)
         if not user:
             raise UnAuthorized("Invalid Username or Password")
-        if not self.password_service.verify_password(password, user.hashed_password):
+        if not await self.password_service.verify_password(password, user.hashed_password):
             raise UnAuthorized("Invalid Username or Password")
-        return self.token_service.generate(user)
+        return await self.__issue(user, uuid.uuid4().hex)
+
+    async def __issue(
+            self,
+            user: User,
+            family: str
+    ):
+        """Новая пара токенов в цепочке family, refresh записывается в БД"""
+        jti = uuid.uuid4().hex
+        await self.refresh_repo.create(
+            jti=jti,
+            family=family,
+            user_id=user.id,
+            expires_at=datetime.now() + REFRESH_TTL,
+        )
+        await self.refresh_repo.commit()
+        return self.token_service.generate(user, family, jti)
+
+    @staticmethod
+    def __remember(revoked: list):
+        """Отозванные цепочки сразу попадают в память этого воркера, остальные узнают при синхронизации"""
+        for family, expires_at in revoked:
+            revoked_families.add(family, expires_at)
 
     async def refresh_token(
             self,
             token: str
     ):
+        """
+        Ротация: refresh токен обменивается один раз. Повторное предъявление
+        уже обменянного токена — признак утечки, отзывается вся цепочка.
+        """
         payload = self.token_service.validate(token, True)
-        user = await self.repo.get_by_username(payload.get("username"))
+        jti, family = payload.get("jti"), payload.get("fam")
+        # Токены без jti выданы до появления хранилища — нужен повторный вход
+        if not jti or revoked_families.contains(family):
+            raise InvalidToken("Invalid Credentials")
 
-        if not user:
+        used = await self.refresh_repo.use(jti)
+        if used is None:
+            stored = await self.refresh_repo.get(jti)
+            if stored is not None and stored.used_at is not None:
+                self.__remember(await self.refresh_repo.revoke_family(stored.family))
             raise InvalidToken("Invalid Credentials")
 
-        return self.token_service.generate(user)
+        user = await self.repo.get_by_username(payload.get("username"))
+        if not user or user.id != used.user_id:
+            raise InvalidToken("Invalid Credentials")
+
+        return await self.__issue(user, used.family)
+
+    async def logout(
+            self,
+            token: str
+    ):
+        """Отзывает цепочку, к которой относится токен (текущую сессию)"""
+        family = self.token_service.validate(token).get("fam")
+        if family:
+            self.__remember(await self.refresh_repo.revoke_family(family))
+
+    async def logout_all(
+            self,
+            user: User
+    ):
+        """Отзывает все сессии пользователя"""
+        self.__remember(await self.refresh_repo.revoke_user(user.id))
 
     async def get_me(
             self,
             token: str
     ):
         payload = self.token_service.validate(token)
+        # Проверка отзыва в памяти, без запроса в БД
+        if revoked_families.contains(payload.get("fam")):
+            raise InvalidToken("Invalid Credentials")
+        sub = payload.get("sub")
+
+        user = principal_cache.get(sub)
+        # Старые токены с прежним username не принимаются, как и при запросе в БД
+        if user and user.username == payload.get("username"):
+            return user
+
         user = await self.repo.get_by_username(payload.get("username"))
 
         if not user:
             raise InvalidToken("Invalid Credentials")
+        if str(user.id) == sub:
+            principal_cache.set(sub, user, payload.get("exp"))
         return user
 
     async def change_password(
@@ -56,9 +130,10 @@ class AuthManager:
             old_password: str,
             new_password: str,
     ):
-        if not self.password_service.verify_password(old_password, user.hashed_password):
+        if not await self.password_service.verify_password(old_password, user.hashed_password):
             raise UnAuthorized("Invalid Password")
 
-        hashed_password = self.password_service.hash_password(new_password)
+        hashed_password = await self.password_service.hash_password(new_password)
         user.hashed_password = hashed_password
         await self.repo.update(user)
+        principal_cache.invalidate(user.id)
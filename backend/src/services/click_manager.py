@@ -1,19 +1,281 @@
+import asyncio
+import logging
+import time
 import uuid
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
 
+from sqlalchemy import select
+
+from configs import (
+    CLICK_BATCH_SIZE,
+    CLICK_FLUSH_INTERVAL,
+    CLICK_QUEUE_SIZE,
+    CLICK_FLUSH_ATTEMPTS,
+    CLICK_RETRY_DELAY,
+    ACTIVE_TARGETS_TTL,
+    CLICK_COMPACT_INTERVAL,
+    CLICK_COMPACT_BATCH,
+    CLICK_RETENTION_DAYS,
+)
+from db.session import async_session
 from exceptions import NotFound
+from metrics import clicks_dropped
+from models import TargetCompany
 from repository.click_repo import ClickRepository
-from repository.taget_repo import TargetCompanyRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ActiveTargets:
+    """
+    ID активных таргетов в памяти процесса.
+    Полностью перечитывается раз в ttl секунд; неизвестный ID проверяется
+    точечным запросом (таргет мог создать другой воркер), промахи кешируются.
+    """
+
+    def __init__(self, ttl: int = 60, max_missing: int = 10_000):
+        self.ttl = ttl
+        self.max_missing = max_missing
+        self.ids: set[uuid.UUID] = set()
+        self.missing: dict[uuid.UUID, float] = {}
+        self.loaded_at = 0.0
+        self.lock = asyncio.Lock()
+
+    @staticmethod
+    def __active_stmt():
+        return select(TargetCompany.id).where(TargetCompany.is_active.isnot(False))
+
+    async def refresh(self):
+        async with async_session() as session:
+            result = await session.execute(self.__active_stmt())
+            self.ids = set(result.scalars().all())
+        self.missing.clear()
+        self.loaded_at = time.monotonic()
+
+    async def __lookup(self, target_id: uuid.UUID) -> bool:
+        async with async_session() as session:
+            result = await session.execute(
+                self.__active_stmt().where(TargetCompany.id == target_id)
+            )
+            return result.scalar_one_or_none() is not None
+
+    async def contains(self, target_id: uuid.UUID) -> bool:
+        now = time.monotonic()
+        if now - self.loaded_at > self.ttl:
+            async with self.lock:
+                if now - self.loaded_at > self.ttl:
+                    await self.refresh()
+
+        if target_id in self.ids:
+            return True
+
+        missed_at = self.missing.get(target_id)
+        if missed_at is not None and now - missed_at < self.ttl:
+            return False
+
+        if await self.__lookup(target_id):
+            self.ids.add(target_id)
+            return True
+
+        if len(self.missing) >= self.max_missing:
+            self.missing.clear()
+        self.missing[target_id] = now
+        return False
+
+    def add(self, target_id: uuid.UUID):
+        self.ids.add(target_id)
+        self.missing.pop(target_id, None)
+
+    def discard(self, target_id: uuid.UUID):
+        self.ids.discard(target_id)
+
+
+class ClickPipeline:
+    """
+    Буферизованная запись кликов: редирект отдаётся сразу, клики копятся в очереди,
+    фоновая задача пишет их пачками по размеру (batch_size) или по времени (flush_interval).
+    Неудачная запись повторяется до flush_attempts раз с растущей задержкой,
+    после чего пачка отбрасывается и учитывается в clicks_dropped_total.
+    """
+
+    def __init__(
+            self,
+            batch_size: int = 500,
+            flush_interval: float = 1.0,
+            queue_size: int = 100_000,
+            targets: ActiveTargets = None,
+            flush_attempts: int = 3,
+            retry_delay: float = 0.5,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flush_attempts = max(flush_attempts, 1)
+        self.retry_delay = retry_delay
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.targets = targets or ActiveTargets()
+        self.task: asyncio.Task | None = None
+
+    async def track(self, target_id: uuid.UUID):
+        if not await self.targets.contains(target_id):
+            raise NotFound("Target company Not Found")
+        if self.task is None:
+            # Воркер не запущен (скрипты, тесты) — пишем сразу
+            await self.flush([(target_id, datetime.now())])
+            return
+        # Если очередь заполнена, запрос подождёт writer (backpressure)
+        await self.queue.put((target_id, datetime.now()))
+
+    async def flush(self, batch: list[tuple[uuid.UUID, datetime]]):
+        async with async_session() as session:
+            await ClickRepository(session).create_many(batch)
+
+    async def __collect(self, first) -> tuple[list, bool]:
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            while not self.queue.empty() and len(batch) < self.batch_size:
+                item = self.queue.get_nowait()
+                if item is None:
+                    return batch, True
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def __run(self):
+        stopping = False
+        while not stopping:
+            first = await self.queue.get()
+            if first is None:
+                break
+            batch, stopping = await self.__collect(first)
+            await self.__flush_with_retry(batch)
+
+    async def __flush_with_retry(self, batch: list):
+        for attempt in range(self.flush_attempts):
+            try:
+                await self.flush(batch)
+                return
+            except Exception:
+                if attempt + 1 == self.flush_attempts:
+                    logger.exception("Dropped %s clicks after %s attempts", len(batch), self.flush_attempts)
+                    clicks_dropped.inc(amount=len(batch))
+                    return
+                delay = self.retry_delay * 2 ** attempt
+                logger.warning("Failed to flush %s clicks, retrying in %.1fs", len(batch), delay, exc_info=True)
+            # Пока ждём, новые клики копятся в очереди (backpressure через maxsize)
+            await asyncio.sleep(delay)
+
+    async def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        """Дописывает всё, что осталось в очереди, и останавливает воркер"""
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        await self.task
+        self.task = None
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+
+class ClickCompactor:
+    """
+    Периодически сворачивает сырые клики, не попавшие в click_rollups
+    (старые строки или записанные в обход пайплайна), и удаляет свёрнутые
+    строки старше retention_days. Работает пачками по batch_size.
+    """
+
+    def __init__(
+            self,
+            interval: int = 300,
+            batch_size: int = 10_000,
+            retention_days: int = 0,
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self.task: asyncio.Task | None = None
+
+    async def run_once(self) -> tuple[int, int]:
+        folded = pruned = 0
+        async with async_session() as session:
+            repo = ClickRepository(session)
+            while True:
+                count = await repo.compact(self.batch_size)
+                folded += count
+                if count < self.batch_size:
+                    break
+
+            if self.retention_days:
+                before = datetime.now() - timedelta(days=self.retention_days)
+                while True:
+                    count = await repo.prune(before, self.batch_size)
+                    pruned += count
+                    if count < self.batch_size:
+                        break
+        return folded, pruned
+
+    async def __run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Click compaction failed")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self.task is None and self.interval > 0:
+            self.task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+
+click_pipeline = ClickPipeline(
+    batch_size=CLICK_BATCH_SIZE,
+    flush_interval=CLICK_FLUSH_INTERVAL,
+    queue_size=CLICK_QUEUE_SIZE,
+    targets=ActiveTargets(ttl=ACTIVE_TARGETS_TTL),
+    flush_attempts=CLICK_FLUSH_ATTEMPTS,
+    retry_delay=CLICK_RETRY_DELAY,
+)
+
+click_compactor = ClickCompactor(
+    interval=CLICK_COMPACT_INTERVAL,
+    batch_size=CLICK_COMPACT_BATCH,
+    retention_days=CLICK_RETENTION_DAYS,
+)
 
 
 class ClickManager:
-    def __init__(self, db: AsyncSession):
-        self.repo = ClickRepository(db)
-        self.target_repo = TargetCompanyRepository(db)
+    def __init__(self, pipeline: ClickPipeline = click_pipeline):
+        self.pipeline = pipeline
 
     async def create(self, target_id: uuid.UUID):
-        target_company = await self.target_repo.get_by_id(target_id)
-        if not target_company:
-            raise NotFound("Target company Not Found")
-        await self.repo.create(target_id)
+        await self.pipeline.track(target_id)
@@ -1,21 +1,24 @@
 from datetime import datetime
+from typing import AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-# from cache import redis_cache
+from cache import cached
+from configs import EXPORT_BATCH_SIZE
 
 from exceptions import NotFound
 
 from filters.contact_filter import ContactFilter
-from filters.paginator import Paginator
+from filters.paginator import make_paginator
 from filters.sorter import Sorter
 
 from models import Contact
 
 from repository.contact_repo import ContactRepository
 
-from schemas.base import Sort
-from schemas.contact import ContactRequest, ContactListResponse
+from schemas.base import SearchSort, PaginationMode, ExportFormat
+from schemas.contact import ContactRequest
+from services.export import encode_rows
 
 
 class ContactManager:
@@ -62,15 +65,32 @@ class ContactManager:
             raise NotFound(f"Contact {contact_id} not found")
         return contact
 
-    # @redis_cache(prefix="contacts:list", ttl=120)
+    def export(
+            self,
+            query: str = None,
+            created_from: datetime = None,
+            created_to: datetime = None,
+            export_format: ExportFormat = ExportFormat.csv,
+    ) -> AsyncIterator[bytes]:
+        filters = ContactFilter(query, created_from, created_to)
+        return encode_rows(
+            [col.key for col in self.repo.export_columns],
+            self.repo.export(filters, EXPORT_BATCH_SIZE),
+            export_format,
+        )
+
+    @cached(prefix="contacts:list", ttl=120, tags=("contacts",))
     async def list(
             self,
             query: str = None,
             created_from: datetime = None,
             created_to: datetime = None,
-            sorts: list[Sort] = None,
+            sorts: list[SearchSort] = None,
             page: int = 1,
-            size: int = 50
+            size: int = 50,
+            estimate_total: bool = False,
+            cursor: str = None,
+            pagination: PaginationMode = PaginationMode.page,
     ):
         filters = ContactFilter(
             query,
@@ -82,23 +102,32 @@ class ContactManager:
 
         for sort_by in sorts:
             col, destination = sort_by.split(":")
-            col = getattr(Contact, col)
+            if col == "relevance":
+                col = filters.rank
+                if col is None:
+                    continue
+            else:
+                col = getattr(Contact, col)
             sorters.append((col, destination))
 
         sorter = Sorter(
             tuple(sorters)
         )
 
-        paginator = Paginator(
+        paginator = make_paginator(
+            sorter=sorter,
+            key=Contact.id,
             page=page,
-            size=size
+            size=size,
+            cursor=cursor,
+            mode=pagination,
+            estimate_total=estimate_total,
         )
 
-        contacts = await self.repo.list(
+        # Словари по контракту ContactListResponse, без ORM объектов и валидации
+        contacts = await self.repo.list_rows(
             filters=filters,
             sorter=sorter,
             paginator=paginator,
         )
-        return ContactListResponse(
-            **contacts
-        )
+        return contacts
@@ -1,10 +1,12 @@
 from datetime import datetime
+from typing import AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from configs import EXPORT_BATCH_SIZE
 from exceptions import NotFound
 from filters.deal_filter import DealFilter
-from filters.paginator import Paginator
+from filters.paginator import make_paginator
 from filters.sorter import Sorter
 
 from models.deal import DealStatusEnum, Deal
@@ -13,8 +15,9 @@ from models.lead import StatusEnum
 from repository.deal_repo import DealRepository
 from repository.lead_repo import LeadRepository
 
-from schemas.base import Sort
-from schemas.deal import DealRequest, DealResponse, ListDealResponse
+from schemas.base import Sort, PaginationMode, ExportFormat
+from schemas.deal import DealRequest, DealResponse
+from services.export import encode_rows
 
 
 class DealManager:
@@ -27,9 +30,10 @@ class DealManager:
             request: DealRequest,
     ):
         lead = await self.lead_repo.get_by_id(request.lead_id)
-        lead.status = StatusEnum.DEAL
         if not lead:
             raise NotFound("Lead not found")
+        lead.status = StatusEnum.DEAL
+        self.lead_repo.mark_stale(*await self.lead_repo.track_changes(lead))
 
         deal = await self.repo.create(request.lead_id, request.deal_sum, request.status)
         return DealResponse.model_validate(deal)
@@ -68,6 +72,28 @@ class DealManager:
 
         await self.repo.delete(deal)
 
+    def export_deals(
+            self,
+            deal_id: int = None,
+            status: list[DealStatusEnum] = None,
+            created_from: datetime = None,
+            created_to: datetime = None,
+            lead_query: str = None,
+            export_format: ExportFormat = ExportFormat.csv,
+    ) -> AsyncIterator[bytes]:
+        filters = DealFilter(
+            deal_id=deal_id,
+            status=status,
+            created_from=created_from,
+            created_to=created_to,
+            query=lead_query,
+        )
+        return encode_rows(
+            [col.key for col in self.repo.export_columns],
+            self.repo.export(filters, EXPORT_BATCH_SIZE),
+            export_format,
+        )
+
     async def get_deals(
             self,
             deal_id: int = None,
@@ -76,7 +102,10 @@ class DealManager:
             created_to: datetime = None,
             sorts: list[Sort] = None,
             page: int = 1,
-            size: int = 50
+            size: int = 50,
+            estimate_total: bool = False,
+            cursor: str = None,
+            pagination: PaginationMode = PaginationMode.page,
     ):
         filters = DealFilter(
             deal_id=deal_id,
@@ -95,16 +124,20 @@ class DealManager:
             tuple(sorters)
         )
 
-        paginator = Paginator(
+        paginator = make_paginator(
+            sorter=sorter,
+            key=Deal.id,
             page=page,
-            size=size
+            size=size,
+            cursor=cursor,
+            mode=pagination,
+            estimate_total=estimate_total,
         )
 
-        deals = await self.repo.list(
+        # Словари по контракту ListDealResponse, без ORM объектов и валидации
+        deals = await self.repo.list_rows(
             filters=filters,
             sorter=sorter,
             paginator=paginator
         )
-        return ListDealResponse(
-            **deals
-        )
+        return deals
@@ -0,0 +1,53 @@
+import csv
+import io
+
+from datetime import date, datetime
+from enum import Enum
+from typing import AsyncIterator, Sequence
+
+from schemas.base import ExportFormat
+from serializers import dumps
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def iter_csv(keys: Sequence[str], partitions: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(keys)
+    async for rows in partitions:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def iter_ndjson(keys: Sequence[str], partitions: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield b"".join(dumps(dict(zip(keys, row))) + b"\n" for row in rows)
+
+
+def encode_rows(
+        keys: Sequence[str],
+        partitions: AsyncIterator[list],
+        export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Кодирует пачки строк (кортежи колонок) в CSV или NDJSON, по куску на пачку"""
+    if export_format == ExportFormat.csv:
+        return iter_csv(keys, partitions)
+    return iter_ndjson(keys, partitions)
@@ -0,0 +1,98 @@
+import csv
+import json
+
+from typing import AsyncIterator
+
+from schemas.lead import LeadImportFormat
+
+# (номер строки, данные строки, ошибка разбора)
+Record = tuple[int, dict | None, str | None]
+
+INVALID_ENCODING = "Invalid UTF-8"
+
+
+def _decode(line: bytes) -> str | None:
+    try:
+        return line.decode("utf-8-sig").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str | None]:
+    """
+    Строки потока байт; декодируются целиком, чтобы не резать UTF-8 посередине.
+    Строка не в UTF-8 отдаётся как None — парсер превращает её в ошибку строки.
+    """
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield _decode(line)
+    if buffer:
+        yield _decode(buffer)
+
+
+async def iter_ndjson(lines: AsyncIterator[str | None]) -> AsyncIterator[Record]:
+    row = 0
+    async for line in lines:
+        if line is None:
+            row += 1
+            yield row, None, INVALID_ENCODING
+            continue
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield row, None, "Invalid JSON"
+            continue
+        if not isinstance(data, dict):
+            yield row, None, "Row must be a JSON object"
+            continue
+        yield row, data, None
+
+
+async def iter_csv(lines: AsyncIterator[str | None]) -> AsyncIterator[Record]:
+    """
+    CSV с заголовком. Запись может занимать несколько строк (перевод строки в кавычках):
+    строки копятся, пока число кавычек нечётное. Пустые значения не передаются.
+    """
+    header = None
+    pending = None
+    row = 0
+    async for line in lines:
+        if line is None:
+            # Битая строка вместе с накопленной частью записи — одна ошибочная строка
+            pending = None
+            row += 1
+            yield row, None, INVALID_ENCODING
+            continue
+        pending = line if pending is None else f"{pending}\n{line}"
+        if pending.count('"') % 2:
+            continue
+        text, pending = pending, None
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value != ""}, None
+
+    if pending is not None:
+        yield row + 1, None, "Unterminated quoted field"
+
+
+def iter_records(stream: AsyncIterator[bytes], import_format: LeadImportFormat) -> AsyncIterator[Record]:
+    lines = iter_lines(stream)
+    if import_format == LeadImportFormat.csv:
+        return iter_csv(lines)
+    return iter_ndjson(lines)
@@ -2,34 +2,46 @@ import hashlib
 import json
 import uuid
 
+from collections import defaultdict
 from datetime import datetime
+from typing import AsyncIterator
 
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-# from cache import redis_cache
-# from configs import get_redis
+from cache import cached
+from configs import LEAD_IMPORT_CHUNK, LEAD_IMPORT_MAX_ERRORS, EXPORT_BATCH_SIZE
 
 from exceptions import NotFound
 
 from filters.lead_filter import LeadFilter
-from filters.paginator import Paginator
+from filters.paginator import make_paginator, CursorPaginator
 from filters.sorter import Sorter
 
-from models.lead import StatusEnum, Lead
+from models.lead import StatusEnum, Lead, LeadComment
 
 from repository.contact_repo import ContactRepository
 from repository.lead_repo import LeadRepository, LeadCommentRepository
 
-from schemas.base import Sort
+from schemas.base import Sort, PaginationMode, ExportFormat
 from schemas.lead import (
     LeadRequest,
     LeadResponse,
     LeadCommentRequest,
     LeadCommentResponse,
-    ListLeadResponse,
     ListLeadCommentResponse,
-    ChangeStatusRequest
+    ChangeStatusRequest,
+    LeadImportError,
+    LeadImportResponse,
+    LeadStatusHistoryResponse,
+    LeadStatusCountsResponse,
+    LeadStatusCountResponse,
+    LeadTimeInStatusListResponse,
+    LeadTimeInStatusResponse,
 )
+from services.export import encode_rows
+from services.lead_import import Record
 
 
 class LeadManager:
@@ -39,10 +51,9 @@ class LeadManager:
     ):
         self.repo = LeadRepository(db)
         self.comment_repo = LeadCommentRepository(db)
+        self.status_repo = self.repo.status_repo
         self.contact_repo = ContactRepository(db)
 
-        # self.cache = get_redis()
-
     async def create_lead(
             self,
             request: LeadRequest,
@@ -58,6 +69,88 @@ class LeadManager:
         )
         return LeadResponse.model_validate(lead)
 
+    async def __insert_leads(
+            self,
+            requests: list[LeadRequest]
+    ):
+        lead_ids = await self.repo.create_many([request.model_dump() for request in requests])
+        await self.contact_repo.create_many([
+            {
+                "full_name": request.full_name,
+                "email": request.email,
+                "phone": request.phone,
+                "lead_id": lead_id,
+            }
+            for request, lead_id in zip(requests, lead_ids)
+        ])
+
+    @staticmethod
+    def __fail(report: LeadImportResponse, row: int, detail: str):
+        report.failed += 1
+        if len(report.errors) < LEAD_IMPORT_MAX_ERRORS:
+            report.errors.append(LeadImportError(row=row, detail=detail))
+
+    async def __write_chunk(
+            self,
+            chunk: list[tuple[int, LeadRequest]],
+            report: LeadImportResponse
+    ):
+        """Пачка пишется одной транзакцией; если БД её отклонила, строки пишутся по одной через SAVEPOINT"""
+        try:
+            await self.__insert_leads([request for _, request in chunk])
+            await self.repo.commit()
+            report.created += len(chunk)
+            return
+        except DBAPIError:
+            await self.repo.db.rollback()
+
+        for row, request in chunk:
+            try:
+                async with self.repo.db.begin_nested():
+                    await self.__insert_leads([request])
+                report.created += 1
+            except DBAPIError as e:
+                self.__fail(report, row, str(e.orig).splitlines()[0])
+        await self.repo.commit()
+
+    async def import_leads(
+            self,
+            records: AsyncIterator[Record],
+            target_id: uuid.UUID = None,
+            chunk_size: int = LEAD_IMPORT_CHUNK,
+    ) -> LeadImportResponse:
+        """
+        Массовая загрузка лидов с контактами из потока записей.
+        Строки валидируются LeadRequest по мере чтения, ошибки строк попадают в отчёт
+        и не прерывают загрузку.
+        """
+        report = LeadImportResponse()
+        chunk: list[tuple[int, LeadRequest]] = []
+
+        async for row, data, error in records:
+            if error is None:
+                try:
+                    request = LeadRequest.model_validate(data)
+                except ValidationError as e:
+                    error = "; ".join(
+                        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                    )
+                else:
+                    if request.target_id is None:
+                        request.target_id = target_id
+                    chunk.append((row, request))
+
+            if error is not None:
+                self.__fail(report, row, error)
+
+            if len(chunk) >= chunk_size:
+                await self.__write_chunk(chunk, report)
+                chunk = []
+
+        if chunk:
+            await self.__write_chunk(chunk, report)
+        return report
+
     async def update_lead(
             self,
             lead_id: int,
@@ -95,7 +188,72 @@ class LeadManager:
             raise NotFound(f"Lead with id {lead_id} not found")
         return LeadResponse.model_validate(lead)
 
-    # @redis_cache(prefix="leads:list", ttl=120)
+    async def get_status_history(
+            self,
+            lead_id: int,
+    ):
+        lead = await self.repo.get_by_id(lead_id)
+        if not lead:
+            raise NotFound(f"Lead with id {lead_id} not found")
+        transitions = await self.status_repo.history(lead_id)
+        return LeadStatusHistoryResponse(
+            lead_id=lead_id,
+            transitions=transitions,
+        )
+
+    async def get_status_counts(
+            self,
+            target_id: uuid.UUID = None,
+    ):
+        """Число лидов по статусам из счётчиков, без COUNT по leads"""
+        totals = {row.status: row.leads for row in await self.status_repo.totals(target_id)}
+        statuses = [
+            LeadStatusCountResponse(status=status, leads=totals.get(status) or 0)
+            for status in StatusEnum
+        ]
+        return LeadStatusCountsResponse(
+            target_id=target_id,
+            total=sum(item.leads for item in statuses),
+            statuses=statuses,
+        )
+
+    async def get_time_in_status(
+            self,
+            target_id: uuid.UUID = None,
+    ):
+        """Среднее время в статусе по лидам, которые из него уже вышли"""
+        totals = {row.status: row for row in await self.status_repo.totals(target_id)}
+        statuses = []
+        for status in StatusEnum:
+            row = totals.get(status)
+            exited = row.exited if row else 0
+            statuses.append(LeadTimeInStatusResponse(
+                status=status,
+                exited=exited,
+                avg_seconds=row.seconds / exited if exited else None,
+            ))
+        return LeadTimeInStatusListResponse(
+            target_id=target_id,
+            statuses=statuses,
+        )
+
+    def export_leads(
+            self,
+            status: list[StatusEnum] = None,
+            target_id: uuid.UUID = None,
+            created_from: datetime = None,
+            created_to: datetime = None,
+            query: str = None,
+            export_format: ExportFormat = ExportFormat.csv,
+    ) -> AsyncIterator[bytes]:
+        filters = LeadFilter(status, target_id, created_from, created_to, query)
+        return encode_rows(
+            [col.key for col in self.repo.export_columns],
+            self.repo.export(filters, EXPORT_BATCH_SIZE),
+            export_format,
+        )
+
+    @cached(prefix="leads:list", ttl=120, tags=("leads",))
     async def get_leads(
             self,
             status: list[StatusEnum] = None,
@@ -104,7 +262,10 @@ class LeadManager:
             created_to: datetime = None,
             sorts: list[Sort] = None,
             page: int = 1,
-            size: int = 50
+            size: int = 50,
+            estimate_total: bool = False,
+            cursor: str = None,
+            pagination: PaginationMode = PaginationMode.page,
     ):
         filters = LeadFilter(
             status,
@@ -124,19 +285,23 @@ class LeadManager:
             tuple(sorters)
         )
 
-        paginator = Paginator(
+        paginator = make_paginator(
+            sorter=sorter,
+            key=Lead.id,
             page=page,
-            size=size
+            size=size,
+            cursor=cursor,
+            mode=pagination,
+            estimate_total=estimate_total,
         )
 
-        leads = await self.repo.list(
+        # Словари по контракту ListLeadResponse, без ORM объектов и валидации
+        leads = await self.repo.list_rows(
             filters=filters,
             sorter=sorter,
             paginator=paginator,
         )
-        return ListLeadResponse(
-            **leads
-        )
+        return leads
 
     async def add_comment(
             self,
@@ -147,7 +312,11 @@ class LeadManager:
         lead = await self.repo.get_by_id(lead_id)
         if not lead:
             raise NotFound(f"Lead with id {lead_id} not found")
-        comment = await self.comment_repo.create(**request.model_dump(), user_id=user_id)
+        comment = await self.comment_repo.create(
+            comment=request.comment,
+            lead_id=lead.id,
+            user_id=user_id,
+        )
         return LeadCommentResponse.model_validate(comment)
 
     async def remove_comment(
@@ -159,20 +328,58 @@ class LeadManager:
         if not lead:
             raise NotFound(f"Lead with id {lead_id} not found")
         lead_comment = await self.comment_repo.get_by_id(lead_comment_id)
-        if not lead_comment:
+        if not lead_comment or lead_comment.lead_id != lead_id:
             raise NotFound(f"Lead comment with id {lead_comment_id} not found")
         await self.comment_repo.delete(lead_comment)
 
     async def get_comments(
             self,
             lead_id: int,
-            sort_order: Sort = Sort.desc
+            sort_order: Sort = Sort.desc,
+            size: int = 50,
+            cursor: str = None,
     ):
+        """Лента комментариев лида с keyset-пагинацией по (created_at, id)"""
+        _, direction = sort_order.split(":")
+        sorter = Sorter(
+            ((LeadComment.created_at, direction),)
+        )
+        paginator = CursorPaginator(
+            sorter=sorter,
+            key=LeadComment.id,
+            cursor=cursor,
+            size=size,
+        )
         comments = await self.comment_repo.list(
             lead_id=lead_id,
-            sort_order="desc" if Sort.desc else "asc"
+            sorter=sorter,
+            paginator=paginator,
+        )
+        return ListLeadCommentResponse(
+            **comments
+        )
+
+    async def add_comment_previews(
+            self,
+            leads: dict,
+            size: int = 1,
+    ) -> dict:
+        """Последние size комментариев к каждому лиду страницы одним запросом (без N+1)"""
+        comments = await self.comment_repo.latest(
+            [lead["id"] for lead in leads["leads"]],
+            size,
         )
-        return ListLeadCommentResponse.model_validate(comments)
+        by_lead = defaultdict(list)
+        for comment in comments:
+            by_lead[comment["lead_id"]].append(comment)
+        # Словари страницы могут лежать в кеше, поэтому собираются новые
+        return {
+            **leads,
+            "leads": [
+                {**lead, "last_comments": by_lead.get(lead["id"], [])}
+                for lead in leads["leads"]
+            ],
+        }
 
     async def get_comment_for(
             self,
@@ -183,7 +390,7 @@ class LeadManager:
         if not lead:
             raise NotFound(f"Lead with id {lead_comment_id} not found")
         lead_comment = await self.comment_repo.get_by_id(lead_comment_id)
-        if not lead_comment:
+        if not lead_comment or lead_comment.lead_id != lead_id:
             raise NotFound(f"Lead comment with id {lead_comment_id} not found")
         return LeadCommentResponse.model_validate(lead_comment)
 
@@ -198,7 +405,7 @@ class LeadManager:
         if not lead:
             raise NotFound(f"Lead with id {lead_comment_id} not found")
         lead_comment = await self.comment_repo.get_by_id(lead_comment_id)
-        if not lead_comment:
+        if not lead_comment or lead_comment.lead_id != lead_id:
             raise NotFound(f"Lead comment with id {lead_comment_id} not found")
         lead_comment.comment = request.comment
         lead_comment.user_id = user_id
@@ -1,31 +1,89 @@
+import asyncio
 import secrets
 import string
+
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.hash import argon2
 
+from configs import (
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    ARGON2_TIME_COST,
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+)
+from exceptions import TooManyRequests
+
+hasher = argon2.using(
+    rounds=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+)
+
+
+class HashPool:
+    """
+    Пул потоков для Argon2, чтобы хэширование не блокировало event loop
+    (argon2-cffi отпускает GIL). Если задач в работе и очереди больше max_pending,
+    новые запросы сразу получают 429.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 32):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.executor: ThreadPoolExecutor | None = None
+
+    def __release(self):
+        self.pending -= 1
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            raise TooManyRequests("Too many authentication requests, try again later")
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="argon2")
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        future = self.executor.submit(func, *args)
+        # Счётчик уменьшается, когда поток реально закончил, даже если запрос отменили
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.__release))
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+hash_pool = HashPool(workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING)
+
 
 class PasswordService:
-    def __init__(self, length: int = 12):
+    def __init__(self, length: int = 12, pool: HashPool = hash_pool):
         self.length = length
         self.alphabet = string.ascii_letters + string.digits + string.punctuation
+        self.pool = pool
 
     def generate_password(self) -> str:
         """Генерация случайного пароля"""
         return ''.join(secrets.choice(self.alphabet) for _ in range(self.length))
 
-    def hash_password(self, password: str) -> str:
+    async def hash_password(self, password: str) -> str:
         """Хэширование пароля через Argon2"""
-        return argon2.hash(password)
+        return await self.pool.run(hasher.hash, password)
 
-    def verify_password(self, password: str, password_hash: str) -> bool:
+    async def verify_password(self, password: str, password_hash: str) -> bool:
         """Проверка пароля"""
-        return argon2.verify(password, password_hash)
+        return await self.pool.run(hasher.verify, password, password_hash)
 
-    def generate_and_hash(self) -> tuple[str, str]:
+    async def generate_and_hash(self) -> tuple[str, str]:
         """
         Сгенерировать пароль и вернуть (plain, hash)
         plain → отправляем пользователю (например, по email)
         hash  → сохраняем в БД
         """
         plain = self.generate_password()
-        hashed = self.hash_password(plain)
-        return plain, hashed
\ No newline at end of file
+        hashed = await self.hash_password(plain)
+        return plain, hashed
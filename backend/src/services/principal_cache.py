@@ -0,0 +1,53 @@
+import time
+
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from configs import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL
+from models.user import User
+
+
+class PrincipalCache:
+    """
+    Аутентифицированные пользователи по sub токена.
+    Запись живёт до exp токена, но не дольше ttl: сброс при изменении пользователя
+    действует только внутри воркера, остальные воркеры догонят по ttl.
+    Хранятся значения колонок, на каждый запрос собирается новый detached User.
+    """
+
+    def __init__(self, ttl: int = 60, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, sub: str) -> User | None:
+        entry = self.entries.get(sub)
+        if entry is None:
+            return None
+        expires_at, values = entry
+        if expires_at < time.time():
+            self.entries.pop(sub, None)
+            return None
+        self.entries.move_to_end(sub)
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, sub: str, user: User, exp: float):
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        self.entries[sub] = (min(exp, time.time() + self.ttl), values)
+        self.entries.move_to_end(sub)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        self.entries.clear()
+
+
+principal_cache = PrincipalCache(ttl=PRINCIPAL_CACHE_TTL, max_entries=PRINCIPAL_CACHE_SIZE)
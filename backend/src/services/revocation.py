@@ -0,0 +1,106 @@
+import asyncio
+import logging
+
+from datetime import datetime, timedelta
+
+from configs import REVOCATION_SYNC_INTERVAL, ACCESS_TTL
+from db.session import async_session
+from repository.refresh_token_repo import RefreshTokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+class RevokedFamilies:
+    """
+    Отозванные цепочки токенов в памяти воркера: family -> момент, после которого
+    ни один токен цепочки уже не действителен. Проверка на каждом запросе — поиск в dict.
+    """
+
+    def __init__(self):
+        self.expires: dict[str, float] = {}
+
+    def add(self, family: str, expires_at: datetime):
+        # Access токен, выданный вместе с последним refresh, может пережить его
+        until = max(expires_at, datetime.now() + ACCESS_TTL).timestamp()
+        if until > self.expires.get(family, 0):
+            self.expires[family] = until
+
+    def contains(self, family: str | None) -> bool:
+        return family is not None and family in self.expires
+
+    def prune(self):
+        now = datetime.now().timestamp()
+        self.expires = {family: until for family, until in self.expires.items() if until > now}
+
+    def __len__(self):
+        return len(self.expires)
+
+
+revoked_families = RevokedFamilies()
+
+
+class RevocationSync:
+    """
+    Периодически подтягивает цепочки, отозванные другими воркерами, чистит истёкшие
+    записи в памяти и удаляет истёкшие refresh токены из БД пачками по batch_size.
+    """
+
+    def __init__(
+            self,
+            revoked: RevokedFamilies = revoked_families,
+            interval: float = 5.0,
+            batch_size: int = 1000,
+    ):
+        self.revoked = revoked
+        self.interval = interval
+        self.batch_size = batch_size
+        self.synced_at: datetime | None = None
+        self.task: asyncio.Task | None = None
+
+    async def run_once(self, prune: bool = False):
+        started_at = datetime.now()
+        # Запас на расхождение часов воркеров и долгие транзакции
+        since = self.synced_at - timedelta(seconds=self.interval * 2) if self.synced_at else None
+        async with async_session() as session:
+            repo = RefreshTokenRepository(session)
+            for family, expires_at in await repo.revoked_since(since):
+                self.revoked.add(family, expires_at)
+            if prune:
+                while await repo.prune(started_at, self.batch_size) >= self.batch_size:
+                    pass
+        self.synced_at = started_at
+        self.revoked.prune()
+
+    async def __run(self):
+        rounds = 0
+        while True:
+            await asyncio.sleep(self.interval)
+            rounds += 1
+            try:
+                # Истёкшие токены из БД удаляются реже, чем идёт синхронизация
+                await self.run_once(prune=rounds % 100 == 0)
+            except Exception:
+                logger.exception("Revocation sync failed")
+
+    async def start(self):
+        if self.task is not None:
+            return
+        try:
+            await self.run_once()
+        except Exception:
+            logger.exception("Initial revocation sync failed")
+        if self.interval > 0:
+            self.task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+
+revocation_sync = RevocationSync(interval=REVOCATION_SYNC_INTERVAL)
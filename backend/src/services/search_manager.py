@@ -0,0 +1,127 @@
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs import SEARCH_LIMIT, SEARCH_TIMEOUT
+from db.session import async_session
+from filters.contact_filter import ContactFilter
+from filters.deal_filter import DealFilter
+from filters.lead_filter import LeadFilter
+from filters.paginator import LimitPaginator
+from filters.sorter import Sorter
+from filters.target_filter import TargetFilter
+from models import Contact, Deal, Lead, TargetCompany
+from repository.contact_repo import ContactRepository
+from repository.deal_repo import DealRepository
+from repository.lead_repo import LeadRepository
+from repository.taget_repo import TargetCompanyRepository
+from schemas.search import SearchHit, SearchSourceResponse, SearchResponse
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE query_canceled: Postgres прервал запрос по statement_timeout
+QUERY_CANCELED = "57014"
+
+
+def _statement_timeout(error: Exception) -> bool:
+    return isinstance(error, DBAPIError) and getattr(error.orig, "sqlstate", None) == QUERY_CANCELED
+
+
+class SearchManager:
+    """
+    Глобальный поиск по лидам, контактам, сделкам и таргетам.
+    Источники опрашиваются параллельно, у каждого своя сессия и таймаут:
+    медленный источник (таймаут или statement_timeout в Postgres) возвращает пустой список
+    с timed_out=True и не задерживает ответ,
+    упавший - пустой список с failed=True.
+    """
+
+    def __init__(self, limit: int = SEARCH_LIMIT, timeout: float = SEARCH_TIMEOUT):
+        self.limit = limit
+        self.timeout = timeout
+
+    async def __leads(self, db: AsyncSession, query: str) -> list[SearchHit]:
+        filters = LeadFilter(query=query)
+        result = await LeadRepository(db).list(
+            filters=filters,
+            sorter=Sorter(((filters.rank, "desc"), (Lead.id, "desc"))),
+            paginator=LimitPaginator(self.limit),
+        )
+        return [
+            SearchHit(id=lead.id, title=lead.full_name, subtitle=lead.company_name)
+            for lead in result["leads"]
+        ]
+
+    async def __contacts(self, db: AsyncSession, query: str) -> list[SearchHit]:
+        filters = ContactFilter(query)
+        result = await ContactRepository(db).list(
+            filters=filters,
+            sorter=Sorter(((filters.rank, "desc"), (Contact.id, "desc"))),
+            paginator=LimitPaginator(self.limit),
+        )
+        return [
+            SearchHit(id=contact.id, title=contact.full_name, subtitle=contact.phone)
+            for contact in result["contacts"]
+        ]
+
+    async def __deals(self, db: AsyncSession, query: str) -> list[SearchHit]:
+        result = await DealRepository(db).list(
+            filters=DealFilter(query=query),
+            sorter=Sorter(((Deal.created_at, "desc"), (Deal.id, "desc"))),
+            paginator=LimitPaginator(self.limit),
+        )
+        return [
+            SearchHit(id=deal.id, title=f"Deal #{deal.id}", subtitle=deal.status.value if deal.status else None)
+            for deal in result["deals"]
+        ]
+
+    async def __targets(self, db: AsyncSession, query: str) -> list[SearchHit]:
+        filters = TargetFilter(name=query)
+        result = await TargetCompanyRepository(db).list(
+            filters=filters,
+            sorter=Sorter(((filters.rank, "desc"), (TargetCompany.id, "desc"))),
+            paginator=LimitPaginator(self.limit),
+        )
+        return [
+            SearchHit(id=target.id, title=target.name)
+            for target in result["target_companies"]
+        ]
+
+    async def __query(self, source, query: str) -> list[SearchHit]:
+        async with async_session() as db:
+            # Postgres сам прервёт запрос, если отмена со стороны клиента не дойдёт
+            await db.execute(text(f"SET LOCAL statement_timeout = {int(self.timeout * 1000)}"))
+            return await source(db, query)
+
+    async def __run(self, name: str, source, query: str) -> SearchSourceResponse:
+        # Таймаут покрывает и получение соединения из пула, ошибка одного источника не роняет весь поиск
+        try:
+            items = await asyncio.wait_for(self.__query(source, query), self.timeout)
+            return SearchSourceResponse(items=items)
+        except asyncio.TimeoutError:
+            logger.warning("Search source %s timed out", name)
+            return SearchSourceResponse(timed_out=True)
+        except Exception as e:
+            if _statement_timeout(e):
+                logger.warning("Search source %s hit statement_timeout", name)
+                return SearchSourceResponse(timed_out=True)
+            logger.exception("Search source %s failed", name)
+            return SearchSourceResponse(failed=True)
+
+    async def search(
+            self,
+            query: str
+    ) -> SearchResponse:
+        sources = {
+            "leads": self.__leads,
+            "contacts": self.__contacts,
+            "deals": self.__deals,
+            "targets": self.__targets,
+        }
+        results = await asyncio.gather(
+            *(self.__run(name, source, query) for name, source in sources.items())
+        )
+        return SearchResponse(query=query, **dict(zip(sources, results)))
@@ -4,25 +4,53 @@ from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from cache import cached
 from exceptions import NotFound
-from filters.paginator import Paginator
+from filters.paginator import make_paginator
 from filters.sorter import Sorter
 from filters.target_filter import TargetFilter
 from models import TargetCompany
+from models.deal import DealStatusEnum
+from models.lead import StatusEnum
 
 from repository.click_repo import ClickRepository
-from repository.lead_repo import LeadRepository
 from repository.taget_repo import TargetCompanyRepository
 
-from schemas.base import Sort
-from schemas.target import TargetCompanyRequest, TargetCompanyResponse, TargetCompanyListResponse
+from schemas.base import SearchSort, PaginationMode
+from schemas.target import (
+    TargetCompanyRequest,
+    TargetCompanyResponse,
+    ClickBucket,
+    ClickPointResponse,
+    ClickSeriesResponse,
+    FunnelBucket,
+    FunnelPointResponse,
+    TargetFunnelResponse,
+    TargetFunnelListResponse,
+)
+from services.click_manager import click_pipeline
 
 
 class TargetCompanyManager:
     def __init__(self, db: AsyncSession):
         self.repo = TargetCompanyRepository(db)
         self.click_repo = ClickRepository(db)
-        self.lead_repo = LeadRepository(db)
+
+    @staticmethod
+    def __url(target_company_id: uuid.UUID) -> str:
+        return f"localhost:8000/c/{target_company_id}"
+
+    @staticmethod
+    def __to_response(row) -> TargetCompanyResponse:
+        target_company = row.TargetCompany
+        return TargetCompanyResponse(
+            id=target_company.id,
+            name=target_company.name,
+            is_active=target_company.is_active,
+            url=TargetCompanyManager.__url(target_company.id),
+            clicks=row.clicks,
+            leads=row.leads,
+        )
 
     async def create_target(
             self,
@@ -31,10 +59,12 @@ class TargetCompanyManager:
         target_company = await self.repo.create(
             request.name
         )
+        click_pipeline.targets.add(target_company.id)
         return TargetCompanyResponse(
             id=target_company.id,
             name=target_company.name,
-            url=f"localhost:8000/c/{target_company.id}"
+            is_active=target_company.is_active,
+            url=self.__url(target_company.id)
         )
 
     async def update_target(
@@ -56,24 +86,17 @@ class TargetCompanyManager:
         if not target_company:
             raise NotFound("Target company Not Found")
         await self.repo.delete(target_company)
+        click_pipeline.targets.discard(target_company.id)
 
+    @cached(prefix="targets:detail", ttl=30, tags=("target:{target_company_id}",), model=TargetCompanyResponse)
     async def get_target(
             self,
             target_company_id: uuid.UUID,
     ):
-        target_company = await self.repo.get_by_id(target_company_id)
-        if not target_company:
+        row = await self.repo.get_with_stats(target_company_id)
+        if not row:
             raise NotFound("Target company Not Found")
-        clicks = await self.click_repo.get_clicks(target_company.id)
-        leads = await self.lead_repo.list(target_id=target_company.id)
-        return TargetCompanyResponse(
-            id=target_company.id,
-            name=target_company.name,
-            is_active=target_company.is_active,
-            url=f"localhost:8000/c/{target_company.id}",
-            clicks=len(clicks),
-            leads=len(leads),
-        )
+        return self.__to_response(row)
 
     async def list_target(
             self,
@@ -81,9 +104,12 @@ class TargetCompanyManager:
             is_active: bool = None,
             created_from: datetime = None,
             created_to: datetime = None,
-            sorts: list[Sort] = None,
+            sorts: list[SearchSort] = None,
             page: int = 1,
-            size: int = 50
+            size: int = 50,
+            estimate_total: bool = False,
+            cursor: str = None,
+            pagination: PaginationMode = PaginationMode.page,
     ):
 
         filters = TargetFilter(
@@ -96,32 +122,126 @@ class TargetCompanyManager:
 
         for sort_by in sorts:
             col, destination = sort_by.split(":")
-            col = getattr(TargetCompany, col)
+            if col == "relevance":
+                col = filters.rank
+                if col is None:
+                    continue
+            else:
+                col = getattr(TargetCompany, col)
             sorters.append((col, destination))
 
         sorter = Sorter(
             tuple(sorters)
         )
 
-        paginator = Paginator(
+        paginator = make_paginator(
+            sorter=sorter,
+            key=TargetCompany.id,
             page=page,
-            size=size
+            size=size,
+            cursor=cursor,
+            mode=pagination,
+            estimate_total=estimate_total,
         )
 
-        target_companies = await self.repo.list(
+        target_companies = await self.repo.list_with_stats(
             filters, sorter, paginator
         )
-        return TargetCompanyListResponse(
-            target_companies=[
-                TargetCompanyResponse(
-                    id=target_company.id,
-                    name=target_company.name,
-                    is_active=target_company.is_active,
-                    url=f"localhost:8000/c/{target_company.id}",
-                    clicks=len(await self.click_repo.get_clicks(target_company.id)),
-                    leads=len(await self.lead_repo.list(target_id=target_company.id))
+        # Ответ собирается словарями по контракту TargetCompanyListResponse
+        for row in target_companies["target_companies"]:
+            row["url"] = self.__url(row["id"])
+        return target_companies
+
+    async def get_click_series(
+            self,
+            target_company_id: uuid.UUID,
+            bucket: ClickBucket = ClickBucket.day,
+            date_from: datetime = None,
+            date_to: datetime = None,
+    ):
+        target_company = await self.repo.get_by_id(target_company_id)
+        if not target_company:
+            raise NotFound("Target company Not Found")
+        points = await self.click_repo.series(
+            target_company_id,
+            bucket=bucket.value,
+            date_from=date_from,
+            date_to=date_to,
+        )
+        return ClickSeriesResponse(
+            target_id=target_company_id,
+            bucket=bucket,
+            points=[ClickPointResponse.model_validate(point) for point in points],
+        )
+
+    @staticmethod
+    def __add_to_point(point: FunnelPointResponse, row):
+        if row.kind == "click":
+            point.clicks += row.total
+        elif row.kind == "lead":
+            status = StatusEnum[row.status]
+            point.leads += row.total
+            point.leads_by_status[status] = point.leads_by_status.get(status, 0) + row.total
+        elif row.kind == "deal":
+            status = DealStatusEnum[row.status]
+            point.deals += row.total
+            point.deals_by_status[status] = point.deals_by_status.get(status, 0) + row.total
+            point.deal_sum += float(row.amount or 0)
+
+    @cached(prefix="targets:funnel", ttl=60, tags=("leads", "deals"), model=TargetFunnelListResponse)
+    async def get_funnels(
+            self,
+            target_ids: list[uuid.UUID] = None,
+            bucket: FunnelBucket = FunnelBucket.day,
+            date_from: datetime = None,
+            date_to: datetime = None,
+    ):
+        rows = await self.repo.funnel(
+            target_ids=target_ids,
+            bucket=bucket.value,
+            date_from=date_from,
+            date_to=date_to,
+        )
+
+        funnels: dict[uuid.UUID, TargetFunnelResponse] = {}
+        points: dict[tuple[uuid.UUID, datetime], FunnelPointResponse] = {}
+        for row in rows:
+            funnel = funnels.get(row.target_id)
+            if funnel is None:
+                funnel = funnels[row.target_id] = TargetFunnelResponse(
+                    target_id=row.target_id,
+                    bucket=bucket,
+                    totals=FunnelPointResponse(),
+                    points=[],
                 )
-                for target_company in target_companies.get("target_companies")
-            ],
-            pagination=target_companies.get("pagination")
+            point = points.get((row.target_id, row.bucket))
+            if point is None:
+                point = points[(row.target_id, row.bucket)] = FunnelPointResponse(bucket=row.bucket)
+                funnel.points.append(point)
+            self.__add_to_point(point, row)
+            self.__add_to_point(funnel.totals, row)
+
+        for funnel in funnels.values():
+            funnel.points.sort(key=lambda p: p.bucket)
+
+        return TargetFunnelListResponse(targets=list(funnels.values()))
+
+    async def get_funnel(
+            self,
+            target_company_id: uuid.UUID,
+            bucket: FunnelBucket = FunnelBucket.day,
+            date_from: datetime = None,
+            date_to: datetime = None,
+    ):
+        target_company = await self.repo.get_by_id(target_company_id)
+        if not target_company:
+            raise NotFound("Target company Not Found")
+        funnels = await self.get_funnels([target_company_id], bucket, date_from, date_to)
+        if funnels.targets:
+            return funnels.targets[0]
+        return TargetFunnelResponse(
+            target_id=target_company_id,
+            bucket=bucket,
+            totals=FunnelPointResponse(),
+            points=[],
         )
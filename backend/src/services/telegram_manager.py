@@ -1,11 +1,117 @@
+import asyncio
+import logging
+
 from datetime import datetime
+from typing import AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from configs import (
+    TELEGRAM_INTERACTION_FLUSH_INTERVAL,
+    TELEGRAM_INTERACTION_MAX_PENDING,
+    TELEGRAM_INTERACTION_BATCH,
+    EXPORT_BATCH_SIZE,
+)
+from db.session import async_session
 from exceptions import NotFound
+from filters.paginator import CursorPaginator
+from filters.sorter import Sorter
+from filters.telegram_filter import TelegramFilter
+from models.telegram import TelegramUser
 from repository.telegram_repo import TelegramRepository
+from schemas.base import ExportFormat
 from schemas.telegram import TelegramUserCreateRequest, TelegramUserResponse, AssignCompanyRequest, \
-    TelegramUserUpdateRequest
+    TelegramUserUpdateRequest, TelegramUserBatchRequest, TelegramUserBatchResponse
+from services.export import encode_rows
+
+logger = logging.getLogger(__name__)
+
+
+class InteractionBuffer:
+    """
+    Отложенная запись last_interaction: время последнего сообщения копится в памяти
+    по user_id (побеждает последнее) и пишется пачками раз в flush_interval
+    или досрочно, когда пользователей в буфере становится max_pending.
+    """
+
+    def __init__(
+            self,
+            flush_interval: float = 5.0,
+            max_pending: int = 10_000,
+            batch_size: int = 1000,
+    ):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.pending: dict[int, datetime] = {}
+        self.wakeup = asyncio.Event()
+        self.stopping = False
+        self.task: asyncio.Task | None = None
+
+    async def touch(self, user_id: int):
+        now = datetime.now()
+        if self.task is None:
+            # Воркер не запущен (скрипты, тесты) — пишем сразу
+            await self.flush({user_id: now})
+            return
+        self.pending[user_id] = now
+        if len(self.pending) >= self.max_pending:
+            self.wakeup.set()
+
+    async def flush(self, interactions: dict[int, datetime]):
+        # Сортировка задаёт одинаковый порядок блокировок строк у всех воркеров
+        rows = sorted(interactions.items())
+        async with async_session() as session:
+            repo = TelegramRepository(session)
+            for start in range(0, len(rows), self.batch_size):
+                await repo.touch_many(rows[start:start + self.batch_size])
+
+    async def flush_pending(self):
+        if not self.pending:
+            return
+        interactions, self.pending = self.pending, {}
+        try:
+            await self.flush(interactions)
+        except Exception:
+            logger.exception("Failed to flush %s telegram interactions", len(interactions))
+            # Вернём в буфер всё, что не перезаписано более новым временем
+            for user_id, interacted_at in interactions.items():
+                self.pending.setdefault(user_id, interacted_at)
+
+    async def __run(self):
+        while not self.stopping:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush_pending()
+
+    async def start(self):
+        if self.task is None:
+            self.stopping = False
+            self.task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        """Дописывает буфер и останавливает воркер"""
+        if self.task is None:
+            return
+        self.stopping = True
+        self.wakeup.set()
+        await self.task
+        self.task = None
+        await self.flush_pending()
+
+    @property
+    def depth(self) -> int:
+        return len(self.pending)
+
+
+interaction_buffer = InteractionBuffer(
+    flush_interval=TELEGRAM_INTERACTION_FLUSH_INTERVAL,
+    max_pending=TELEGRAM_INTERACTION_MAX_PENDING,
+    batch_size=TELEGRAM_INTERACTION_BATCH,
+)
 
 
 class TelegramUserManager:
@@ -16,9 +122,19 @@ class TelegramUserManager:
             self,
             request: TelegramUserCreateRequest
     ):
-        user = await self.repo.create(**request.model_dump())
+        """Идемпотентно: повтор регистрации обновляет lang, а не падает на первичном ключе"""
+        user = await self.repo.upsert(**request.model_dump())
         return TelegramUserResponse.model_validate(user)
 
+    async def sync_users(
+            self,
+            request: TelegramUserBatchRequest
+    ):
+        users = await self.repo.upsert_many([user.model_dump() for user in request.users])
+        return TelegramUserBatchResponse(
+            users=[TelegramUserResponse.model_validate(user) for user in users]
+        )
+
     async def delete_user(
             self,
             user_id: int
@@ -41,8 +157,60 @@ class TelegramUserManager:
         user.lang = request.lang
         await self.repo.update(user)
 
-    async def list_user(self):
-        pass
+    async def list_user(
+            self,
+            lang: list[str] = None,
+            company_id: int = None,
+            interacted_from: datetime = None,
+            interacted_to: datetime = None,
+            size: int = 100,
+            cursor: str = None,
+    ):
+        """Keyset-пагинация по user_id: страница не дороже первой при любой глубине"""
+        filters = TelegramFilter(lang, company_id, interacted_from, interacted_to)
+        sorter = Sorter(
+            ((TelegramUser.user_id, "asc"),)
+        )
+        paginator = CursorPaginator(
+            sorter=sorter,
+            key=TelegramUser.user_id,
+            cursor=cursor,
+            size=size,
+        )
+        return await self.repo.list(
+            filters=filters,
+            sorter=sorter,
+            paginator=paginator,
+        )
+
+    def iter_users(
+            self,
+            lang: list[str] = None,
+            company_id: int = None,
+            interacted_from: datetime = None,
+            interacted_to: datetime = None,
+            batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[list]:
+        """
+        Все пользователи сегмента пачками по batch_size из серверного курсора (для рассылок).
+        Держит соединение, пока итерация не закончится.
+        """
+        filters = TelegramFilter(lang, company_id, interacted_from, interacted_to)
+        return self.repo.iter_batches(filters, batch_size)
+
+    def export_users(
+            self,
+            lang: list[str] = None,
+            company_id: int = None,
+            interacted_from: datetime = None,
+            interacted_to: datetime = None,
+            export_format: ExportFormat = ExportFormat.ndjson,
+    ) -> AsyncIterator[bytes]:
+        return encode_rows(
+            [col.key for col in self.repo.list_columns],
+            self.iter_users(lang, company_id, interacted_from, interacted_to),
+            export_format,
+        )
 
     async def get_user(
             self,
@@ -66,9 +234,3 @@ class TelegramUserManager:
         user.company_id = request.company_id
         await self.repo.update(user)
 
-    async def update_interaction(self, user_id: int):
-        user = await self.repo.get(user_id)
-        if not user:
-            raise NotFound("User not found")
-        user.last_interaction = datetime.now()
-        await self.repo.update(user)
@@ -1,34 +1,134 @@
-from datetime import datetime, timedelta
+import time
 
-from jose import jwt, JWTError
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
 
-from configs import SECRET_KEY, ACCESS_TIME, REFRESH_TIME, TIMEZONE
+from jose import jwt as jose_jwt, JWTError
+
+try:
+    import jwt as pyjwt
+except ImportError:
+    pyjwt = None
+
+from configs import SECRET_KEY, ACCESS_TTL, REFRESH_TTL, TIMEZONE, JWT_BACKEND, TOKEN_CACHE_SIZE
 from exceptions import InvalidToken
 
 from models.user import User
 
 from schemas.auth import TokenResponse
 
+ALGORITHM = "HS256"
+
+
+class JWTBackend:
+    """Реализация подписи и проверки JWT. decode проверяет подпись и exp, иначе InvalidToken"""
+
+    def encode(self, payload: dict, key: str, algorithm: str = ALGORITHM) -> str:
+        raise NotImplementedError()
+
+    def decode(self, token: str, key: str, algorithm: str = ALGORITHM) -> dict:
+        raise NotImplementedError()
+
+
+class JoseBackend(JWTBackend):
+    def encode(self, payload: dict, key: str, algorithm: str = ALGORITHM) -> str:
+        return jose_jwt.encode(payload, key, algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str = ALGORITHM) -> dict:
+        try:
+            return jose_jwt.decode(token, key, algorithms=[algorithm])
+        except JWTError:
+            raise InvalidToken("Invalid Credentials")
+
+
+class PyJWTBackend(JWTBackend):
+    def __init__(self):
+        if pyjwt is None:
+            raise RuntimeError("PyJWT package is not installed")
+
+    def encode(self, payload: dict, key: str, algorithm: str = ALGORITHM) -> str:
+        return pyjwt.encode(payload, key, algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str = ALGORITHM) -> dict:
+        try:
+            return pyjwt.decode(token, key, algorithms=[algorithm])
+        except pyjwt.PyJWTError:
+            raise InvalidToken("Invalid Credentials")
+
+
+@lru_cache
+def get_jwt_backend() -> JWTBackend:
+    if JWT_BACKEND == "pyjwt":
+        return PyJWTBackend()
+    return JoseBackend()
+
+
+class VerifiedTokens:
+    """
+    LRU уже проверенных токенов: токен -> payload до его exp.
+    Повторный запрос с тем же bearer не проверяет подпись заново.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, token: str) -> dict | None:
+        entry = self.entries.get(token)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self.entries[token]
+            return None
+        self.entries.move_to_end(token)
+        return payload
+
+    def set(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_entries <= 0:
+            return
+        self.entries[token] = (exp, payload)
+        self.entries.move_to_end(token)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+verified_tokens = VerifiedTokens(TOKEN_CACHE_SIZE)
+
 
 class TokenService:
-    def __generate_token(self, user: User, is_refresh: bool = False) -> str:
-        exp = datetime.now(tz=TIMEZONE) + (
-            timedelta(hours=int(REFRESH_TIME)) if is_refresh else timedelta(hours=int(ACCESS_TIME)))
-        token = jwt.encode(
-            {
-                "sub": str(user.id),
-                "username": user.username,
-                "exp": exp,
-                "refresh": is_refresh
-            },
-            SECRET_KEY,
-            "HS256"
-        )
+    def __init__(
+            self,
+            backend: JWTBackend = None,
+            cache: VerifiedTokens = verified_tokens,
+    ):
+        self.backend = backend or get_jwt_backend()
+        self.cache = cache
+
+    def __generate_token(self, user: User, family: str = None, jti: str = None, is_refresh: bool = False) -> str:
+        exp = datetime.now(tz=TIMEZONE) + (REFRESH_TTL if is_refresh else ACCESS_TTL)
+        payload = {
+            "sub": str(user.id),
+            "username": user.username,
+            "exp": exp,
+            "refresh": is_refresh
+        }
+        # fam — цепочка входа (для отзыва), jti — запись refresh токена в БД
+        if family:
+            payload["fam"] = family
+        if jti and is_refresh:
+            payload["jti"] = jti
+        token = self.backend.encode(payload, SECRET_KEY)
         return token
 
-    def generate(self, user: User) -> TokenResponse:
-        access_token = self.__generate_token(user)
-        refresh_token = self.__generate_token(user, True)
+    def generate(self, user: User, family: str = None, jti: str = None) -> TokenResponse:
+        access_token = self.__generate_token(user, family)
+        refresh_token = self.__generate_token(user, family, jti, True)
         return TokenResponse(
             access_token=access_token,
             refresh_token=refresh_token,
@@ -36,11 +136,12 @@ class TokenService:
         )
 
     def __validate_token(self, token: str) -> dict:
-        try:
-            return jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-
-        except JWTError:
-            raise InvalidToken("Invalid Credentials")
+        payload = self.cache.get(token)
+        if payload is None:
+            payload = self.backend.decode(token, SECRET_KEY)
+            self.cache.set(token, payload)
+        # Копия, чтобы вызывающий код не испортил запись кеша
+        return dict(payload)
 
     def validate(self, token: str, is_refresh: bool = False) -> dict:
         payload = self.__validate_token(token)
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+from datetime import datetime, timedelta
+
+from configs import SOFT_DELETE_RETENTION_DAYS, PURGE_INTERVAL, PURGE_BATCH
+from db.session import async_session
+from models import LeadComment, DealComment, Deal, Contact, Lead, TargetCompany
+from repository.base_repo import BaseRepository
+from repository.lead_status_repo import LeadStatusRepository
+
+logger = logging.getLogger(__name__)
+
+# Дочерние таблицы раньше родительских: каскады при удалении родителя почти пустые
+PURGE_ORDER = (LeadComment, DealComment, Deal, Contact, Lead, TargetCompany)
+
+
+class TombstonePurger:
+    """
+    Периодически физически удаляет строки, помеченные удалёнными больше retention_days назад.
+    Каждая пачка (batch_size строк) — отдельная короткая транзакция.
+    """
+
+    def __init__(
+            self,
+            interval: int = 3600,
+            retention_days: int = 30,
+            batch_size: int = 1000,
+    ):
+        self.interval = interval
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.task: asyncio.Task | None = None
+
+    async def run_once(self) -> dict[str, int]:
+        purged = {}
+        before = datetime.now() - timedelta(days=self.retention_days)
+        async with async_session() as session:
+            repo = BaseRepository(session)
+            for model in PURGE_ORDER:
+                total = 0
+                while True:
+                    count = await repo.purge(model, before, self.batch_size)
+                    total += count
+                    if count < self.batch_size:
+                        break
+                purged[model.__tablename__] = total
+
+            if purged[TargetCompany.__tablename__]:
+                await LeadStatusRepository(session).rebuild()
+        return purged
+
+    async def __run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Tombstone purge failed")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self.task is None and self.interval > 0 and self.retention_days > 0:
+            self.task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+
+tombstone_purger = TombstonePurger(
+    interval=PURGE_INTERVAL,
+    retention_days=SOFT_DELETE_RETENTION_DAYS,
+    batch_size=PURGE_BATCH,
+)
@@ -1,15 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-# from cache import redis_cache
+from cache import cached
 from exceptions import Forbidden, NotFound, BadRequest
-from filters.paginator import Paginator
+from filters.paginator import make_paginator
 from filters.sorter import Sorter
 from filters.user_filter import UserFilter
 from models.user import User
 from repository.user_repo import UserRepository
-from schemas.base import Sort
+from schemas.base import SearchSort, PaginationMode
 from schemas.user import UserRequest, UserCreateRequest, UserResponse, UserListResponse
 from services.password_service import PasswordService
+from services.principal_cache import principal_cache
 
 
 class UserManager:
@@ -31,7 +32,7 @@ class UserManager:
         users = await self.repo.get_by_username(request.username)
         if users:
             raise BadRequest("Username already exists")
-        request.password = self.password_service.hash_password(request.password)
+        request.password = await self.password_service.hash_password(request.password)
         user = await self.repo.create(**request.model_dump())
         return UserResponse.model_validate(user)
 
@@ -59,6 +60,7 @@ class UserManager:
                 raise BadRequest("Username already exists")
         user.username = request.username
         await self.repo.update(user)
+        principal_cache.invalidate(user.id)
 
     async def delete_user(
             self,
@@ -68,15 +70,19 @@ class UserManager:
         if not user:
             raise NotFound("User not found")
         await self.repo.delete(user)
-    #
-    # @redis_cache(prefix="users:list", ttl=120)
+        principal_cache.invalidate(user.id)
+
+    @cached(prefix="users:list", ttl=120, tags=("users",), model=UserListResponse)
     async def get_users(
             self,
             is_superuser: bool = None,
             full_name: str = None,
-            sorts: list[Sort] = None,
+            sorts: list[SearchSort] = None,
             page: int = 1,
-            size: int = 50
+            size: int = 50,
+            estimate_total: bool = False,
+            cursor: str = None,
+            pagination: PaginationMode = PaginationMode.page,
     ):
         filters = UserFilter(
             is_superuser=is_superuser,
@@ -87,16 +93,26 @@ class UserManager:
 
         for sort_by in sorts:
             col, destination = sort_by.split(":")
-            col = getattr(User, col)
+            if col == "relevance":
+                col = filters.rank
+                if col is None:
+                    continue
+            else:
+                col = getattr(User, col)
             sorters.append((col, destination))
 
         sorter = Sorter(
             tuple(sorters)
         )
 
-        paginator = Paginator(
+        paginator = make_paginator(
+            sorter=sorter,
+            key=User.id,
             page=page,
-            size=size
+            size=size,
+            cursor=cursor,
+            mode=pagination,
+            estimate_total=estimate_total,
         )
         users = await self.repo.list(
             filters=filters,
@@ -104,8 +120,5 @@ class UserManager:
             paginator=paginator,
         )
         return UserListResponse(
-            users=[
-                UserResponse.model_validate(user)
-                for user in users
-            ]
+            **users
         )
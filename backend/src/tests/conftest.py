@@ -0,0 +1,135 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from db.instrumentation import instrument
+import models  # noqa: F401 — регистрирует все таблицы в Base.metadata
+from models.base import Base
+
+
+class SyncSession:
+    """
+    AsyncSession поверх синхронной Session на SQLite: async-драйвера в тестовом окружении нет,
+    а репозиториям нужен только асинхронный интерфейс сессии.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.info = session.info
+
+    def add(self, instance):
+        self.session.add(instance)
+
+    def add_all(self, instances):
+        self.session.add_all(instances)
+
+    async def execute(self, *args, **kwargs):
+        return self.session.execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return self.session.scalar(*args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return self.session.scalars(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return self.session.get(*args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        self.session.flush(*args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        self.session.refresh(*args, **kwargs)
+
+    async def delete(self, instance):
+        self.session.delete(instance)
+
+    async def commit(self):
+        self.session.commit()
+
+    async def rollback(self):
+        self.session.rollback()
+
+    async def close(self):
+        self.session.close()
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        # Вычисляемые колонки phone_digits используют regexp_replace из Postgres
+        dbapi_connection.create_function(
+            "regexp_replace", 4,
+            lambda value, pattern, replacement, flags: re.sub(pattern, replacement, value or ""),
+            deterministic=True,
+        )
+        # Воронка группирует по date_trunc; для тестов хватает дня и часа
+        dbapi_connection.create_function(
+            "date_trunc", 2,
+            lambda unit, value: value and (value[:10] if unit == "day" else value[:13]),
+            deterministic=True,
+        )
+
+    Base.metadata.create_all(engine)
+    instrument(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = SyncSession(Session(engine, expire_on_commit=False))
+    yield session
+    session.session.close()
+
+
+async def call(app, method: str, path: str, query: str = "", headers: dict = None, body: bytes = b""):
+    """Вызов ASGI-приложения без HTTP-клиента; возвращает (status, headers, body)"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 1),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {"status": None, "headers": {}, "body": b""}
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+
+def json_body(body: bytes):
+    return json.loads(body)
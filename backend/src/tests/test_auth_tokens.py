@@ -0,0 +1,150 @@
+"""Ротация refresh токенов, отзыв цепочек (family) и синхронизация отзыва между воркерами"""
+import asyncio
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.instrumentation import query_budget
+from dependencies import get_db
+from exceptions import InvalidToken
+from main import app
+from models import User
+from models.refresh_token import RefreshToken
+from repository.refresh_token_repo import RefreshTokenRepository
+from services import auth_manager, revocation
+from services.auth_manager import AuthManager
+from services.password_service import hasher
+from services.principal_cache import principal_cache
+from services.revocation import RevokedFamilies, RevocationSync
+from services.token_service import verified_tokens
+from tests.conftest import SyncSession, call
+
+PASSWORD = "secret-password"
+# Дешёвый хэш, чтобы логин в тестах не занимал сотни миллисекунд
+PASSWORD_HASH = hasher.using(rounds=1, memory_cost=1024, parallelism=1).hash(PASSWORD)
+
+
+@pytest.fixture
+def revoked(monkeypatch):
+    revoked = RevokedFamilies()
+    monkeypatch.setattr(auth_manager, "revoked_families", revoked)
+    verified_tokens.clear()
+    principal_cache.entries.clear()
+    yield revoked
+    verified_tokens.clear()
+    principal_cache.entries.clear()
+
+
+@pytest.fixture
+def user(db):
+    user = User(id=1, full_name="Operator", username="operator", hashed_password=PASSWORD_HASH)
+    db.add(user)
+    db.session.commit()
+    return user
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def login(db):
+    return run(AuthManager(db).login("operator", PASSWORD))
+
+
+def family_of(db, token: str) -> str:
+    return AuthManager(db).token_service.validate(token)["fam"]
+
+
+def test_refresh_token_rotates_once(db, user, revoked):
+    tokens = login(db)
+    rotated = run(AuthManager(db).refresh_token(tokens.refresh_token))
+
+    assert rotated.refresh_token != tokens.refresh_token
+    assert family_of(db, rotated.access_token) == family_of(db, tokens.access_token)
+    with pytest.raises(InvalidToken):
+        run(AuthManager(db).refresh_token(tokens.refresh_token))
+
+
+def test_reused_refresh_token_revokes_family(db, user, revoked):
+    tokens = login(db)
+    family = family_of(db, tokens.access_token)
+    rotated = run(AuthManager(db).refresh_token(tokens.refresh_token))
+
+    # Повтор уже обменянного токена: утечка, отзывается вся цепочка
+    with pytest.raises(InvalidToken):
+        run(AuthManager(db).refresh_token(tokens.refresh_token))
+
+    assert revoked.contains(family)
+    revoked_at = db.session.scalars(select(RefreshToken.revoked_at).where(RefreshToken.family == family)).all()
+    assert len(revoked_at) == 2 and None not in revoked_at
+    with pytest.raises(InvalidToken):
+        run(AuthManager(db).refresh_token(rotated.refresh_token))
+    with pytest.raises(InvalidToken):
+        run(AuthManager(db).get_me(rotated.access_token))
+
+
+def test_revoked_access_token_rejected_without_db(db, user, revoked):
+    tokens = login(db)
+    assert run(AuthManager(db).get_me(tokens.access_token)).id == user.id
+
+    run(AuthManager(db).logout(tokens.access_token))
+
+    with query_budget(0):
+        with pytest.raises(InvalidToken):
+            run(AuthManager(db).get_me(tokens.access_token))
+
+
+def test_logout_all_revokes_every_family(db, user, revoked):
+    sessions = [login(db) for _ in range(2)]
+    other = login(db)
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        status, _, body = run(call(
+            app, "POST", "/auth/logout-all",
+            headers={"authorization": f"Bearer {other.access_token}"},
+        ))
+    finally:
+        app.dependency_overrides.clear()
+
+    assert status == 204, body
+    for tokens in [*sessions, other]:
+        assert revoked.contains(family_of(db, tokens.access_token))
+        with pytest.raises(InvalidToken):
+            run(AuthManager(db).get_me(tokens.access_token))
+        with pytest.raises(InvalidToken):
+            run(AuthManager(db).refresh_token(tokens.refresh_token))
+
+
+def test_sync_picks_up_revocations_from_other_workers(db, engine, user, monkeypatch):
+    @asynccontextmanager
+    async def worker_session():
+        session = SyncSession(Session(engine, expire_on_commit=False))
+        try:
+            yield session
+        finally:
+            await session.close()
+
+    monkeypatch.setattr(revocation, "async_session", worker_session)
+    repo = RefreshTokenRepository(db)
+    expires_at = datetime.now() + timedelta(days=1)
+    for jti, family in (("a1", "family-a"), ("b1", "family-b"), ("c1", "family-c")):
+        run(repo.create(jti=jti, family=family, user_id=user.id, expires_at=expires_at))
+    run(repo.commit())
+
+    local = RevokedFamilies()
+    sync = RevocationSync(revoked=local, interval=1)
+
+    # Отзыв другим воркером: только запись в БД, в память этого воркера не попал
+    run(repo.revoke_family("family-a"))
+    run(sync.run_once())
+    assert local.contains("family-a")
+    assert not local.contains("family-b")
+
+    run(repo.revoke_user(user.id))
+    run(sync.run_once())
+    assert local.contains("family-b") and local.contains("family-c")
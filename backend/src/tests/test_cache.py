@@ -0,0 +1,46 @@
+import asyncio
+
+import cache
+from cache import MemoryBackend, cached
+
+
+def test_single_flight_shares_one_call(monkeypatch):
+    monkeypatch.setattr(cache, "get_cache", lambda: MemoryBackend(100))
+    calls = []
+
+    @cached("test-shared")
+    async def load(key: int):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    async def main():
+        return await asyncio.gather(*(load(1) for _ in range(10)))
+
+    assert asyncio.run(main()) == [{"key": 1}] * 10
+    assert calls == [1]
+
+
+def test_leader_cancel_does_not_cancel_waiters(monkeypatch):
+    monkeypatch.setattr(cache, "get_cache", lambda: MemoryBackend(100))
+    calls = []
+
+    @cached("test-cancel")
+    async def load(key: int):
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return {"key": key}
+
+    async def main():
+        leader = asyncio.create_task(load(1))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(load(1)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        assert leader.cancelled()
+        return results
+
+    assert asyncio.run(main()) == [{"key": 1}] * 3
+    assert cache._inflight == {}
+    assert len(calls) == 4
@@ -0,0 +1,50 @@
+import asyncio
+import uuid
+
+from metrics import clicks_dropped
+from services.click_manager import ClickPipeline
+
+
+class AlwaysActive:
+    async def contains(self, target_id):
+        return True
+
+
+class FlakyPipeline(ClickPipeline):
+    def __init__(self, failures: int, **kwargs):
+        super().__init__(targets=AlwaysActive(), flush_interval=0.01, retry_delay=0.001, **kwargs)
+        self.failures = failures
+        self.written = []
+
+    async def flush(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database is unavailable")
+        self.written.extend(batch)
+
+
+async def track(pipeline: ClickPipeline, count: int):
+    await pipeline.start()
+    for _ in range(count):
+        await pipeline.track(uuid.uuid4())
+    await pipeline.stop()
+
+
+def test_flush_retries_transient_errors():
+    pipeline = FlakyPipeline(failures=2, flush_attempts=3)
+    dropped = clicks_dropped.values.get((), 0)
+
+    asyncio.run(track(pipeline, 5))
+
+    assert len(pipeline.written) == 5
+    assert clicks_dropped.values.get((), 0) == dropped
+
+
+def test_flush_counts_dropped_clicks():
+    pipeline = FlakyPipeline(failures=100, flush_attempts=2)
+    dropped = clicks_dropped.values.get((), 0)
+
+    asyncio.run(track(pipeline, 5))
+
+    assert pipeline.written == []
+    assert clicks_dropped.values.get((), 0) == dropped + 5
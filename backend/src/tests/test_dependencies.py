@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+import dependencies
+from exceptions import UnAuthorized
+
+
+def test_actor_bot_token_without_bearer(monkeypatch):
+    monkeypatch.setattr(dependencies, "BOT_SECRET", "bot-secret")
+    actor = asyncio.run(dependencies.get_actor(token=None, db=None, x_bot_token="bot-secret"))
+    assert actor is None
+
+
+@pytest.mark.parametrize("bot_token", [None, "wrong"])
+def test_actor_without_credentials(monkeypatch, bot_token):
+    monkeypatch.setattr(dependencies, "BOT_SECRET", "bot-secret")
+    with pytest.raises(UnAuthorized):
+        asyncio.run(dependencies.get_actor(token=None, db=None, x_bot_token=bot_token))
+
+
+def test_actor_falls_back_to_bearer(monkeypatch):
+    async def current_user(token, db):
+        return token
+
+    monkeypatch.setattr(dependencies, "BOT_SECRET", "bot-secret")
+    monkeypatch.setattr(dependencies, "get_current_user", current_user)
+    actor = asyncio.run(dependencies.get_actor(token="user", db=None, x_bot_token="wrong"))
+    assert actor == "user"
@@ -0,0 +1,46 @@
+import asyncio
+
+from schemas.lead import LeadImportFormat
+from services.lead_import import INVALID_ENCODING, iter_records
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def records(import_format: LeadImportFormat, *chunks: bytes) -> list:
+    async def collect():
+        return [record async for record in iter_records(stream(*chunks), import_format)]
+
+    return asyncio.run(collect())
+
+
+def test_ndjson_invalid_utf8_is_a_row_error():
+    result = records(
+        LeadImportFormat.ndjson,
+        '{"full_name": "Алишер"}\n'.encode(),
+        b'{"full_name": "\xff\xfe"}\n',
+        b'{"full_name": "Bob"}',
+    )
+
+    assert result == [
+        (1, {"full_name": "Алишер"}, None),
+        (2, None, INVALID_ENCODING),
+        (3, {"full_name": "Bob"}, None),
+    ]
+
+
+def test_csv_invalid_utf8_is_a_row_error():
+    result = records(
+        LeadImportFormat.csv,
+        "﻿full_name,phone\n".encode(),
+        b"Bad \xc3,1\n",
+        "Алишер,".encode(),
+        "2\n".encode(),
+    )
+
+    assert result == [
+        (1, None, INVALID_ENCODING),
+        (2, {"full_name": "Алишер", "phone": "2"}, None),
+    ]
@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+
+import pytest
+
+from sqlalchemy.dialects import postgresql
+
+from models import Lead, TargetCompany
+from models.lead import StatusEnum
+from models.lead_status import LeadStatusCounter, NO_TARGET
+from repository import base_repo
+from repository.lead_repo import LeadRepository
+from repository.lead_status_repo import LeadStatusRepository, COUNTER_FIELDS
+from services.lead_manager import LeadManager
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    tags = []
+
+    async def invalidate(*names):
+        tags.extend(names)
+
+    async def bump(self, deltas):
+        pass
+
+    monkeypatch.setattr(base_repo, "invalidate", invalidate)
+    monkeypatch.setattr(LeadStatusRepository, "bump", bump)
+    return tags
+
+
+def test_moving_lead_invalidates_both_targets(db, invalidated):
+    old, new = TargetCompany(name="Old"), TargetCompany(name="New")
+    db.add_all([old, new])
+    db.session.flush()
+    lead = Lead(
+        full_name="Lead",
+        email="lead@example.com",
+        phone="+998 90 000 00 00",
+        status=StatusEnum.NEW,
+        company_name="Company",
+        company_info="Info",
+        target_id=old.id,
+    )
+    db.add(lead)
+    db.session.commit()
+
+    lead.target_id = new.id
+    asyncio.run(LeadRepository(db).update(lead))
+
+    assert f"target:{old.id}" in invalidated
+    assert f"target:{new.id}" in invalidated
+    assert "leads" in invalidated
+
+
+class CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return Result()
+
+
+class Result:
+    def all(self):
+        return []
+
+
+def test_status_totals_are_bigint_on_postgres():
+    session = CapturingSession()
+    asyncio.run(LeadStatusRepository(session).totals())
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+
+    for field in COUNTER_FIELDS:
+        assert f"CAST(sum(lead_status_counters.{field}) AS BIGINT) AS {field}" in sql
+
+
+def test_time_in_status_uses_integer_counters(db):
+    db.add_all([
+        LeadStatusCounter(target_key=NO_TARGET, status=StatusEnum.NEW, leads=1, exited=2, seconds=7),
+        LeadStatusCounter(target_key=uuid.uuid4(), status=StatusEnum.NEW, leads=2, exited=2, seconds=3),
+    ])
+    db.session.commit()
+
+    rows = asyncio.run(LeadStatusRepository(db).totals())
+    assert all(type(getattr(row, field)) is int for row in rows for field in COUNTER_FIELDS)
+
+    result = asyncio.run(LeadManager(db).get_time_in_status())
+    new = next(item for item in result.statuses if item.status == StatusEnum.NEW)
+    assert new.exited == 4
+    assert new.avg_seconds == 2.5
@@ -0,0 +1,121 @@
+"""
+Списки без ORM и повторной валидации: тот же контракт ListLeadResponse, выше пропускная способность.
+Цифры печатаются, смотреть с `pytest -s tests/test_list_serialization.py`.
+"""
+import asyncio
+import re
+import time
+
+from datetime import datetime
+
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from filters.paginator import make_paginator
+from filters.sorter import Sorter
+from models import Lead, TargetCompany
+from models.click import ClickRollup
+from models.lead import StatusEnum
+from repository.lead_repo import LeadRepository
+from repository.taget_repo import TargetCompanyRepository
+from schemas.base import SearchSort
+from schemas.lead import ListLeadResponse
+from schemas.target import TargetCompanyListResponse, TargetCompanyResponse
+from services.target_company import TargetCompanyManager
+from serializers import FastJSONResponse, loads
+
+ROWS = 500
+ROUNDS = 20
+
+
+@pytest.fixture
+def leads(db):
+    db.add_all([
+        Lead(
+            full_name=f"Lead {i}",
+            email=f"lead{i}@example.com",
+            phone=f"+998 90 {i:07d}",
+            status=StatusEnum.NEW,
+            company_name="Company",
+            company_info="Info",
+        )
+        for i in range(ROWS)
+    ])
+    db.session.commit()
+
+
+def paginator():
+    sorter = Sorter(((Lead.id, "asc"),))
+    return sorter, make_paginator(sorter=sorter, key=Lead.id, page=1, size=ROWS)
+
+
+async def orm_body(repo: LeadRepository) -> bytes:
+    """Прежний путь: ORM объекты → ListLeadResponse(from_attributes) → response_model → JSON"""
+    sorter, page = paginator()
+    result = await repo.list(sorter=sorter, paginator=page)
+    response = ListLeadResponse(**result)
+    return JSONResponse(jsonable_encoder(ListLeadResponse.model_validate(response))).body
+
+
+async def rows_body(repo: LeadRepository) -> bytes:
+    sorter, page = paginator()
+    result = await repo.list_rows(sorter=sorter, paginator=page)
+    return FastJSONResponse(result).body
+
+
+def per_second(func, repo) -> float:
+    async def run():
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            await func(repo)
+        return ROUNDS / (time.perf_counter() - started)
+
+    return asyncio.run(run())
+
+
+def test_rows_path_keeps_contract(db, leads):
+    repo = LeadRepository(db)
+    expected = ListLeadResponse.model_validate(loads(asyncio.run(orm_body(repo))))
+    actual = ListLeadResponse.model_validate(loads(asyncio.run(rows_body(repo))))
+
+    assert len(actual.leads) == ROWS
+    assert actual == expected
+
+
+def test_rows_path_throughput(db, leads):
+    repo = LeadRepository(db)
+    orm_rps = per_second(orm_body, repo)
+    rows_rps = per_second(rows_body, repo)
+
+    print(f"\n{ROWS} leads per page: ORM + validation {orm_rps:.0f} pages/s, rows + FastJSON {rows_rps:.0f} pages/s")
+    assert rows_rps > orm_rps
+
+
+def test_target_rows_keep_json_types(db):
+    target = TargetCompany(name="Target")
+    db.add(target)
+    db.session.flush()
+    db.add(ClickRollup(target_id=target.id, hour=datetime(2024, 1, 1), clicks=5))
+    db.session.commit()
+
+    result = asyncio.run(TargetCompanyManager(db).list_target(sorts=[SearchSort.desc], size=10))
+    row = loads(FastJSONResponse(result).body)["target_companies"][0]
+
+    # Ответ строится без pydantic: типы JSON должны совпадать с объявленными в схеме
+    for name, field in TargetCompanyResponse.model_fields.items():
+        if field.annotation is int:
+            assert type(row[name]) is int, name
+    assert row["clicks"] == 5
+    TargetCompanyListResponse.model_validate(loads(FastJSONResponse(result).body))
+
+
+def test_target_stats_are_bigint_on_postgres():
+    # sum(bigint) в Postgres — numeric, asyncpg вернул бы Decimal, а JSON — 5.0
+    sql = str(select(*TargetCompanyRepository.stats_columns()).compile(dialect=postgresql.dialect()))
+
+    assert re.search(r"CAST\(coalesce\(sum\(click_rollups\.clicks\), \S+\) AS BIGINT\)", sql)
+    assert re.search(r"CAST\(coalesce\(sum\(lead_status_counters\.leads\), \S+\) AS BIGINT\)", sql)
@@ -0,0 +1,56 @@
+"""
+Накладные расходы MetricsMiddleware на запрос.
+Цифры печатаются, смотреть с `pytest -s tests/test_metrics_middleware.py`.
+"""
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from metrics import http_requests, render
+from middlewares.metrics import MetricsMiddleware
+from tests.conftest import call
+
+REQUESTS = 5000
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping/{item}")
+    async def ping(item: int):
+        return PlainTextResponse("pong")
+
+    return app
+
+
+def per_request_us(app) -> float:
+    async def run():
+        for _ in range(100):
+            await call(app, "GET", "/ping/1")
+        started = time.perf_counter()
+        for i in range(REQUESTS):
+            await call(app, "GET", f"/ping/{i}")
+        return (time.perf_counter() - started) / REQUESTS * 1_000_000
+
+    return asyncio.run(run())
+
+
+def test_metrics_middleware_overhead():
+    bare = per_request_us(make_app())
+    measured = per_request_us(MetricsMiddleware(make_app()))
+    overhead = measured - bare
+
+    print(f"\nper request: bare {bare:.1f} us, with metrics {measured:.1f} us, overhead {overhead:.1f} us")
+    # Запас на шумное окружение; на деле единицы микросекунд
+    assert overhead < 50
+
+
+def test_metrics_are_labelled_by_route_template():
+    status, _, _ = asyncio.run(call(MetricsMiddleware(make_app()), "GET", "/ping/42"))
+
+    assert status == 200
+    body = render([http_requests])
+    assert 'http_requests_total{method="GET",route="/ping/{item}",status="200"}' in body
+    assert "/ping/42" not in body
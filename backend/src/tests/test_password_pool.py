@@ -0,0 +1,81 @@
+"""
+Хэширование паролей в пуле: admission limit и задержка event loop во время шторма логинов.
+Перцентили печатаются, смотреть с `pytest -s tests/test_password_pool.py`.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from exceptions import TooManyRequests
+from services.password_service import HashPool, hasher
+
+# Дешевле боевых параметров, чтобы тест шёл быстро; соотношение сохраняется
+test_hasher = hasher.using(rounds=2, memory_cost=16384, parallelism=1)
+LOGINS = 40
+
+
+def p99(samples: list[float]) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+async def loop_lag(done: asyncio.Event, interval: float = 0.001) -> list[float]:
+    """Насколько позже запланированного просыпается соседняя корутина (мс)"""
+    lags = []
+    while not done.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - started - interval) * 1000)
+    return lags
+
+
+async def login_storm(verify) -> list[float]:
+    password_hash = test_hasher.hash("secret")
+    done = asyncio.Event()
+    probe = asyncio.create_task(loop_lag(done))
+    await asyncio.sleep(0)
+    await asyncio.gather(*(verify("secret", password_hash) for _ in range(LOGINS)))
+    done.set()
+    return await probe
+
+
+def test_pool_keeps_event_loop_responsive():
+    pool = HashPool(workers=4, max_pending=LOGINS)
+
+    async def inline(password, password_hash):
+        return test_hasher.verify(password, password_hash)
+
+    async def pooled(password, password_hash):
+        return await pool.run(test_hasher.verify, password, password_hash)
+
+    try:
+        inline_p99 = p99(asyncio.run(login_storm(inline)))
+        pooled_p99 = p99(asyncio.run(login_storm(pooled)))
+    finally:
+        pool.shutdown()
+
+    print(f"\nloop lag p99 during {LOGINS} logins: inline {inline_p99:.1f} ms, pool {pooled_p99:.1f} ms")
+    assert pooled_p99 < inline_p99
+
+
+def test_pool_rejects_when_saturated():
+    pool = HashPool(workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(TooManyRequests):
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+        await asyncio.sleep(0)
+        return pool.pending
+
+    try:
+        assert asyncio.run(main()) == 0
+    finally:
+        release.set()
+        pool.shutdown()
@@ -0,0 +1,39 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from db.session import TimedQueuePool
+
+
+def checkout(pool: TimedQueuePool):
+    return asyncio.run(greenlet_spawn(pool.connect))
+
+
+def test_pool_timeout_is_counted():
+    pool = TimedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01)
+    held = checkout(pool)
+
+    with pytest.raises(PoolTimeoutError):
+        checkout(pool)
+
+    assert pool.timeouts == 1
+    assert pool.wait_count == 2
+    assert pool.wait_max >= 0.01
+    held.close()
+
+
+def test_connect_error_is_not_a_timeout():
+    def refuse():
+        raise ConnectionRefusedError("database is down")
+
+    pool = TimedQueuePool(refuse, pool_size=1, max_overflow=0, timeout=0.01)
+
+    with pytest.raises(ConnectionRefusedError):
+        checkout(pool)
+
+    assert pool.timeouts == 0
+    assert pool.wait_count == 1
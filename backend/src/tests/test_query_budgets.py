@@ -0,0 +1,79 @@
+"""Бюджеты SQL на горячих маршрутах: число запросов не зависит от размера страницы"""
+import asyncio
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import cache
+from cache import NullBackend
+from db.instrumentation import query_budget
+from dependencies import get_db, get_current_user, get_actor
+from main import app
+from models import Lead, TargetCompany, TelegramUser, User
+from models.lead import StatusEnum
+from tests.conftest import call, json_body
+
+ROWS = 25
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(cache, "get_cache", NullBackend)
+    user = User(id=1, full_name="Operator", username="operator", hashed_password="-", is_superuser=True)
+
+    async def override_db():
+        return db
+
+    async def override_user():
+        return user
+
+    app.dependency_overrides.update({
+        get_db: override_db,
+        get_current_user: override_user,
+        get_actor: override_user,
+    })
+    yield lambda path, query="": asyncio.run(call(app, "GET", path, query))
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def seeded(db):
+    now = datetime(2024, 1, 1)
+    target = TargetCompany(name="Target", created_at=now)
+    db.add(target)
+    db.session.flush()
+    for i in range(ROWS):
+        created_at = now + timedelta(minutes=i)
+        db.add_all([
+            TargetCompany(name=f"Target {i}", created_at=created_at),
+            Lead(
+                full_name=f"Lead {i}",
+                email=f"lead{i}@example.com",
+                phone=f"+998 90 000 00 {i:02d}",
+                status=StatusEnum.NEW,
+                company_name="Company",
+                company_info="Info",
+                target_id=target.id,
+                created_at=created_at,
+            ),
+            TelegramUser(user_id=1000 + i, last_interaction=created_at, lang="ru"),
+        ])
+    db.session.commit()
+
+
+@pytest.mark.parametrize("path, query, budget", [
+    ("/target/", "sort_by=created_at:desc", 2),
+    ("/leads/", "sort_by=created_at:desc", 2),
+    ("/telegram/", "", 1),
+])
+@pytest.mark.parametrize("size", [1, 10, ROWS])
+def test_list_route_query_budget(client, seeded, path, query, budget, size):
+    with query_budget(budget) as stats:
+        status, headers, body = client(path, f"{query}&size={size}")
+
+    assert status == 200, body
+    assert f'"{stats.queries} queries"' in headers["server-timing"]
+    payload = json_body(body)
+    items = next(value for value in payload.values() if isinstance(value, list))
+    assert len(items) == size
@@ -0,0 +1,92 @@
+"""
+Trigram-поиск SearchFilter. Бенчмарк против старого ILIKE нужен Postgres с миграциями:
+BENCHMARK_DATABASE_URL=postgresql+asyncpg://... pytest -s tests/test_search_filter.py
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from sqlalchemy import select, or_, text
+from sqlalchemy.dialects import postgresql
+
+from filters.contact_filter import ContactFilter
+from models import Contact
+
+BENCHMARK_URL = os.getenv("BENCHMARK_DATABASE_URL")
+BENCHMARK_CONTACTS = int(os.getenv("BENCHMARK_CONTACTS", 1_000_000))
+
+
+def compile_pg(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def legacy_filter(query: str):
+    """Прежний поиск: ILIKE по сырым колонкам, индексы не используются"""
+    return or_(Contact.full_name.ilike(f"%{query}%"), Contact.phone.ilike(f"%{query}%"))
+
+
+def test_phone_query_is_normalised_to_digits():
+    filters = ContactFilter("+998 90 123")
+    compiled = compile_pg(filters.apply(select(Contact.id)))
+
+    assert "contacts.phone_digits LIKE" in str(compiled)
+    assert "99890123" in compiled.params.values()
+    assert "<%" in str(compiled)
+
+
+def test_rank_uses_similarity():
+    sql = str(compile_pg(select(ContactFilter("+998 90 123").rank)))
+
+    assert "greatest(word_similarity(" in sql
+    assert "similarity(contacts.phone_digits" in sql
+    assert ContactFilter(None).rank is None
+
+
+@pytest.mark.skipif(not BENCHMARK_URL, reason="BENCHMARK_DATABASE_URL is not set")
+def test_trigram_search_against_ilike():
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    query = "+998 90 123"
+
+    async def timed(conn, stmt, rounds: int = 5) -> tuple[float, int]:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            rows = (await conn.execute(stmt)).all()
+        return (time.perf_counter() - started) / rounds * 1000, len(rows)
+
+    async def main():
+        engine = create_async_engine(BENCHMARK_URL)
+        async with engine.connect() as conn:
+            # Всё в одной транзакции с откатом: база после бенчмарка не меняется
+            transaction = await conn.begin()
+            await conn.execute(
+                text(
+                    "INSERT INTO contacts (full_name, email, phone, created_at, updated_at) "
+                    "SELECT 'Contact ' || n, 'c' || n || '@example.com', "
+                    "'+998' || (90 + n % 10) || lpad((n * 7919 % 10000000)::text, 7, '0'), now(), now() "
+                    "FROM generate_series(1, :rows) AS n"
+                ),
+                {"rows": BENCHMARK_CONTACTS},
+            )
+            await conn.execute(text("ANALYZE contacts"))
+
+            filters = ContactFilter(query)
+            trigram_ms, trigram_rows = await timed(
+                conn, filters.apply(select(Contact.id, filters.rank)).order_by(text("relevance DESC")).limit(20)
+            )
+            ilike_ms, ilike_rows = await timed(
+                conn, select(Contact.id).where(legacy_filter(query)).order_by(Contact.id.desc()).limit(20)
+            )
+            await transaction.rollback()
+        await engine.dispose()
+        return trigram_ms, trigram_rows, ilike_ms, ilike_rows
+
+    trigram_ms, trigram_rows, ilike_ms, ilike_rows = asyncio.run(main())
+    print(
+        f"\n{BENCHMARK_CONTACTS} contacts, q={query!r}: "
+        f"trigram {trigram_ms:.1f} ms ({trigram_rows} rows), ILIKE {ilike_ms:.1f} ms ({ilike_rows} rows)"
+    )
+    # ILIKE по сырому телефону не находит номер в другом формате
+    assert trigram_rows > ilike_rows
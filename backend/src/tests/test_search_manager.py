@@ -0,0 +1,71 @@
+import asyncio
+
+from sqlalchemy.exc import DBAPIError
+
+from schemas.search import SearchHit
+from services import search_manager
+from services.search_manager import SearchManager
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        return None
+
+
+async def found(self, db, query):
+    return [SearchHit(id=1, title=query)]
+
+
+class QueryCanceledError(Exception):
+    sqlstate = "57014"
+
+
+async def statement_timeout(self, db, query):
+    raise DBAPIError("SELECT 1", {}, QueryCanceledError("canceling statement due to statement timeout"))
+
+
+async def db_error(self, db, query):
+    raise DBAPIError("SELECT 1", {}, Exception("connection is closed"))
+
+
+async def slow(self, db, query):
+    await asyncio.sleep(1)
+    return []
+
+
+async def broken(self, db, query):
+    raise RuntimeError("boom")
+
+
+def test_search_degrades_per_source(monkeypatch):
+    monkeypatch.setattr(search_manager, "async_session", FakeSession)
+    monkeypatch.setattr(SearchManager, "_SearchManager__leads", found)
+    monkeypatch.setattr(SearchManager, "_SearchManager__contacts", db_error)
+    monkeypatch.setattr(SearchManager, "_SearchManager__deals", slow)
+    monkeypatch.setattr(SearchManager, "_SearchManager__targets", broken)
+
+    result = asyncio.run(SearchManager(limit=5, timeout=0.05).search("acme"))
+
+    assert [hit.title for hit in result.leads.items] == ["acme"]
+    assert result.contacts.failed and not result.contacts.items
+    assert result.deals.timed_out and not result.deals.items
+    assert result.targets.failed and not result.targets.items
+
+
+def test_statement_timeout_is_reported_as_timeout(monkeypatch):
+    monkeypatch.setattr(search_manager, "async_session", FakeSession)
+    monkeypatch.setattr(SearchManager, "_SearchManager__leads", statement_timeout)
+    monkeypatch.setattr(SearchManager, "_SearchManager__contacts", found)
+    monkeypatch.setattr(SearchManager, "_SearchManager__deals", found)
+    monkeypatch.setattr(SearchManager, "_SearchManager__targets", found)
+
+    result = asyncio.run(SearchManager(limit=5, timeout=1).search("acme"))
+
+    assert result.leads.timed_out and not result.leads.failed
+    assert not result.contacts.timed_out and result.contacts.items
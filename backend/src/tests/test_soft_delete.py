@@ -0,0 +1,201 @@
+"""Мягкое удаление: глобальный фильтр ORM SELECT-ов и физическая очистка старых удалённых строк"""
+import asyncio
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from filters.paginator import make_paginator
+from filters.sorter import Sorter
+from models import Contact, Deal, Lead, LeadComment, TargetCompany
+from models.deal import DealComment
+from models.lead import StatusEnum
+from repository.base_repo import BaseRepository
+from repository.lead_repo import LeadRepository
+from repository.lead_status_repo import LeadStatusRepository
+from repository.taget_repo import TargetCompanyRepository
+from services import tombstone_purger
+from services.tombstone_purger import PURGE_ORDER, TombstonePurger
+from tests.conftest import SyncSession
+
+NOW = datetime(2024, 1, 1, 12)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_lead(i: int, target: TargetCompany = None, **kwargs) -> Lead:
+    return Lead(
+        full_name=f"Lead {i}",
+        email=f"lead{i}@example.com",
+        phone=f"+998 90 {i:07d}",
+        status=StatusEnum.NEW,
+        company_name="Company",
+        company_info="Info",
+        target_id=target.id if target else None,
+        created_at=NOW,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def leads(db):
+    target = TargetCompany(name="Target", created_at=NOW)
+    db.add(target)
+    db.session.flush()
+    live, deleted = make_lead(1, target), make_lead(2, target)
+    db.add_all([live, deleted])
+    db.session.flush()
+    db.add_all([
+        Deal(lead_id=live.id, deal_sum=100, created_at=NOW),
+        Deal(lead_id=deleted.id, deal_sum=500, created_at=NOW),
+    ])
+    db.session.commit()
+    run(BaseRepository(db).soft_delete(deleted))
+    return target, live, deleted
+
+
+def test_soft_delete_stamps_deleted_at(db, leads):
+    _, _, deleted = leads
+    row = db.session.execute(
+        select(Lead.deleted_at).where(Lead.id == deleted.id).execution_options(include_deleted=True)
+    ).one()
+
+    assert row.deleted_at is not None
+
+
+def test_deleted_lead_hidden_from_get_and_list(db, leads):
+    _, live, deleted = leads
+    repo = LeadRepository(db)
+    sorter = Sorter(((Lead.id, "asc"),))
+
+    assert run(repo.get_by_id(deleted.id)) is None
+    assert run(repo.get_by_id(live.id)).id == live.id
+
+    result = run(repo.list(sorter=sorter, paginator=make_paginator(sorter=sorter, key=Lead.id)))
+    assert [lead.id for lead in result["leads"]] == [live.id]
+    assert result["pagination"]["total"] == 1
+
+    rows = run(repo.list_rows(sorter=sorter, paginator=make_paginator(sorter=sorter, key=Lead.id)))
+    assert [lead["id"] for lead in rows["leads"]] == [live.id]
+
+
+def test_deleted_lead_hidden_from_joins_and_subqueries(db, leads):
+    target, live, _ = leads
+    joined = db.session.execute(
+        select(Deal.id, Lead.id).join(Lead, Lead.id == Deal.lead_id)
+    ).all()
+    assert [lead_id for _, lead_id in joined] == [live.id]
+
+    lead_count = (
+        select(func.count(Lead.id))
+        .where(Lead.target_id == TargetCompany.id)
+        .correlate(TargetCompany)
+        .scalar_subquery()
+    )
+    assert db.session.execute(select(TargetCompany.id, lead_count)).one() == (target.id, 1)
+
+
+def test_deleted_lead_hidden_from_funnel_union(db, leads):
+    target, _, _ = leads
+    rows = run(TargetCompanyRepository(db).funnel([target.id], date_from=NOW - timedelta(days=1)))
+    by_kind = {row.kind: row for row in rows}
+
+    assert by_kind["lead"].total == 1
+    assert by_kind["deal"].total == 1
+    assert float(by_kind["deal"].amount) == 100
+
+
+def test_deleted_target_hidden_from_list_with_stats(db, leads):
+    target, _, _ = leads
+    other = TargetCompany(name="Other", created_at=NOW)
+    db.add(other)
+    db.session.commit()
+    run(BaseRepository(db).soft_delete(target))
+
+    sorter = Sorter(((TargetCompany.created_at, "asc"),))
+    paginator = make_paginator(sorter=sorter, key=TargetCompany.id)
+    result = run(TargetCompanyRepository(db).list_with_stats(sorter=sorter, paginator=paginator))
+
+    assert [row["id"] for row in result["target_companies"]] == [other.id]
+    assert result["pagination"]["total"] == 1
+
+
+def test_include_deleted_opts_out(db, leads):
+    _, live, deleted = leads
+    ids = db.session.scalars(
+        select(Lead.id).order_by(Lead.id).execution_options(include_deleted=True)
+    ).all()
+
+    assert ids == [live.id, deleted.id]
+
+
+@pytest.fixture
+def tombstones(db):
+    """По каждой модели PURGE_ORDER: три старых удалённых, одна свежеудалённая и одна живая строка"""
+    old, recent = NOW - timedelta(days=60), NOW - timedelta(days=1)
+    states = [old, old, old, recent, None]
+
+    targets = [TargetCompany(name=f"Target {i}", deleted_at=state) for i, state in enumerate(states)]
+    db.add_all(targets)
+    db.session.flush()
+    leads = [make_lead(i, target, deleted_at=state) for i, (target, state) in enumerate(zip(targets, states))]
+    db.add_all(leads)
+    db.session.flush()
+    deals = [Deal(lead_id=lead.id, deal_sum=1, deleted_at=state) for lead, state in zip(leads, states)]
+    db.add_all(deals)
+    db.session.flush()
+    db.add_all([
+        *[LeadComment(lead_id=lead.id, comment="-", deleted_at=state) for lead, state in zip(leads, states)],
+        *[DealComment(deal_id=deal.id, comment="-", deleted_at=state) for deal, state in zip(deals, states)],
+        *[
+            Contact(full_name=f"Contact {i}", email="c@example.com", phone="1", lead_id=lead.id, deleted_at=state)
+            for i, (lead, state) in enumerate(zip(leads, states))
+        ],
+    ])
+    db.session.commit()
+
+
+def test_purge_removes_old_tombstones_in_batches_and_order(db, engine, tombstones, monkeypatch):
+    @asynccontextmanager
+    async def worker_session():
+        session = SyncSession(Session(engine, expire_on_commit=False))
+        try:
+            yield session
+        finally:
+            await session.close()
+
+    calls = []
+    purge = BaseRepository.purge
+
+    async def recording_purge(self, model, before, batch_size=1000):
+        count = await purge(self, model, before, batch_size)
+        calls.append((model, count))
+        return count
+
+    rebuilds = []
+
+    async def rebuild(self):
+        rebuilds.append(True)
+
+    monkeypatch.setattr(tombstone_purger, "async_session", worker_session)
+    monkeypatch.setattr(tombstone_purger, "datetime", type("FrozenNow", (datetime,), {"now": staticmethod(lambda: NOW)}))
+    monkeypatch.setattr(BaseRepository, "purge", recording_purge)
+    monkeypatch.setattr(LeadStatusRepository, "rebuild", rebuild)
+
+    purged = run(TombstonePurger(retention_days=30, batch_size=2).run_once())
+
+    assert purged == {model.__tablename__: 3 for model in PURGE_ORDER}
+    # Пачками по batch_size, дочерние таблицы раньше родительских
+    assert calls == [(model, count) for model in PURGE_ORDER for count in (2, 1)]
+    assert rebuilds == [True]
+    for model in PURGE_ORDER:
+        remaining = db.session.execute(
+            select(model.deleted_at).execution_options(include_deleted=True)
+        ).scalars().all()
+        assert sorted(remaining, key=lambda value: value is None) == [NOW - timedelta(days=1), None]
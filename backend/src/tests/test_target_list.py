@@ -0,0 +1,54 @@
+import asyncio
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from db.instrumentation import query_budget
+from models import TargetCompany
+from models.click import ClickRollup
+from models.lead import StatusEnum
+from models.lead_status import LeadStatusCounter
+from schemas.base import SearchSort
+from services.target_company import TargetCompanyManager
+
+TARGETS = 30
+
+
+@pytest.fixture
+def targets(db):
+    now = datetime(2024, 1, 1)
+    for i in range(TARGETS):
+        target = TargetCompany(name=f"Target {i}", created_at=now + timedelta(minutes=i))
+        db.add(target)
+        db.session.flush()
+        db.add_all([
+            ClickRollup(target_id=target.id, hour=now, clicks=i),
+            ClickRollup(target_id=target.id, hour=now + timedelta(hours=1), clicks=1),
+            LeadStatusCounter(target_key=target.id, status=StatusEnum.NEW, leads=i),
+            LeadStatusCounter(target_key=target.id, status=StatusEnum.DEAL, leads=2),
+        ])
+    db.session.commit()
+
+
+def list_page(db, size: int):
+    manager = TargetCompanyManager(db)
+    return asyncio.run(manager.list_target(sorts=[SearchSort.asc], page=1, size=size))
+
+
+@pytest.mark.parametrize("size", [1, 5, TARGETS])
+def test_target_list_query_count_is_constant(db, targets, size):
+    # COUNT(*) для пагинации + одна страница со статистикой, независимо от размера страницы
+    with query_budget(2) as stats:
+        result = list_page(db, size)
+
+    assert stats.queries == 2
+    assert len(result["target_companies"]) == size
+    assert result["pagination"]["total"] == TARGETS
+
+
+def test_target_list_stats(db, targets):
+    rows = list_page(db, TARGETS)["target_companies"]
+
+    assert [row["clicks"] for row in rows] == [i + 1 for i in range(TARGETS)]
+    assert [row["leads"] for row in rows] == [i + 2 for i in range(TARGETS)]
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from dependencies import get_db
+from main import app
+from routers import telegram
+from services.telegram_manager import InteractionBuffer
+from tests.conftest import call
+
+
+class RecordingBuffer(InteractionBuffer):
+    def __init__(self):
+        super().__init__()
+        self.flushed = []
+
+    async def flush(self, interactions):
+        self.flushed.extend(interactions)
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    buffer = RecordingBuffer()
+    monkeypatch.setattr(telegram, "interaction_buffer", buffer)
+    monkeypatch.setattr("dependencies.BOT_SECRET", "bot-secret")
+
+    async def no_db():
+        raise AssertionError("interaction endpoint must not open a DB session")
+
+    app.dependency_overrides[get_db] = no_db
+    yield buffer
+    app.dependency_overrides.clear()
+
+
+def test_interaction_is_buffered_without_db(buffer):
+    status, _, _ = asyncio.run(call(app, "POST", "/telegram/42/interaction", headers={"x-bot-token": "bot-secret"}))
+
+    assert status == 201
+    assert buffer.flushed == [42]
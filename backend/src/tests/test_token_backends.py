@@ -0,0 +1,79 @@
+"""
+Сравнение реализаций JWT: одинаковые claims и время encode/decode.
+Тайминги печатаются, смотреть с `pytest -s tests/test_token_backends.py`.
+"""
+import time
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from exceptions import InvalidToken
+from services.token_service import JoseBackend, PyJWTBackend, TokenService, VerifiedTokens, pyjwt
+
+KEY = "benchmark-secret"
+ROUNDS = 2000
+
+requires_pyjwt = pytest.mark.skipif(pyjwt is None, reason="PyJWT is not installed")
+BACKENDS = [
+    pytest.param(JoseBackend, id="jose"),
+    pytest.param(PyJWTBackend, id="pyjwt", marks=requires_pyjwt),
+]
+
+
+def payload() -> dict:
+    return {
+        "sub": "42",
+        "username": "operator",
+        "exp": int((datetime.now() + timedelta(minutes=5)).timestamp()),
+        "refresh": False,
+        "fam": "0f8e6f1c",
+    }
+
+
+def per_call_us(func, rounds: int = ROUNDS) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - started) / rounds * 1_000_000
+
+
+@pytest.mark.parametrize("backend_class", BACKENDS)
+def test_backend_round_trip(backend_class):
+    backend = backend_class()
+    claims = payload()
+    token = backend.encode(claims, KEY)
+
+    assert backend.decode(token, KEY) == claims
+    with pytest.raises(InvalidToken):
+        backend.decode(token, "other-secret")
+
+    encode_us = per_call_us(lambda: backend.encode(claims, KEY))
+    decode_us = per_call_us(lambda: backend.decode(token, KEY))
+    print(f"\n{backend_class.__name__}: encode {encode_us:.1f} us, decode {decode_us:.1f} us")
+
+
+@requires_pyjwt
+def test_backends_are_interchangeable():
+    jose, fast = JoseBackend(), PyJWTBackend()
+    claims = payload()
+
+    assert fast.decode(jose.encode(claims, KEY), KEY) == claims
+    assert jose.decode(fast.encode(claims, KEY), KEY) == claims
+
+
+@pytest.mark.parametrize("backend_class", BACKENDS)
+def test_verified_token_cache_skips_decode(backend_class, monkeypatch):
+    backend = backend_class()
+    monkeypatch.setattr("services.token_service.SECRET_KEY", KEY)
+    claims = payload()
+    token = backend.encode(claims, KEY)
+    service = TokenService(backend=backend, cache=VerifiedTokens(100))
+    uncached = TokenService(backend=backend, cache=VerifiedTokens(0))
+
+    assert service.validate(token) == uncached.validate(token) == claims
+
+    hit_us = per_call_us(lambda: service.validate(token))
+    miss_us = per_call_us(lambda: uncached.validate(token))
+    print(f"\n{backend_class.__name__}: validate cached {hit_us:.2f} us, uncached {miss_us:.1f} us")
+    assert hit_us < miss_us